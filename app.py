@@ -6,6 +6,7 @@ from src.pages.analysis import show_analysis
 from src.pages.meta_overview import show_meta_overview
 from src.pages.simulator import show_simulator
 from src.pages.mana_check import show_mana_check
+from src.card_cache import CardCache, warm_from_decklists
 
 # ── 1. Page Config ────────────────────────────────────────────────────────────
 st.set_page_config(page_title="MTG Premodern Lab", page_icon="assets/favicon.png", layout="wide")
@@ -20,11 +21,26 @@ TIMEFRAMES = {
     "3M": "mtgdecks_matrix_90_days"
 }
 
+# Preload every card seen in decklists.json into the persistent card cache on startup
+# (background thread). Set CARD_CACHE_WARM=0 to disable.
+CARD_CACHE_WARM = os.environ.get("CARD_CACHE_WARM", "1") == "1"
+
 @st.cache_data(ttl=3600)
 def get_cached_period_data(period_key):
     # Cache busting: v13
     return load_period_data(DATA_DIR, TIMEFRAMES[period_key])
 
+@st.cache_resource(show_spinner=False)
+def get_card_cache():
+    # One on-disk card cache per process; survives restarts (data/card_cache.sqlite)
+    cache = CardCache()
+    if CARD_CACHE_WARM:
+        import threading
+        threading.Thread(target=warm_from_decklists, args=(cache,), daemon=True).start()
+    return cache
+
+card_cache = get_card_cache()
+
 # "Premodern Meta Lab" title is injected above the nav links via CSS ::before
 # in apply_custom_css().
 with st.sidebar:
@@ -76,7 +92,7 @@ def run_simulator():
     show_simulator(matrix_data, all_archetypes, records_data)
 
 def run_mana_check():
-    show_mana_check()
+    show_mana_check(card_cache)
 
 # ── 6. Navigation ─────────────────────────────────────────────────────────────
 pg_overview   = st.Page(run_meta_overview, title="Meta Overview",        default=True)
@@ -0,0 +1,119 @@
+"""
+Offline mana audit of every stored decklist.
+
+Runs the Mana Check analysis (land count, coloured sources, recommended-lands delta,
+exact P(castable on curve) per spell) over every list in data/decklists.json, fanned
+out over a process pool one archetype per task, and writes the per-archetype medians
+to data/mana_health.json. The Deck Analysis page reads that file, so "typical mana
+health" costs nothing at page load.
+
+Card data comes from the local card database; cards it lacks are resolved through
+Scryfall and the persistent card cache unless --no-remote is given.
+
+Usage:
+  python scripts/audit_decklist_mana.py [--workers 4] [--on-draw] [--no-remote]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.card_db import lookup_card
+from src.mana_analysis import archetype_mana_summary, deck_mana_summary
+
+DECKLISTS_FILE = os.path.join(BASE_DIR, "data", "decklists.json")
+MANA_HEALTH_FILE = os.path.join(BASE_DIR, "data", "mana_health.json")
+
+
+def maindeck(deck):
+    """(qty, name) entries of a stored deck's maindeck."""
+    return [(int(c["qty"]), c["name"]) for c in deck.get("cards", [])
+            if c.get("section", "Maindeck") == "Maindeck" and c.get("name")]
+
+
+def resolve_card_data(names, remote=True):
+    """Card records for names: local card database first, then Scryfall via the card cache."""
+    card_data = {}
+    missing = []
+    for name in names:
+        rec = lookup_card(name)
+        if rec:
+            card_data[name] = rec
+        else:
+            missing.append(name)
+    if missing and remote:
+        from src.card_cache import CardCache
+        from src.scryfall import resolve_cards
+
+        found, _ = resolve_cards(missing, cache=CardCache())
+        card_data.update(found)
+    return card_data
+
+
+def audit_archetype(task):
+    """Worker: (archetype, decks, card_data, on_draw) → (archetype, summary)."""
+    archetype, decks, card_data, on_draw = task
+    summaries = []
+    for deck in decks:
+        cards = maindeck(deck)
+        if not cards:
+            continue
+        summary = deck_mana_summary(cards, card_data, on_draw=on_draw)
+        # A list whose spells could not be resolved would only add noise
+        if summary["unknown_cards"] <= summary["deck_size"] // 10:
+            summaries.append(summary)
+    return archetype, archetype_mana_summary(summaries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit the mana of every stored decklist")
+    parser.add_argument("--decklists", default=DECKLISTS_FILE)
+    parser.add_argument("--out", default=MANA_HEALTH_FILE)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--on-draw", action="store_true", help="Score castability on the draw")
+    parser.add_argument("--no-remote", action="store_true", help="Use only the local card database")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.decklists):
+        print(f"No decklists at {args.decklists} — nothing to audit.")
+        return
+    with open(args.decklists, "r", encoding="utf-8") as f:
+        decklists = json.load(f)
+
+    start = time.time()
+    names = sorted({name for decks in decklists.values() for d in decks for _, name in maindeck(d)})
+    card_data = resolve_card_data(names, remote=not args.no_remote)
+    print(f"Card data for {len(card_data)}/{len(names)} names ({time.time() - start:.1f}s)")
+
+    tasks = []
+    for archetype, decks in decklists.items():
+        deck_names = {name for d in decks for _, name in maindeck(d)}
+        tasks.append((archetype, decks, {n: card_data[n] for n in deck_names if n in card_data}, args.on_draw))
+
+    results = {}
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for archetype, summary in pool.map(audit_archetype, tasks):
+            if not summary:
+                print(f"  {archetype:<30} skipped (no list with resolvable cards)")
+                continue
+            results[archetype] = summary
+            print(f"  {archetype:<30} {summary['decks']:>3} lists  avg P on curve {summary['avg_on_curve']:.1%}")
+
+    out = {
+        "generated": datetime.now(timezone.utc).strftime("%Y-%m-%d"),
+        "on_draw": args.on_draw,
+        "archetypes": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as f:
+        json.dump(out, f, indent=1, ensure_ascii=False)
+    print(f"Wrote {len(results)} archetype summaries to {args.out} in {time.time() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Benchmark targeted table parsing (src/html_tables.py) against full-page parsing.
+
+For every fixture page (see scripts/html_fixtures.py) and every table the scrapers
+look for, times BeautifulSoup over the whole page + find() against find_table(), and
+for the row-scan scrapers (decklists) a full parse + find_all() against
+strained_soup(). Both must extract the same text; pages that lack a table
+(spicerack_raw.html is a Cloudflare challenge) show what a miss costs.
+
+Usage: python scripts/bench_html_parsing.py [--fixtures data/fixtures] [--repeat 5]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from bs4 import BeautifulSoup
+
+from html_fixtures import FIXTURES_DIR, load_fixtures
+from src.html_tables import find_table, strained_soup
+
+# (label, find() keyword arguments) for every table a scraper reads
+TABLES = [
+    ("winrates", {"class_": "winrates"}),
+    ("allArchetypes", {"id": "allArchetypes"}),
+    ("table-striped", {"class_": "table-striped"}),
+    ("clickable", {"class_": "clickable"}),
+]
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, statistics.median(times)
+
+
+def text(node):
+    return node.get_text(" ", strip=True) if node is not None else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark targeted vs full-page HTML parsing')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help='Directory of saved *.html pages')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    pages = load_fixtures(args.fixtures)
+    print(f"{'page':<32} {'target':<15} {'size':>7} {'full':>9} {'targeted':>9} {'speedup':>8}")
+    total_full = total_fast = 0.0
+    for name, html in pages.items():
+        rows, misses = [], []
+        for label, kwargs in TABLES:
+            full, t_full = timed(lambda: BeautifulSoup(html, 'html.parser').find('table', **kwargs), args.repeat)
+            fast, t_fast = timed(lambda: find_table(html, **kwargs), args.repeat)
+            if text(full) != text(fast):
+                raise SystemExit(f"{name}: {label} table differs between full and targeted parsing")
+            (rows if full is not None else misses).append((label, t_full, t_fast))
+        if not rows and misses and "cardItem" not in html:
+            label, t_full, t_fast = misses[0]  # what a page without the table costs
+            rows.append((f"{label} (absent)", t_full, t_fast))
+        if "cardItem" in html:
+            names = ['th', 'tr']
+            full, t_full = timed(lambda: BeautifulSoup(html, 'html.parser').find_all(names), args.repeat)
+            fast, t_fast = timed(lambda: strained_soup(html, names).find_all(names), args.repeat)
+            if [text(n) for n in full] != [text(n) for n in fast]:
+                raise SystemExit(f"{name}: th/tr rows differ between full and strained parsing")
+            rows.append(("th/tr rows", t_full, t_fast))
+        for label, t_full, t_fast in rows:
+            total_full += t_full
+            total_fast += t_fast
+            print(f"{name[-32:]:<32} {label:<15} {len(html) / 1024:6.0f}K {t_full * 1000:8.1f}ms "
+                  f"{t_fast * 1000:8.1f}ms {t_full / t_fast:7.1f}x")
+    if total_fast:
+        print(f"\nTotal: full {total_full * 1000:.0f}ms, targeted {total_fast * 1000:.0f}ms "
+              f"({total_full / total_fast:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Benchmark the shared listing-row parser (src/listing_rows.py) against the per-row
+BeautifulSoup parsing every decklist scraper used to carry its own copy of.
+
+The previous parsers built a tree of the deck table, then ran find_all('td'),
+get_text(), find() and a class scan on every row, and classified ranks with a loop of
+startswith() calls. The current one streams the table once and classifies with
+precompiled patterns. For every listing page among the fixtures (plus synthetic ones
+of --rows rows), both must produce the same rows and the same selected decks
+(mtgdecks_scraper._parse_top_decks_page); the rank heuristics are also timed alone
+over every rank seen.
+
+Usage: python scripts/bench_listing_parser.py [--fixtures data/fixtures] [--rows 25 200] [--repeat 5]
+"""
+import argparse
+import dataclasses
+import os
+import re
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from html_fixtures import FIXTURES_DIR, listing_page, load_fixtures
+from src.html_tables import find_table
+from src.http_client import MTGDECKS_URL
+from src.listing_rows import parse_listing_rows, top_finish
+from src.mtgdecks_scraper import _parse_top_decks_page
+
+VALID_RANKS = ["1st", "2nd", "3rd", "4th", "5th", "6th", "7th", "8th", "top 4", "top 8",
+               "1", "2", "3", "4", "5", "6", "7", "8", "top4", "top8"]
+
+
+def legacy_rows(html):
+    """The scrapers' row parsing as it was: a tree of the table, find_all/get_text per row."""
+    table = find_table(html, class_='clickable')
+    if not table:
+        return None
+    rows = table.find_all('tr')
+    if len(rows) <= 1:
+        return None
+    parsed = []
+    for row in rows:
+        cols = row.find_all('td')
+        if len(cols) < 8:
+            continue
+        player_td = cols[2]
+        deck_link = player_td.find('a')
+        deck_url = deck_link.get('href', "") if deck_link else ""
+        if not deck_url:
+            continue
+        strong_tag = player_td.find('strong')
+        players_text = re.sub(r'\D', '', cols[7].get_text(strip=True))
+        colors = []
+        for span in cols[3].find_all('span', class_='ms-cost'):
+            for cls in span.get('class', []):
+                if cls.startswith('ms-') and len(cls) == 4 and cls != 'ms-cost':
+                    colors.append(cls.replace('ms-', '').upper())
+        spice_bar = cols[8].find('div', class_='progress-bar') if len(cols) > 8 else None
+        spice = spice_bar.get('aria-valuenow', "") if spice_bar else ""
+        parsed.append({
+            "player": strong_tag.get_text(strip=True).replace('By', '').strip() if strong_tag else "Unknown",
+            "rank": cols[0].get_text(strip=True).split('(')[0].strip(),
+            "players": int(players_text) if players_text else 0,
+            "event": cols[5].get_text(strip=True),
+            "date": cols[9].get_text(separator=' ', strip=True) if len(cols) > 9 else "",
+            "colors": colors,
+            "spice": int(spice) if spice.isdigit() else 0,
+            "url": deck_url if deck_url.startswith('http') else MTGDECKS_URL + deck_url,
+        })
+    return parsed
+
+
+def legacy_top_finish(rank_text, players):
+    """The rank / players heuristics as they were: startswith() over VALID_RANKS, then re.match."""
+    rank_lower = rank_text.lower()
+    is_top_8 = any(r == rank_lower or rank_lower.startswith(r) for r in VALID_RANKS)
+    if players == 0:
+        match_record = re.match(r'^(\d+)-(\d+)(?:-(\d+))?$', rank_text)
+        if match_record:
+            wins = int(match_record.group(1))
+            losses = int(match_record.group(2))
+            draws = int(match_record.group(3)) if match_record.group(3) else 0
+            total_rounds = wins + losses + draws
+            if total_rounds >= 8: players = 129
+            elif total_rounds == 7: players = 65
+            elif total_rounds == 6: players = 33
+            elif total_rounds == 5: players = 17
+            elif total_rounds == 4: players = 9
+            elif total_rounds == 3: players = 4
+            if losses == 0 and wins >= 3:
+                is_top_8 = True
+            elif total_rounds >= 5 and wins / total_rounds >= 0.80:
+                is_top_8 = True
+        elif is_top_8:
+            players = 16
+    return players, is_top_8
+
+
+def legacy_top_decks(html):
+    rows = legacy_rows(html)
+    if rows is None:
+        return None
+    decks = []
+    for row in rows:
+        players, is_top_8 = legacy_top_finish(row["rank"], row["players"])
+        if players >= 16 and is_top_8:
+            decks.append({**row, "players": players})
+    return decks
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the shared listing-row parser')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help='Directory of saved *.html pages')
+    parser.add_argument('--rows', type=int, nargs='+', default=[25, 200], help='Rows of the synthetic listings')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    pages = {name: html for name, html in load_fixtures(args.fixtures, synthetic=False).items()
+             if parse_listing_rows(html) is not None}
+    for n in args.rows:
+        pages[f"synthetic {n} rows"] = listing_page(n, seed=n)
+
+    ranks = set()
+    total_old = total_new = 0.0
+    for name, html in pages.items():
+        old_rows = legacy_rows(html)
+        new_rows = [dataclasses.asdict(row) for row in parse_listing_rows(html)]
+        if old_rows != new_rows:
+            raise SystemExit(f"{name}: listing rows differ")
+        old, t_old = timed(lambda: legacy_top_decks(html), args.repeat)
+        new, t_new = timed(lambda: _parse_top_decks_page(html), args.repeat)
+        if old != new:
+            raise SystemExit(f"{name}: selected decks differ")
+        ranks.update((row["rank"], row["players"]) for row in new_rows)
+        total_old += t_old
+        total_new += t_new
+        print(f"  {name:<32} {len(html) / 1024:6.0f} KB  {len(new_rows):>4} rows  {len(new):>4} kept   "
+              f"legacy {t_old * 1000:7.2f}ms   streamed {t_new * 1000:6.2f}ms   {t_old / t_new:5.1f}x")
+    print(f"  {'total':<32} {'':>9}  {'':>9}  {'':>9}   legacy {total_old * 1000:7.2f}ms   "
+          f"streamed {total_new * 1000:6.2f}ms   {total_old / total_new:5.1f}x")
+
+    # The heuristics alone, over every (rank, players) seen plus the shapes they special-case
+    ranks |= {(r, 0) for r in ("1st", "Top 8", "top4", "9th", "10th", "5-0", "4-1", "3-2", "9-2", "6-1-1", "2-2")}
+    ranks = sorted(ranks) * 1000
+    for rank, players in set(ranks):
+        if legacy_top_finish(rank, players) != top_finish(rank, players):
+            raise SystemExit(f"top_finish({rank!r}, {players}) differs")
+    _, t_old = timed(lambda: [legacy_top_finish(r, p) for r, p in ranks], args.repeat)
+    _, t_new = timed(lambda: [top_finish(r, p) for r, p in ranks], args.repeat)
+    print(f"\n  rank heuristics x{len(ranks):<7}  legacy {t_old * 1000:7.2f}ms   "
+          f"precompiled {t_new * 1000:6.2f}ms   {t_old / t_new:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark the single-pass winrate-matrix parser against the previous implementation.
+
+The previous parse_matrix built a BeautifulSoup tree of the whole page, then
+serialized every matrix cell back to HTML with str() and ran a regex over it — about
+10,000 serializations for a 100 × 100 matrix. The current one streams the winrates
+table once (update_data_monthly.WinrateTableParser). Both must produce the same
+matrix.
+
+Usage: python scripts/bench_matrix_parser.py [--fixtures data/fixtures] [--size 100] [--repeat 3]
+"""
+import argparse
+import os
+import re
+import statistics
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from bs4 import BeautifulSoup
+
+from html_fixtures import FIXTURES_DIR, load_fixtures, winrates_page
+from update_data_monthly import parse_matrix
+
+
+def legacy_parse_matrix(html, time_frame, tier_mapping, end_date_str):
+    """parse_matrix as it was: full-page tree, str() + regex per cell."""
+    if not html:
+        return None
+    soup = BeautifulSoup(html, 'html.parser')
+    table = soup.find('table', class_='winrates') or soup.find('table')
+    if not table:
+        return None
+    rows = table.find_all('tr')
+    if len(rows) < 2:
+        return None
+    headers = [c.get_text(strip=True) for c in rows[0].find_all(['td', 'th'])]
+    opponents = headers[2:]
+    matrix = {}
+    archetypes = set()
+    for row in rows[1:]:
+        cells = row.find_all(['td', 'th'])
+        if len(cells) < len(headers):
+            continue
+        archetype = cells[0].get_text(strip=True)
+        if not archetype:
+            continue
+        archetypes.add(archetype)
+        if archetype not in matrix:
+            matrix[archetype] = {}
+        for i, opp in enumerate(opponents):
+            cell_html = str(cells[i + 2])
+            m = re.search(r'<b>(\d+)</b><span[^>]*>%</span>\s*<div[^>]*>([\d,]+)\s*matches</div>', cell_html)
+            if m:
+                win_pct = int(m.group(1)) / 100.0
+                matches = int(m.group(2).replace(',', ''))
+                wins = round(matches * win_pct)
+                matrix[archetype][opp] = {
+                    "archetype": opp,
+                    "wins": wins,
+                    "losses": matches - wins,
+                    "draws": 0,
+                    "total_matches": matches,
+                    "win_rate": round(wins / matches, 4) if matches > 0 else 0,
+                }
+                archetypes.add(opp)
+    return {
+        "time_frame": time_frame,
+        "end_date": end_date_str,
+        "archetypes": sorted(list(archetypes)),
+        "tiers": tier_mapping,
+        "matrix": matrix,
+    }
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return result, statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the winrate-matrix parser')
+    parser.add_argument('--fixtures', default=FIXTURES_DIR, help='Directory of saved *.html pages')
+    parser.add_argument('--size', type=int, default=100, help='Archetypes in the synthetic matrix')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    pages = {name: html for name, html in load_fixtures(args.fixtures, synthetic=False).items()
+             if 'matches</div>' in html}
+    pages[f"synthetic {args.size}x{args.size}"] = winrates_page(args.size)
+
+    for name, html in pages.items():
+        old, t_old = timed(lambda: legacy_parse_matrix(html, 'x', {}, 'x'), args.repeat)
+        new, t_new = timed(lambda: parse_matrix(html, 'x', {}, 'x'), args.repeat)
+        if old != new:
+            raise SystemExit(f"{name}: parsers disagree")
+        cells = sum(len(v) for v in new["matrix"].values())
+        print(f"  {name:<30} {len(html) / 1024:6.0f} KB  {cells:>6} matchups   "
+              f"legacy {t_old * 1000:7.1f}ms   single-pass {t_new * 1000:6.1f}ms   {t_old / t_new:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Benchmark the variance-reduced Top 8 sampler against plain Monte Carlo sampling.
+
+Both samplers run the same number of tournaments on the same field. The script reports
+the per-tournament variance of each deck's Top 8 estimate and of the pairwise
+differences that decide the ranking; the ratio of those variances is the factor by
+which the variance-reduced sampler cuts the number of tournaments needed for the same
+standard error. It first checks that an empty field (all shares 0) returns NaN
+estimates instead of looping.
+
+Usage: python scripts/bench_tournament_sampling.py [--period 180_days] [--decks 20] [--tournaments 4000]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.tournament_sim import estimate_top8_odds, sample_top8_observations, summarize_observations
+
+DATA_DIR = os.path.join(BASE_DIR, 'data')
+
+PLAIN = dict(antithetic=False, common_random_numbers=False, stratified=False, conditional=False)
+REDUCED = dict(antithetic=True, common_random_numbers=True, stratified=True, conditional=True)
+
+
+def load_field(period, n_decks):
+    with open(os.path.join(DATA_DIR, f"mtgdecks_matrix_{period}.json"), 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    shares = dict(data.get("meta_shares", {}))
+    shares["Other Decks"] = max(0.0, 1.0 - sum(shares.values()))
+    candidates = [d for d in sorted(shares, key=shares.get, reverse=True) if d != "Other Decks"][:n_decks]
+    return candidates, shares, data.get("matrix", {})
+
+
+def measure(label, candidates, shares, matrix, n_tournaments, seed, kwargs):
+    start = time.perf_counter()
+    obs = sample_top8_observations(candidates, shares, matrix, n_tournaments=n_tournaments,
+                                   seed=seed, **kwargs)
+    elapsed = time.perf_counter() - start
+    means, se = summarize_observations(obs)
+    n_obs = obs.shape[1]
+    per_obs = n_tournaments / n_obs
+    # Variance of a single tournament's contribution: SE² × tournaments
+    var_single = float(np.mean(se ** 2) * n_tournaments)
+    iu = np.triu_indices(len(candidates), 1)
+    diffs = obs[:, None, :] - obs[None, :, :]
+    var_diff = float(np.mean(diffs.var(axis=2, ddof=1)[iu]) * per_obs)
+    print(f"  {label:<18} {elapsed:6.2f}s   mean SE {np.mean(se):.4f}   "
+          f"var/tournament {var_single:.4f}   ranking-diff var/tournament {var_diff:.4f}")
+    return means, var_single, var_diff, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark variance-reduced tournament sampling')
+    parser.add_argument('--period', default='180_days', help='Matrix file suffix, e.g. 180_days')
+    parser.add_argument('--decks', type=int, default=20, help='Number of candidate decks')
+    parser.add_argument('--tournaments', type=int, default=4000, help='Tournaments per sampler')
+    parser.add_argument('--target-se', type=float, default=0.01, help='Precision used for the sample-count estimate')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    candidates, shares, matrix = load_field(args.period, args.decks)
+    # A field without shares has nothing to simulate: NaN estimates, right away
+    odds, done = estimate_top8_odds(candidates[:2], dict.fromkeys(shares, 0.0), matrix)
+    if done or not all(np.isnan(p) for p, _ in odds.values()):
+        raise SystemExit("estimate_top8_odds on an empty field should return NaN without simulating")
+    print(f"Field: {args.period}, {len(candidates)} candidate decks, {args.tournaments} tournaments each\n")
+
+    plain = measure("plain", candidates, shares, matrix, args.tournaments, args.seed, PLAIN)
+    reduced = measure("variance-reduced", candidates, shares, matrix, args.tournaments, args.seed + 1, REDUCED)
+
+    est_factor = plain[1] / reduced[1]
+    rank_factor = plain[2] / reduced[2]
+    time_factor = plain[3] / reduced[3]
+    print("\nSample-count reduction at equal precision:")
+    print(f"  per-deck Top 8 estimate : {est_factor:.2f}x fewer tournaments")
+    print(f"  ranking (pairwise diff) : {rank_factor:.2f}x fewer tournaments")
+    print(f"  wall time, same count   : {time_factor:.2f}x faster")
+    print(f"\nTournaments for mean SE ≤ {args.target_se:.3f}: "
+          f"plain ≈ {int(np.ceil(plain[1] / args.target_se ** 2))}, "
+          f"variance-reduced ≈ {int(np.ceil(reduced[1] / args.target_se ** 2))}")
+
+    max_gap = np.max(np.abs(plain[0] - reduced[0]))
+    print(f"Largest disagreement between the two estimates: {max_gap:.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Build data/card_db.sqlite — the local card database used by Mana Check — from a
+Scryfall bulk-data file ("Oracle Cards": one entry per card name).
+
+Usage:
+  python scripts/build_card_db.py --download            # fetch the current bulk file first
+  python scripts/build_card_db.py --bulk oracle-cards.json
+  python scripts/build_card_db.py --bulk oracle-cards.json --all-formats
+
+By default only cards with a Premodern legality entry (legal / banned / restricted)
+are kept, which keeps the file small; --all-formats keeps every card.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import urllib.request
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.card_db import CARD_DB_PATH, build_card_db, iter_bulk_cards
+
+BULK_INDEX_URL = "https://api.scryfall.com/bulk-data/oracle-cards"
+HEADERS = {"User-Agent": "PremodernLab/1.0", "Accept": "application/json"}
+PREMODERN_STATUSES = {"legal", "banned", "restricted"}
+
+
+def download_bulk(dest_path):
+    """Download the current Oracle Cards bulk file to dest_path."""
+    req = urllib.request.Request(BULK_INDEX_URL, headers=HEADERS)
+    with urllib.request.urlopen(req, timeout=30) as r:
+        meta = json.loads(r.read())
+    print(f"Downloading {meta['download_uri']} ({meta.get('size', 0) / 1e6:.0f} MB)...")
+    req = urllib.request.Request(meta["download_uri"], headers=HEADERS)
+    with urllib.request.urlopen(req, timeout=300) as r, open(dest_path, "wb") as f:
+        shutil.copyfileobj(r, f, length=1 << 20)
+
+
+def premodern_only(cards):
+    for card in cards:
+        if card.get("legalities", {}).get("premodern") in PREMODERN_STATUSES:
+            yield card
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the local Mana Check card database")
+    parser.add_argument("--bulk", help="Path to a Scryfall Oracle Cards bulk JSON file")
+    parser.add_argument("--download", action="store_true", help="Download the current bulk file from Scryfall")
+    parser.add_argument("--all-formats", action="store_true", help="Keep every card, not only Premodern ones")
+    parser.add_argument("--out", default=CARD_DB_PATH, help=f"Output SQLite file (default: {CARD_DB_PATH})")
+    args = parser.parse_args()
+
+    if not args.bulk and not args.download:
+        parser.error("pass --bulk PATH or --download")
+
+    tmp_dir = None
+    bulk_path = args.bulk
+    if args.download:
+        tmp_dir = tempfile.mkdtemp()
+        bulk_path = os.path.join(tmp_dir, "oracle-cards.json")
+        download_bulk(bulk_path)
+
+    try:
+        start = time.time()
+        cards = iter_bulk_cards(bulk_path)
+        if not args.all_formats:
+            cards = premodern_only(cards)
+        count = build_card_db(cards, args.out)
+        size_kb = os.path.getsize(args.out) / 1024
+        print(f"Wrote {count} card keys to {args.out} ({size_kb:.0f} KB) in {time.time() - start:.1f}s")
+    finally:
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
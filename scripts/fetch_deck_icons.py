@@ -2,12 +2,17 @@
 Fetch archetype icon art from Scryfall API (old border / Premodern-legal printings preferred).
 Saves art_crop images to assets/deck_icons/<archetype_slug>.jpg
 """
+import urllib.error
 import urllib.request
 import json
 import os
-import time
+import sys
 
-ICONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "deck_icons")
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+from src.rate_limiter import limiter_for
+
+ICONS_DIR = os.path.join(BASE_DIR, "assets", "deck_icons")
 os.makedirs(ICONS_DIR, exist_ok=True)
 
 # Map archetype name -> iconic card name
@@ -117,6 +122,18 @@ ARCHETYPE_TO_CARD = {
     "Oath Spec": "Quiet Speculation"
 }
 
+def open_url(req):
+    """urlopen paced by the host's adaptive rate limiter (Scryfall asks for 50–100 ms between requests)."""
+    limiter = limiter_for(req.full_url)
+    limiter.wait()
+    try:
+        r = urllib.request.urlopen(req, timeout=15)
+    except urllib.error.HTTPError as e:
+        limiter.observe(e.code, e.headers.get("Retry-After"))
+        raise
+    limiter.observe(r.status)
+    return r
+
 def fetch_scryfall_art(card_name):
     """Fetch art_crop URL from Scryfall, preferring old frame printings."""
     # Search for the card with prefer-oldest to get old border art
@@ -125,7 +142,7 @@ def fetch_scryfall_art(card_name):
     
     req = urllib.request.Request(url, headers={"User-Agent": "MTGMetaDashboard/1.0", "Accept": "application/json"})
     try:
-        with urllib.request.urlopen(req, timeout=15) as r:
+        with open_url(req) as r:
             data = json.loads(r.read().decode("utf-8"))
         
         # Try to get the prints search URI to find old frame version
@@ -135,7 +152,7 @@ def fetch_scryfall_art(card_name):
             prints_url += "&q=frame:old"
             req2 = urllib.request.Request(prints_url, headers={"User-Agent": "MTGMetaDashboard/1.0"})
             try:
-                with urllib.request.urlopen(req2, timeout=15) as r2:
+                with open_url(req2) as r2:
                     prints_data = json.loads(r2.read().decode("utf-8"))
                     if prints_data.get("data"):
                         old_card = prints_data["data"][0]
@@ -156,7 +173,7 @@ def fetch_scryfall_art(card_name):
 def download_image(url, filepath):
     """Download image from URL to filepath."""
     req = urllib.request.Request(url, headers={"User-Agent": "MTGMetaDashboard/1.0"})
-    with urllib.request.urlopen(req, timeout=15) as r:
+    with open_url(req) as r:
         with open(filepath, "wb") as f:
             f.write(r.read())
 
@@ -195,9 +212,7 @@ def main():
                 print(f"    [FAIL] {e}")
         else:
             print(f"    [FAIL] no art found")
-        
-        # Scryfall asks for 75ms between requests
-        time.sleep(0.1)
+
     
     print(f"\nDone! Icons saved to {ICONS_DIR}")
 
@@ -0,0 +1,147 @@
+"""
+HTML fixtures for the scraper benchmarks.
+
+Saved pages are read from data/fixtures/ (any *.html, e.g. written by the recorder) and
+from spicerack_raw.html in the repo root. mtgdecks.net blocks requests without a VPN,
+so for page types that have no saved copy synthetic_pages() builds stand-ins with the
+same markup the parsers read — the winrates matrix, tier list, metagame shares,
+archetype listing and decklist — wrapped in a page of realistic size (scripts,
+navigation, footer).
+
+Usage: python scripts/html_fixtures.py [--out data/fixtures]   (writes the synthetic pages)
+"""
+import argparse
+import glob
+import os
+import random
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_DIR = os.path.join(BASE_DIR, 'data', 'fixtures')
+SAVED_PAGES = [os.path.join(BASE_DIR, 'spicerack_raw.html')]
+
+ARCHETYPES = [
+    "Goblins", "Burn", "The Rock", "Psychatog", "Elves", "Stiflenought", "Landstill", "Survival Welder",
+    "Deadguy Ale", "Sligh", "Oath", "Reanimator", "Stasis", "Enchantress", "Devourer Combo",
+    "Replenish", "Tide Control", "Madness", "Mono Black Control", "Suicide Black", "Merfolk",
+    "Zoo", "Parfait", "Terravore", "Aluren", "Elf Ball", "Pattern Rector", "Sneak Attack",
+    "Lands", "Dragon Stompy", "Affinity", "Slivers", "Elephant Oath", "Tinker", "Doomsday",
+    "Trix", "Faeries", "Rogue", "Eva Green", "Threshold",
+]
+CARDS = ["Brainstorm", "Counterspell", "Swords to Plowshares", "Lightning Bolt", "Dark Ritual",
+         "Psychatog", "Goblin Lackey", "Goblin Piledriver", "Mogg Fanatic", "Wasteland",
+         "Polluted Delta", "Flooded Strand", "Island", "Swamp", "Mountain", "Forest", "Plains",
+         "Duress", "Nevinyrral's Disk", "Fact or Fiction", "Force Spike", "Daze", "Stifle"]
+
+
+def _page(body: str, seed: int = 0) -> str:
+    """Wrap a table in the bulk of a real page: head scripts, navigation, footer."""
+    rng = random.Random(seed)
+    script = "".join(f"var k{i}='{rng.getrandbits(64):x}';" for i in range(1500))
+    nav = "".join(f"<li class='nav-item'><a class='nav-link' href='/Premodern/{a.lower().replace(' ', '-')}'>"
+                  f"<span class='ms ms-cost ms-u'></span>{a}</a></li>" for a in ARCHETYPES * 4)
+    cards = "".join(f"<div class='card mb-2'><div class='card-body'><h5>{a}</h5>"
+                    f"<p class='text-muted'>{rng.randint(1, 200)} decks</p></div></div>" for a in ARCHETYPES)
+    return (f"<!DOCTYPE html><html><head><title>Premodern</title><style>{'.x{color:red}' * 2000}</style>"
+            f"<script>{script}</script></head><body><nav><ul>{nav}</ul></nav>"
+            f"<div class='container'><div class='row'>{cards}</div>{body}</div>"
+            f"<footer><ul>{nav}</ul></footer><script>{script}</script></body></html>")
+
+
+def winrates_page(n: int = 40, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    # Numbered variants once the real names run out, for large benchmark matrices
+    names = [f"{a} {i}" if i else a for i in range(n // len(ARCHETYPES) + 1) for a in ARCHETYPES][:n]
+    head = "<tr><th>Archetype</th><th>Overall</th>" + "".join(f"<th>{a}</th>" for a in names) + "</tr>"
+    rows = []
+    for a in names:
+        cells = []
+        for b in names:
+            if a == b or rng.random() < 0.15:
+                cells.append("<td class='empty'></td>")
+            else:
+                matches = rng.randint(1, 1500)
+                cells.append(f"<td class='cell' title='{a} vs {b}'><b>{rng.randint(20, 80)}</b><span class='pct'>%</span>"
+                             f"\n<div class='small text-muted'>{matches:,} matches</div></td>")
+        rows.append(f"<tr><td><a href='/Premodern/{a.lower()}'>{a}</a></td><td>{rng.randint(40, 60)}%</td>{''.join(cells)}</tr>")
+    return _page(f"<table class='table winrates'>{head}{''.join(rows)}</table>", seed)
+
+
+def tiers_page(seed: int = 0) -> str:
+    rows = "".join(f"<tr class='tier-all tier-{i % 3 + 1}'><td>{i + 1}</td><td><a href='#'>{a}</a></td>"
+                   f"<td>{100 - i}</td></tr>" for i, a in enumerate(ARCHETYPES))
+    return _page(f"<table id='allArchetypes' class='table'>{rows}</table>", seed)
+
+
+def meta_page(seed: int = 0) -> str:
+    rows = "".join(f"<tr><td>{i + 1}</td><td><strong>{a}</strong></td>"
+                   f"<td><span class='d-md-none'>{9 - i % 9}%</span> <span>{9 - i % 9}.{i % 10}5%</span></td></tr>"
+                   for i, a in enumerate(ARCHETYPES))
+    return _page(f"<table class='table table-striped'>{rows}</table>", seed)
+
+
+def listing_page(n_rows: int = 25, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    ranks = ["1st", "2nd", "Top 4", "Top 8", "9th", "5-0", "4-1", "3-2", "Top 16"]
+    rows = ["<tr><th>Rank</th><th></th><th>Deck</th><th>Colors</th><th>Format</th><th>Event</th>"
+            "<th>Level</th><th>Players</th><th>Spice</th><th>Date</th></tr>"]
+    for i in range(n_rows):
+        deck_id = 2_400_000 - seed * 100 - i
+        players = rng.choice(["", "24 players", "64 players", "133 players"])
+        rows.append(
+            f"<tr><td>{rng.choice(ranks)}</td><td></td>"
+            f"<td><a href='/Premodern/goblins/decklist-{deck_id}'>Goblins</a><br><strong>By Player{i}</strong></td>"
+            f"<td><span class='ms ms-cost ms-r'></span><span class='ms ms-cost ms-b'></span></td><td>Premodern</td>"
+            f"<td>Event {i}</td><td>Competitive</td><td>{players}</td>"
+            f"<td><div class='progress'><div class='progress-bar' aria-valuenow='{rng.randint(0, 100)}'></div></div></td>"
+            f"<td>{rng.randint(1, 28)}-Feb <br>-2026</td></tr>")
+    return _page(f"<table class='clickable table'>{''.join(rows)}</table>", seed)
+
+
+def decklist_page(seed: int = 0) -> str:
+    rng = random.Random(seed)
+    tables = []
+    for section in ["Creatures [16]", "Instants [12]", "Lands [20]", "Sideboard [15]"]:
+        rows = "".join(f"<tr class='cardItem' data-required='{rng.randint(1, 4)}' data-card-id='{c}'>"
+                       f"<td class='number'>{rng.randint(1, 4)}</td><td><a href='#'>{c}</a></td></tr>"
+                       for c in rng.sample(CARDS, 6))
+        tables.append(f"<table class='table'><tr><th>{section}</th></tr>{rows}</table>")
+    return _page("".join(tables), seed)
+
+
+def synthetic_pages() -> dict[str, str]:
+    return {
+        "winrates.html": winrates_page(),
+        "tiers.html": tiers_page(),
+        "meta_shares.html": meta_page(),
+        "listing.html": listing_page(),
+        "decklist.html": decklist_page(),
+    }
+
+
+def load_fixtures(directory: str = FIXTURES_DIR, synthetic: bool = True) -> dict[str, str]:
+    """{name: html} of saved pages, plus synthetic stand-ins for page types without one."""
+    pages = {}
+    for path in SAVED_PAGES + sorted(glob.glob(os.path.join(directory, '**', '*.html'), recursive=True)):
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                pages[os.path.relpath(path, BASE_DIR)] = f.read()
+    if synthetic:
+        for name, html in synthetic_pages().items():
+            if not any(os.path.basename(p) == name for p in pages):
+                pages[f"synthetic/{name}"] = html
+    return pages
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic HTML fixtures")
+    parser.add_argument('--out', default=FIXTURES_DIR)
+    args = parser.parse_args()
+    os.makedirs(args.out, exist_ok=True)
+    for name, html in synthetic_pages().items():
+        with open(os.path.join(args.out, name), 'w', encoding='utf-8') as f:
+            f.write(html)
+        print(f"  {name:<18} {len(html) / 1024:6.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
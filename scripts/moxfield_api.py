@@ -1,9 +1,15 @@
-import urllib.request
-import gzip
 import json
-import time
 import re
 import io
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.card_names import normalize_card_name
+from src.http_client import fetch_html
+
+# Deck owners edit their lists, so cached exports are revalidated after a day
+CACHE_TTL = 86400
 
 class MoxfieldAPI:
     def __init__(self):
@@ -11,18 +17,11 @@ class MoxfieldAPI:
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8",
             "Accept-Language": "en-US,en;q=0.9",
-            "Accept-Encoding": "gzip, deflate",
         }
 
     def _get_html(self, url):
-        req = urllib.request.Request(url, headers=self.headers)
-        time.sleep(1.0)
         try:
-            with urllib.request.urlopen(req, timeout=15) as r:
-                html_bytes = r.read()
-                if r.info().get('Content-Encoding') == 'gzip':
-                    return gzip.decompress(html_bytes).decode('utf-8', errors='ignore')
-                return html_bytes.decode('utf-8', errors='ignore')
+            return fetch_html(url, timeout=15, ttl=CACHE_TTL, headers=self.headers)
         except Exception as e:
             print(f"Error fetching {url}: {e}")
             return None
@@ -89,7 +88,7 @@ class MoxfieldAPI:
             if match:
                 qty = int(match.group(1))
                 name = match.group(2)
-                item = {"name": name, "qty": qty, "type": ""}
+                item = {"name": normalize_card_name(name), "qty": qty, "type": ""}
                 if is_sideboard:
                     simplified["sideboard"].append(item)
                 else:
@@ -107,9 +106,9 @@ class MoxfieldAPI:
             "sideboard": []
         }
         for card_name, details in data.get("mainboard", {}).items():
-            simplified["mainboard"].append({"name": card_name, "qty": details.get("quantity", 1), "type": ""})
+            simplified["mainboard"].append({"name": normalize_card_name(card_name), "qty": details.get("quantity", 1), "type": ""})
         for card_name, details in data.get("sideboard", {}).items():
-            simplified["sideboard"].append({"name": card_name, "qty": details.get("quantity", 1), "type": ""})
+            simplified["sideboard"].append({"name": normalize_card_name(card_name), "qty": details.get("quantity", 1), "type": ""})
         return simplified
 
 if __name__ == "__main__":
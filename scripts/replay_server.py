@@ -0,0 +1,233 @@
+"""
+Record/replay harness for the mtgdecks.net scrapers, for testing and benchmarking
+them without the live site (which blocks requests without a VPN).
+
+record — save raw pages as fixtures under data/fixtures/ (layout: http_client.fixture_path):
+  python scripts/replay_server.py record --from-cache          # pages in the on-disk HTTP cache
+  python scripts/replay_server.py record --url https://mtgdecks.net/Premodern ...
+  HTTP_RECORD_DIR=data/fixtures python scripts/update_data_monthly.py --no-replace   # everything a run fetches
+
+serve — replay them from a local http.server, with latency and injected failures
+(403, 429 with Retry-After, and requests that hang past the client's timeout).
+URLs without a fixture get a synthetic stand-in page (scripts/html_fixtures.py)
+unless --no-synthetic; listings end with a 404 after --listing-pages pages:
+  python scripts/replay_server.py serve --port 8766 --latency 0.3 --error-rate 0.05
+  MTGDECKS_URL=http://127.0.0.1:8766 python update_decklists.py --archetypes Goblins
+
+bench — serve, then run the monthly ingestion, get_recent_top_decks() and
+update_decklists.update_archetype() end-to-end against it; checks the results,
+reports throughput and exits non-zero on failure (usable in CI):
+  python scripts/replay_server.py bench [--latency 0.2] [--error-rate 0.05]
+"""
+import argparse
+import os
+import random
+import re
+import sys
+import threading
+import time
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+import html_fixtures
+from html_fixtures import FIXTURES_DIR
+
+LIVE_URL = "https://mtgdecks.net"
+# src/ is imported lazily: http_client reads MTGDECKS_URL when first imported, and
+# bench only knows the replay server's address once it is listening
+
+
+def synthetic_page(path: str, listing_pages: int) -> str | None:
+    """A stand-in for an mtgdecks.net page, chosen by URL shape; None for a 404."""
+    parts = [urllib.parse.unquote(p) for p in path.strip("/").split("/") if p]
+    if parts[:1] != ["Premodern"]:
+        return None
+    if len(parts) == 1:
+        return html_fixtures.tiers_page()
+    if parts[1].startswith("metagame:"):
+        return html_fixtures.meta_page()
+    if parts[1] == "winrates":
+        return html_fixtures.winrates_page()
+    deck = re.search(r'decklist-(\d+)$', parts[-1])
+    if deck:
+        return html_fixtures.decklist_page(int(deck.group(1)) % 1000)
+    page = re.fullmatch(r'page:(\d+)', parts[-1])
+    number = int(page.group(1)) if page else 1
+    return html_fixtures.listing_page(seed=number) if number <= listing_pages else None
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    directory = FIXTURES_DIR
+    synthetic = True
+    listing_pages = 3
+    latency = 0.0          # mean seconds before answering (uniform ±50%)
+    error_rate = 0.0       # share of requests answered 403 or 429
+    timeout_rate = 0.0     # share of requests that hang `hang` seconds, then drop
+    hang = 30.0
+    rng = random.Random(0)
+    request_log: list[tuple[str, int]] = []
+
+    def log_message(self, fmt, *args):
+        pass  # keep test output quiet; request_log has the details
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        self.request_log.append((self.path, status))
+
+    def do_GET(self):
+        from src.http_client import fixture_path
+
+        if self.latency:
+            time.sleep(self.latency * (0.5 + self.rng.random()))
+        roll = self.rng.random()
+        if roll < self.timeout_rate:
+            time.sleep(self.hang)
+            self.request_log.append((self.path, 0))
+            self.close_connection = True
+            return
+        if roll < self.timeout_rate + self.error_rate:
+            if self.rng.random() < 0.5:
+                return self._send(429, b"Too Many Requests", {"Retry-After": "1"})
+            return self._send(403, b"<title>Just a moment...</title>")
+
+        path = fixture_path(self.directory, self.path)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8", errors="ignore") as f:
+                html = f.read()
+        else:
+            html = synthetic_page(urllib.parse.urlsplit(self.path).path, self.listing_pages) if self.synthetic else None
+        if html is None:
+            return self._send(404, b"Not Found")
+        # Absolute links of recorded pages point back at the replay server
+        html = html.replace(LIVE_URL, f"http://{self.headers.get('Host')}")
+        self._send(200, html.encode("utf-8"))
+
+
+def serve(port=0, **settings):
+    """Start the replay server on a background thread. Returns (server, base_url)."""
+    settings.setdefault("request_log", [])
+    if "seed" in settings:
+        settings["rng"] = random.Random(settings.pop("seed"))
+    handler = type("Handler", (ReplayHandler,), settings)
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def record(args):
+    from src.http_client import fetch_html, save_fixture
+
+    pages = []
+    if args.from_cache:
+        from src.http_cache import default_http_cache
+        cache = default_http_cache()
+        for url in cache.urls() if cache is not None else []:
+            if urllib.parse.urlsplit(url).netloc.endswith("mtgdecks.net"):
+                pages.append((url, cache.get(url).body))
+    for url in args.url or []:
+        try:
+            pages.append((url, fetch_html(url, timeout=20)))
+        except Exception as e:
+            print(f"  [!] {url}: {e}")
+    for url, body in pages:
+        save_fixture(args.out, url, body)
+        print(f"  {url}  ({len(body) / 1024:.0f} KB)")
+    print(f"Recorded {len(pages)} page(s) to {args.out}")
+
+
+def bench(args):
+    server, base_url = serve(directory=args.fixtures, synthetic=not args.no_synthetic, latency=args.latency,
+                             error_rate=args.error_rate, timeout_rate=args.timeout_rate, hang=args.hang,
+                             seed=args.seed)
+    os.environ["MTGDECKS_URL"] = base_url
+    os.environ["HTTP_CACHE_PATH"] = "off"  # measure the scrapers, not the cache
+    import streamlit as st
+    st.cache_data = lambda *a, **kw: (lambda f: f)
+    import update_data_monthly
+    import update_decklists
+    from src.mtgdecks_scraper import get_recent_top_decks
+
+    log = server.RequestHandlerClass.request_log
+    failures = []
+    print(f"Replaying {args.fixtures} at {base_url} (latency {args.latency}s, errors {args.error_rate:.0%}, "
+          f"timeouts {args.timeout_rate:.0%})\n")
+
+    def stage(name, run, check):
+        before, start = len(log), time.time()
+        result = run()
+        elapsed, requests = time.time() - start, len(log) - before
+        problem = check(result)
+        if problem:
+            failures.append(f"{name}: {problem}")
+        print(f"{name:<28} {requests:>3} requests {elapsed:6.1f}s  {requests / elapsed:5.1f} req/s  "
+              f"{'FAILED: ' + problem if problem else 'OK'}")
+
+    stage("monthly ingestion",
+          lambda: update_data_monthly.fetch_and_parse(update_data_monthly.ingestion_jobs("2026-01-01")),
+          lambda pages: next((f"{key} missing" for key, value in pages.items() if not value), None))
+    stage("get_recent_top_decks",
+          lambda: get_recent_top_decks("Goblins", limit=20),
+          lambda decks: None if decks and all(d["url"].startswith(base_url) for d in decks) else "no decks")
+    stage("update_archetype",
+          lambda: update_decklists.update_archetype("Goblins", [], args.max_decks),
+          lambda decks: None if decks and sum(bool(d.get("cards")) for d in decks) >= len(decks) * (1 - 2 * args.error_rate)
+          else "decks without cards")
+
+    statuses = {}
+    for _, status in log:
+        statuses[status] = statuses.get(status, 0) + 1
+    print(f"\nServed {len(log)} requests: " + ", ".join(f"{s or 'dropped'}: {n}" for s, n in sorted(statuses.items())))
+    server.shutdown()
+    print("OK" if not failures else "FAILED\n  " + "\n  ".join(failures))
+    return 1 if failures else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay harness for the mtgdecks.net scrapers")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    rec = sub.add_parser("record", help="Save pages as fixtures")
+    rec.add_argument("--url", action="append", help="Fetch this URL live and save it (repeatable)")
+    rec.add_argument("--from-cache", action="store_true", help="Save every mtgdecks.net page in the HTTP cache")
+    rec.add_argument("--out", default=FIXTURES_DIR)
+
+    for name in ("serve", "bench"):
+        p = sub.add_parser(name, help="Replay fixtures" if name == "serve" else "Run the scrapers against a replay")
+        p.add_argument("--fixtures", default=FIXTURES_DIR)
+        p.add_argument("--no-synthetic", action="store_true", help="404 for URLs without a fixture")
+        p.add_argument("--latency", type=float, default=0.2 if name == "bench" else 0.0)
+        p.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered 403/429")
+        p.add_argument("--timeout-rate", type=float, default=0.0, help="Share of requests left hanging")
+        p.add_argument("--hang", type=float, default=30.0, help="Seconds a hanging request is held")
+        p.add_argument("--seed", type=int, default=0)
+    sub.choices["serve"].add_argument("--port", type=int, default=8766)
+    sub.choices["serve"].add_argument("--listing-pages", type=int, default=3)
+    sub.choices["bench"].add_argument("--max-decks", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.command == "record":
+        return record(args)
+    if args.command == "bench":
+        sys.exit(bench(args))
+
+    server, base_url = serve(args.port, directory=args.fixtures, synthetic=not args.no_synthetic,
+                             listing_pages=args.listing_pages, latency=args.latency, error_rate=args.error_rate,
+                             timeout_rate=args.timeout_rate, hang=args.hang, seed=args.seed)
+    print(f"Replaying {args.fixtures} at {base_url} — run scrapers with MTGDECKS_URL={base_url}; Ctrl+C to stop")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,11 @@
 import urllib.request
 import gzip
-from bs4 import BeautifulSoup
-import re
 import json
 import time
 import math
 import os
 import shutil
+import sys
 from datetime import datetime
 
 def backup_data_folder():
@@ -19,11 +18,20 @@ def backup_data_folder():
     except Exception as e:
         print(f"Warning: Failed to create backup: {e}")
 
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data")
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+DATA_DIR = os.path.join(BASE_DIR, "data")
 MATRIX_FILE = os.path.join(DATA_DIR, "mtgdecks_matrix_90_days.json")
 DECKLISTS_FILE = os.path.join(DATA_DIR, "decklists.json")
 
 from playwright.sync_api import sync_playwright
+from src.card_names import normalize_card_name
+from src.deck_queue import DeckQueue
+from src.html_tables import strained_soup
+from src.listing_rows import parse_listing_rows, rank_points
+from src.http_client import MTGDECKS_URL
+from src.rate_limiter import limiter_for
+from src.refresh_schedule import DEFAULT_BUDGET, RefreshScheduler, print_plan
 
 global_page = None
 
@@ -32,12 +40,16 @@ def get_html(url):
     if not global_page:
         print("Playwright CDP not initialized.")
         return None
-    time.sleep(1.5)  # Be nice to the server
+    limiter = limiter_for(url)
+    limiter.wait()  # Be nice to the server: adaptive pace, slower after blocks
     try:
-        global_page.goto(url, wait_until="domcontentloaded", timeout=15000)
-        
+        response = global_page.goto(url, wait_until="domcontentloaded", timeout=15000)
+        if response is not None:
+            limiter.observe(response.status, response.headers.get("retry-after"))
+
         # Check for Cloudflare Turnstile block implicitly
         if "Just a moment..." in global_page.title():
+            limiter.backoff()
             print("\n🚨 CLOUDFLARE BLOCK DETECTED! 🚨")
             print("Please solve the CAPTCHA manually in your Chrome window (port 9222).")
             print("Waiting 15 seconds for you to solve it...")
@@ -54,7 +66,7 @@ def fetch_cards(deck_url):
     html = get_html(deck_url)
     if not html: return []
     
-    soup = BeautifulSoup(html, 'html.parser')
+    soup = strained_soup(html, 'tr')
     cards = []
     
     current_section = "Maindeck"
@@ -89,14 +101,17 @@ def fetch_cards(deck_url):
             name = name_tag.get_text(strip=True)
             cards.append({
                 "qty": qty, 
-                "name": name,
+                "name": normalize_card_name(name),
                 "section": current_section,
                 "type": current_type
             })
             
     return cards[:100]
 
-def scrape_archetype_decklists(archetype_name, max_pages=10, required_decks=20):
+DECK_FIELDS = ("player", "rank", "players", "event", "date", "url", "colors", "spice")
+
+def select_archetype_decks(archetype_name, max_pages=10, required_decks=20):
+    """The archetype's best `required_decks` decks from its listing pages, by TPS score (without cards)."""
     slug = archetype_name.replace(" ", "-").replace("(", "").replace(")", "").replace("'", "")
     
     # Custom slug overrides for MTGDecks
@@ -111,28 +126,10 @@ def scrape_archetype_decklists(archetype_name, max_pages=10, required_decks=20):
     
     print(f"\nScraping {archetype_name} (slug: {slug})...")
     
-    # Define rank priorities for scoring
-    rank_scores = {
-        '1st': 100, '1': 100,
-        '2nd': 85,  '2': 85,
-        '3rd': 70,  '3': 70,
-        '4th': 70,  '4': 70,
-        'top4': 70,
-        '5-0': 100, # MTGO League 5-0
-        '5th': 55,  '5': 55,
-        '6th': 55,  '6': 55,
-        '7th': 55,  '7': 55,
-        '8th': 55,  '8': 55,
-        'top8': 55,
-        'top16': 30,
-        'top32': 15,
-        'top64': 5
-    }
-    
     collected_candidates = []
     
     for page in range(1, max_pages + 1):
-        url = f"https://mtgdecks.net/Premodern/{slug}"
+        url = f"{MTGDECKS_URL}/Premodern/{slug}"
         if page > 1:
             url += f"/page:{page}"
             
@@ -141,91 +138,29 @@ def scrape_archetype_decklists(archetype_name, max_pages=10, required_decks=20):
         if not html:
             break
             
-        soup = BeautifulSoup(html, 'html.parser')
-        rows = soup.find_all('tr')
-        if not rows or len(rows) < 5:
+        rows = parse_listing_rows(html)
+        if not rows:
             break
             
         for row in rows:
-            cols = row.find_all('td')
-            if len(cols) < 6:
-                continue
-                
-            try:
-                rank_text = cols[0].get_text(strip=True).split('(')[0].strip()
-                player_td = cols[2]
-                deck_link = player_td.find('a')
-                if not deck_link: continue
-                deck_url = deck_link['href']
-                if deck_url.startswith('/'):
-                    deck_url = 'https://mtgdecks.net' + deck_url
-                
-                strong_tag = player_td.find('strong')
-                player = strong_tag.get_text(strip=True).replace('By', '').strip() if strong_tag else "Unknown"
-                event = cols[5].get_text(strip=True)
-                
-                players_text = cols[7].get_text(strip=True)
-                players = int(re.sub(r'\D', '', players_text)) if players_text and re.sub(r'\D', '', players_text) else 0
-                date_text = cols[9].get_text(separator=' ', strip=True)
-                
-                # Colors
-                color_td = cols[3]
-                colors_list = []
-                for span in color_td.find_all('span', class_='ms-cost'):
-                    for cls in span.get('class', []):
-                        if cls.startswith('ms-') and len(cls) == 4 and cls != 'ms-cost':
-                            colors_list.append(cls.replace('ms-', '').upper())
-                            
-                # Spiciness
-                spice_td = cols[8]
-                spice_bar = spice_td.find('div', class_='progress-bar')
-                spice_val = int(spice_bar['aria-valuenow']) if spice_bar and 'aria-valuenow' in spice_bar.attrs else 0
-                
-                rank_lower = rank_text.lower()
-                
-                # TPS SCORING MODEL
-                # 1. Base points from rank
-                rank_points = rank_scores.get(rank_lower, 0)
-                if not rank_points:
-                    match_rank = re.search(r'(\d+)', rank_lower)
-                    if match_rank:
-                        val = int(match_rank.group(1))
-                        if val == 1: rank_points = 100
-                        elif val == 2: rank_points = 85
-                        elif val <= 4: rank_points = 70
-                        elif val <= 8: rank_points = 55
-                        elif val <= 16: rank_points = 30
-                        elif val <= 32: rank_points = 15
-                
-                if rank_points == 0: continue
-                
-                # 2. Logarithmic Multiplier (Log2(Players) / 5)
-                # 32 players -> 5.0/5.0 = 1.0x
-                # 64 players -> 6.0/5.0 = 1.2x
-                # 128 players -> 7.0/5.0 = 1.4x
-                # Ensure players is at least 8 to avoid negative/too low multipliers
-                if rank_lower == '5-0':
-                    # Treat MTGO leagues as a 32-player equivalent for scoring so they aren't penalized for having 0 players listed
-                    effective_players = max(players, 32) 
-                else:
-                    effective_players = max(players, 8)
+            # TPS SCORING MODEL
+            # 1. Base points from rank
+            points = rank_points(row.rank)
+            if points == 0: continue
+            
+            # 2. Logarithmic Multiplier (Log2(Players) / 5)
+            # 32 players -> 5.0/5.0 = 1.0x
+            # 64 players -> 6.0/5.0 = 1.2x
+            # 128 players -> 7.0/5.0 = 1.4x
+            # Ensure players is at least 8 to avoid negative/too low multipliers
+            if row.rank.lower() == '5-0':
+                # Treat MTGO leagues as a 32-player equivalent for scoring so they aren't penalized for having 0 players listed
+                effective_players = max(row.players, 32) 
+            else:
+                effective_players = max(row.players, 8)
 
-                multiplier = math.log2(effective_players) / 5.0
-                tps_score = rank_points * multiplier
-                
-                collected_candidates.append({
-                    "player": player,
-                    "rank": rank_text,
-                    "players": players,
-                    "event": event,
-                    "date": date_text,
-                    "url": deck_url,
-                    "colors": list(set(colors_list)),
-                    "spice": spice_val,
-                    "tps_score": tps_score
-                })
-            except Exception as e:
-                pass
+            multiplier = math.log2(effective_players) / 5.0
+            collected_candidates.append(row.to_deck(colors=list(set(row.colors)), tps_score=points * multiplier))
                 
     # Sort collected candidates by TPS score descending, then players descending
     collected_candidates.sort(key=lambda x: (x["tps_score"], x["players"]), reverse=True)
@@ -238,33 +173,64 @@ def scrape_archetype_decklists(archetype_name, max_pages=10, required_decks=20):
             unique_candidates.append(d)
             seen_urls.add(d['url'])
     
-    # Take the top N required
-    final_selection = unique_candidates[:required_decks]
-    
-    # Now fetch the cards only for the selected top decks
-    final_decks = []
-    for count, deck in enumerate(final_selection):
-        print(f"    [{count+1}/{len(final_selection)}] Fetching cards for {deck['rank']} by {deck['player']} (Players: {deck['players']}, Score: {deck['tps_score']:.2f})")
-        cards = fetch_cards(deck['url'])
-        
-        final_decks.append({
-            "player": deck["player"],
-            "rank": deck["rank"],
-            "players": deck["players"],
-            "event": deck["event"],
-            "date": deck["date"],
-            "url": deck["url"],
-            "colors": deck["colors"],
-            "spice": deck["spice"],
-            "cards": cards
-        })
-        
-    return final_decks
+    # Take the top N required; their cards are fetched as jobs of the deck queue
+    return [{k: d[k] for k in DECK_FIELDS} for d in unique_candidates[:required_decks]]
+
+def fetch_queued_decks(queue, arch=None):
+    """
+    Fetch the cards of every queued deck of `arch` (of all archetypes if None) that is
+    ready now. A failed deck backs off on its own; it is left for a later call once due.
+    """
+    while True:
+        job = queue.next_job(arch)
+        if job is None:
+            return
+        deck = job.deck
+        counts = queue.counts(job.archetype)
+        print(f"    [{counts.get('done', 0) + 1}/{sum(counts.values())}] Fetching cards for {deck['rank']} by {deck['player']} "
+              f"(Players: {deck['players']}{f', attempt {job.attempts + 1}' if job.attempts else ''})")
+        try:
+            cards = fetch_cards(job.url)
+        except Exception as e:
+            cards, error = [], str(e)
+        else:
+            error = "no cards on page"
+        if cards:
+            queue.complete(job.url, cards)
+        else:
+            queue.fail(job.url, error)
+
+def write_settled(queue, decklists_db, scheduler, known):
+    """
+    Save every archetype of `known` ({archetype: URLs stored before this run}) whose
+    decks have all settled, and record its refresh. Returns the updated decklists.
+    """
+    settled = [arch for arch in known if queue.settled(arch)]
+    if not settled:
+        return decklists_db
+    decklists_db = queue.materialize(decklists_db)
+    write_decklists(decklists_db)
+    for arch in settled:
+        before = known.pop(arch)
+        scheduler.record(arch, sum(d['url'] not in before for d in decklists_db.get(arch, [])))
+    return decklists_db
+
+def write_decklists(decklists_db):
+    """Write decklists.json atomically, so an interruption never leaves it half-written."""
+    tmp_path = DECKLISTS_FILE + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(decklists_db, f, indent=2)
+    os.replace(tmp_path, DECKLISTS_FILE)
 
 def main():
     import argparse
     parser = argparse.ArgumentParser(description='Scrape decklists from MTGDecks')
     parser.add_argument('--force', action='store_true', help='Force re-scraping even if decklists exist')
+    parser.add_argument('--restart', action='store_true', help='Discard an unfinished run in the deck queue instead of resuming it')
+    parser.add_argument('--retries', type=int, default=3, help='Retries per deck before giving up on it')
+    parser.add_argument('--backoff', type=float, default=60.0, help='Seconds before the first retry (doubles each time)')
+    parser.add_argument('--budget', type=int, default=DEFAULT_BUDGET,
+                        help=f'Estimated requests for refreshing archetypes that already have 20 decklists (default: {DEFAULT_BUDGET})')
     args = parser.parse_args()
     
     backup_data_folder()
@@ -316,29 +282,72 @@ def main():
             except:
                 pass
                 
-    for arch in valid_archetypes:
-        # RESUME LOGIC: Skip if we already have 20 decklists AND they have card data (unless --force)
-        if not args.force:
-            existing_decks = decklists_db.get(arch, [])
-            has_cards = any(d.get('cards') for d in existing_decks)
-            
-            if len(existing_decks) >= 20 and has_cards:
-                print(f"Skipping {arch} - already have {len(existing_decks)} decklists with card data.")
+    # Every deck is a job in the persistent queue: results are committed one by one and
+    # an interrupted run resumes where it stopped (a finished one starts a new run)
+    queue = DeckQueue(max_attempts=args.retries + 1, backoff=args.backoff)
+    if args.restart or queue.finished():
+        queue.reset()
+    else:
+        print(f"Resuming unfinished run: {queue.counts()}")
+
+    # Archetypes of an interrupted run first, then those short of 20 decklists, then -
+    # within the request budget - full ones by staleness × meta share (all with --force)
+    scheduler = RefreshScheduler(decklists_db)
+    cost = lambda expected_new: 10 + math.ceil(expected_new)  # listing pages + new decklists
+
+    def is_full(arch):
+        existing_decks = decklists_db.get(arch, [])
+        return len(existing_decks) >= 20 and any(d.get('cards') for d in existing_decks)
+
+    queued = [a for a in valid_archetypes if queue.has_archetype(a)]
+    rest = [a for a in valid_archetypes if a not in queued]
+    if args.force:
+        targets = queued + [s.archetype for s in scheduler.plan(rest, budget=0, cost=cost)]
+    else:
+        short = [s.archetype for s in scheduler.plan([a for a in rest if not is_full(a)], budget=0, cost=cost)]
+        full = [a for a in rest if is_full(a)]
+        stale = scheduler.plan(full, args.budget, cost)
+        print(f"\nRefreshing {len(short)} archetype(s) short of 20 decklists, plus by staleness:")
+        print_plan(stale, len(full) - len(stale))
+        targets = queued + short + [s.archetype for s in stale]
+
+    known = {}  # archetypes being refreshed -> URLs stored before this run
+    for arch in targets:
+        if not queue.has_archetype(arch):
+            try:
+                # Fresh scan of 10 pages to find the best 20 decks
+                queue.enqueue(arch, select_archetype_decks(arch, max_pages=10, required_decks=20))
+            except Exception as e:
+                print(f"Critical error on {arch}: {e}")
                 continue
+            # Decks we already have are not fetched again
+            for deck in decklists_db.get(arch, []):
+                if deck.get('cards'):
+                    queue.complete(deck['url'], deck['cards'])
+        else:
+            print(f"\nResuming {arch}: {queue.counts(arch)}")
 
-        try:
-            # Fresh scan of 10 pages to find the best 20 decks
-            decks = scrape_archetype_decklists(arch, max_pages=10, required_decks=20)
-            if decks:
-                decklists_db[arch] = decks
-                
-                # Save progressively
-                with open(DECKLISTS_FILE, 'w', encoding='utf-8') as f:
-                    json.dump(decklists_db, f, indent=2)
-            
-        except Exception as e:
-            print(f"Critical error on {arch}: {e}")
-            
+        known[arch] = {d['url'] for d in decklists_db.get(arch, [])}
+        fetch_queued_decks(queue, arch)
+        # Save progressively; an archetype with decks backing off is saved once they settle
+        decklists_db = write_settled(queue, decklists_db, scheduler, known)
+
+    # Failed decks are retried as they come due, once every archetype had its turn
+    while known:
+        retry_at = queue.next_retry()
+        if retry_at is None:
+            break
+        wait = max(0.0, retry_at - time.time())
+        if wait:
+            print(f"\nWaiting {wait:.0f}s before retrying failed decks of {', '.join(known)}...")
+            time.sleep(wait)
+        fetch_queued_decks(queue)
+        decklists_db = write_settled(queue, decklists_db, scheduler, known)
+
+    queue.mark_finished()
+    failed = queue.counts().get('failed', 0)
+    if failed:
+        print(f"\n{failed} decks failed after {args.retries} retries and were saved without cards.")
     print("\nScraping complete! Data saved to data/decklists.json.")
 
 if __name__ == "__main__":
@@ -0,0 +1,136 @@
+"""
+Tiny local stand-in for the Scryfall endpoints Mana Check uses, for offline testing.
+
+Serves POST /cards/collection and GET /cards/named?exact=|fuzzy= from a Scryfall bulk
+JSON file (--cards) or, by default, from the local card database. Every request is
+counted, so a run shows how many round-trips a lookup cost.
+
+Usage:
+  python scripts/scryfall_standin.py --port 8765 [--cards oracle-cards.json]
+  SCRYFALL_API_URL=http://127.0.0.1:8765 streamlit run app.py
+
+  python scripts/scryfall_standin.py --selftest   # resolve a 60-card list, print round-trips
+"""
+import argparse
+import difflib
+import json
+import os
+import sys
+import threading
+import urllib.parse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src.card_db import card_key, iter_bulk_cards, load_card_db
+
+COLLECTION_LIMIT = 75
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    cards: dict[str, dict] = {}
+    request_log: list[str] = []
+
+    def log_message(self, fmt, *args):
+        pass  # keep test output quiet; request_log has the details
+
+    def _send(self, status, body):
+        raw = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(raw)))
+        self.end_headers()
+        self.wfile.write(raw)
+
+    def do_POST(self):
+        self.request_log.append(f"POST {self.path}")
+        if urllib.parse.urlparse(self.path).path != "/cards/collection":
+            return self._send(404, {"object": "error", "status": 404})
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        identifiers = payload.get("identifiers", [])
+        if len(identifiers) > COLLECTION_LIMIT:
+            return self._send(422, {"object": "error", "status": 422,
+                                    "details": f"Too many identifiers (max {COLLECTION_LIMIT})"})
+        data, not_found = [], []
+        for ident in identifiers:
+            card = self.cards.get(card_key(ident.get("name", "")))
+            if card:
+                data.append(card)
+            else:
+                not_found.append(ident)
+        self._send(200, {"object": "list", "not_found": not_found, "data": data})
+
+    def do_GET(self):
+        self.request_log.append(f"GET {self.path}")
+        url = urllib.parse.urlparse(self.path)
+        query = urllib.parse.parse_qs(url.query)
+        if url.path != "/cards/named":
+            return self._send(404, {"object": "error", "status": 404})
+        if "exact" in query:
+            card = self.cards.get(card_key(query["exact"][0]))
+        else:
+            close = difflib.get_close_matches(card_key(query.get("fuzzy", [""])[0]), self.cards, n=1, cutoff=0.8)
+            card = self.cards[close[0]] if close else None
+        if card:
+            return self._send(200, card)
+        self._send(404, {"object": "error", "status": 404, "details": "No card found"})
+
+
+def load_cards(bulk_path=None):
+    """Card objects keyed by card_key, from a bulk file or the local card database."""
+    if bulk_path:
+        return {card_key(c["name"]): c for c in iter_bulk_cards(bulk_path)}
+    return {k: v for k, v in load_card_db().items()}
+
+
+def serve(cards, port=0):
+    """Start the stand-in on a background thread. Returns (server, base_url)."""
+    handler = type("Handler", (StandinHandler,), {"cards": cards, "request_log": []})
+    server = ThreadingHTTPServer(("127.0.0.1", port), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def selftest():
+    """Resolve 60 names the local database does not know and count round-trips."""
+    from src import scryfall
+
+    names = [f"Test Card {i}" for i in range(60)]
+    cards = {card_key(n): {"object": "card", "name": n, "type_line": "Instant",
+                           "mana_cost": "{1}{U}", "produced_mana": []} for n in names}
+    server, base_url = serve(cards)
+    try:
+        found, missing = scryfall.resolve_cards(names + ["Tset Card 1"], base_url=base_url)
+        log = server.RequestHandlerClass.request_log
+        print(f"Resolved {len(found)} of {len(names) + 1} names, not found: {missing}")
+        print(f"Round-trips: {len(log)} ({sum(r.startswith('POST') for r in log)} collection, "
+              f"{sum(r.startswith('GET') for r in log)} fuzzy)")
+        ok = len(found) == len(names) + 1 and len(log) == 2
+        print("OK" if ok else "FAILED")
+        return 0 if ok else 1
+    finally:
+        server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Scryfall stand-in server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cards", help="Scryfall bulk JSON file to serve (default: local card database)")
+    parser.add_argument("--selftest", action="store_true", help="Run a batched-lookup check and exit")
+    args = parser.parse_args()
+
+    if args.selftest:
+        sys.exit(selftest())
+
+    cards = load_cards(args.cards)
+    server, base_url = serve(cards, args.port)
+    print(f"Serving {len(cards)} cards at {base_url} — Ctrl+C to stop")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,21 @@
 import json
 import re
 import os
-import gzip
+import sys
 import time
 import argparse
-import urllib.request
-import urllib.error
-from bs4 import BeautifulSoup
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
+from functools import partial
+from html.parser import HTMLParser
+
+import requests
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from src import http_client
+from src.html_tables import find_table, table_html
 DATA_DIR = os.path.join(BASE_DIR, 'data')
 HISTORICAL_DIR = os.path.join(DATA_DIR, 'historical')
 
@@ -19,36 +25,60 @@ SOURCES = [
     ("180_days", "range:last180days", "metagame:last-6-months"),
 ]
 
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36',
-    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-    'Accept-Language': 'en-US,en;q=0.9',
-    'Accept-Encoding': 'gzip, deflate',
-    'Connection': 'keep-alive',
-}
-
-
-def fetch_html(url):
-    print(f"  Fetching: {url}")
-    try:
-        req = urllib.request.Request(url, headers=HEADERS)
-        with urllib.request.urlopen(req, timeout=20) as r:
-            raw = r.read()
-            if r.info().get('Content-Encoding') == 'gzip':
-                raw = gzip.decompress(raw)
-            return raw.decode('utf-8', errors='ignore')
-    except Exception as e:
-        print(f"  [!] Error fetching {url}: {e}")
-        return None
+# Seconds a cached page counts as fresh; older copies are revalidated (--cache-ttl)
+CACHE_TTL = 0
+FETCH_RETRIES = 2    # extra attempts per page (--retries)
+PARSE_WORKERS = 3    # processes parsing pages while the rest are still being fetched
+
+
+def fetch_html(url, retries=FETCH_RETRIES):
+    """
+    The page, or None after retries + 1 failed attempts (a 404 is not retried). The
+    host's rate limiter spaces the attempts and slows down after a 403/429/timeout.
+    """
+    for attempt in range(retries + 1):
+        print(f"  Fetching: {url}" + (f" (retry {attempt}/{retries})" if attempt else ""))
+        try:
+            return http_client.fetch_html(url, timeout=20, ttl=CACHE_TTL)
+        except Exception as e:
+            print(f"  [!] Error fetching {url}: {e}")
+            if isinstance(e, requests.HTTPError) and e.response is not None and e.response.status_code == 404:
+                return None
+    return None
+
+
+def fetch_and_parse(jobs, retries=FETCH_RETRIES):
+    """
+    Fetch stage and parse stage of the ingestion. jobs is {key: (url, parse)}. All
+    pages are fetched concurrently (at most MAX_IN_FLIGHT requests open, starts paced
+    by the host's rate limiter) and each is handed to a process pool for parsing as
+    soon as it arrives, while the other fetches are still in flight.
+    Returns {key: parse(html)}; a page that could not be fetched is parsed as None.
+    """
+    with ThreadPoolExecutor(max_workers=http_client.MAX_IN_FLIGHT) as fetchers, \
+            ProcessPoolExecutor(max_workers=PARSE_WORKERS) as parsers:
+        fetches = {fetchers.submit(fetch_html, url, retries): key for key, (url, _) in jobs.items()}
+        parses = {}
+        for fetched in as_completed(fetches):
+            key = fetches[fetched]
+            parses[parsers.submit(jobs[key][1], fetched.result())] = key
+        return {parses[parsed]: parsed.result() for parsed in as_completed(parses)}
+
+
+def ingestion_jobs(end_date_str):
+    """fetch_and_parse() jobs of a monthly run: the tiers, and each source's meta and winrates pages."""
+    jobs = {"tiers": (f"{http_client.MTGDECKS_URL}/Premodern", parse_tiers)}
+    for label, wr_path, meta_path in SOURCES:
+        jobs[label, "meta"] = (f"{http_client.MTGDECKS_URL}/Premodern/{meta_path}", parse_meta_shares)
+        jobs[label, "winrates"] = (f"{http_client.MTGDECKS_URL}/Premodern/winrates/{wr_path}",
+                                   partial(parse_matrix, time_frame=label, tier_mapping={}, end_date_str=end_date_str))
+    return jobs
 
 
-def get_tiers():
-    print("Fetching tiers...")
-    html = fetch_html('https://mtgdecks.net/Premodern')
+def parse_tiers(html):
     if not html:
         return {}
-    soup = BeautifulSoup(html, 'html.parser')
-    table = soup.find('table', id='allArchetypes')
+    table = find_table(html, id='allArchetypes')
     if not table:
         return {}
     tier_mapping = {}
@@ -63,67 +93,112 @@ def get_tiers():
     return tier_mapping
 
 
+class WinrateTableParser(HTMLParser):
+    """
+    Single streaming pass over the winrates table. Each cell is reduced to its text,
+    the <b> win percentage and the "N matches" line as the tokens go by; a row is
+    committed into the matrix at its </tr>, once its length is known.
+    """
+    _MATCHES = re.compile(r'([\d,]+)\s*matches')
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.opponents = None
+        self.n_columns = 0
+        self.n_rows = 0
+        self.matrix = {}
+        self.archetypes = set()
+        self._row = None    # [(text, bold, div)] of the current row
+        self._cell = None   # [text parts, bold parts, div parts] of the current cell
+        self._inside = []   # open <b>/<div> tags within the cell
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'tr':
+            self._row = []
+        elif tag in ('td', 'th') and self._row is not None:
+            self._cell = ([], [], [])
+            self._inside = []
+        elif tag in ('b', 'div') and self._cell is not None:
+            self._inside.append(tag)
+
+    def handle_endtag(self, tag):
+        if tag in ('b', 'div') and self._inside and self._inside[-1] == tag:
+            self._inside.pop()
+        elif tag in ('td', 'th') and self._cell is not None:
+            text, bold, div = self._cell
+            self._row.append(("".join(text), "".join(bold).strip(), " ".join(div).strip()))
+            self._cell = None
+        elif tag == 'tr' and self._row is not None:
+            self._commit(self._row)
+            self._row = None
+
+    def handle_data(self, data):
+        if self._cell is None:
+            return
+        self._cell[0].append(data.strip())
+        if 'b' in self._inside:
+            self._cell[1].append(data)
+        if 'div' in self._inside:
+            self._cell[2].append(data.strip())
+
+    def _commit(self, cells):
+        self.n_rows += 1
+        if self.opponents is None:
+            self.opponents = [text for text, _, _ in cells[2:]]
+            self.n_columns = len(cells)
+            return
+        if len(cells) < self.n_columns:
+            return
+        archetype = cells[0][0]
+        if not archetype:
+            return
+        self.archetypes.add(archetype)
+        row = self.matrix.setdefault(archetype, {})
+        for opp, (_, bold, div) in zip(self.opponents, cells[2:]):
+            m = self._MATCHES.fullmatch(div) if bold.isdigit() else None
+            if not m:
+                continue
+            win_pct = int(bold) / 100.0
+            matches = int(m.group(1).replace(',', ''))
+            wins = round(matches * win_pct)
+            row[opp] = {
+                "archetype": opp,
+                "wins": wins,
+                "losses": matches - wins,
+                "draws": 0,
+                "total_matches": matches,
+                "win_rate": round(wins / matches, 4) if matches > 0 else 0,
+            }
+            self.archetypes.add(opp)
+
+
 def parse_matrix(html, time_frame, tier_mapping, end_date_str):
     if not html:
         return None
-    soup = BeautifulSoup(html, 'html.parser')
-    table = soup.find('table', class_='winrates') or soup.find('table')
+    table = table_html(html, class_='winrates') or table_html(html)
     if not table:
         print(f"  [!] No winrate table found for {time_frame}")
         return None
 
-    rows = table.find_all('tr')
-    if len(rows) < 2:
+    parser = WinrateTableParser()
+    parser.feed(table)
+    parser.close()
+    if parser.n_rows < 2:
         return None
 
-    headers = [c.get_text(strip=True) for c in rows[0].find_all(['td', 'th'])]
-    opponents = headers[2:]
-
-    matrix = {}
-    archetypes = set()
-
-    for row in rows[1:]:
-        cells = row.find_all(['td', 'th'])
-        if len(cells) < len(headers):
-            continue
-        archetype = cells[0].get_text(strip=True)
-        if not archetype:
-            continue
-        archetypes.add(archetype)
-        if archetype not in matrix:
-            matrix[archetype] = {}
-
-        for i, opp in enumerate(opponents):
-            cell_html = str(cells[i + 2])
-            m = re.search(r'<b>(\d+)</b><span[^>]*>%</span>\s*<div[^>]*>([\d,]+)\s*matches</div>', cell_html)
-            if m:
-                win_pct = int(m.group(1)) / 100.0
-                matches = int(m.group(2).replace(',', ''))
-                wins = round(matches * win_pct)
-                matrix[archetype][opp] = {
-                    "archetype": opp,
-                    "wins": wins,
-                    "losses": matches - wins,
-                    "draws": 0,
-                    "total_matches": matches,
-                    "win_rate": round(wins / matches, 4) if matches > 0 else 0,
-                }
-                archetypes.add(opp)
-
     return {
         "time_frame": time_frame,
         "end_date": end_date_str,
-        "archetypes": sorted(list(archetypes)),
+        "archetypes": sorted(list(parser.archetypes)),
         "tiers": tier_mapping,
-        "matrix": matrix,
+        "matrix": parser.matrix,
     }
 
 
 def parse_meta_shares(html):
     if not html:
         return {}
-    soup = BeautifulSoup(html, 'html.parser')
-    table = soup.find('table', class_='table-striped')
+    table = find_table(html, class_='table-striped')
     if not table:
         return {}
     shares = {}
@@ -187,10 +262,15 @@ def save(data, path):
 
 
 def main():
+    global CACHE_TTL
     parser = argparse.ArgumentParser(description='MTGDecks Monthly Data Update')
     parser.add_argument('--no-replace', action='store_true', help='Do not overwrite root data files, only create historical backup')
     parser.add_argument('--date', help='Override current date for folder naming, e.g. 2026-05-01')
+    parser.add_argument('--cache-ttl', type=float, default=CACHE_TTL,
+                        help='Serve cached pages younger than this many seconds without a request (default: always revalidate)')
+    parser.add_argument('--retries', type=int, default=FETCH_RETRIES, help='Extra attempts for a page that fails to load')
     args = parser.parse_args()
+    CACHE_TTL = args.cache_ttl
 
     current_date = datetime.strptime(args.date, '%Y-%m-%d') if args.date else datetime.now()
     folder_name = current_date.strftime('%Y-%m-01')
@@ -203,24 +283,27 @@ def main():
         print("!!! NO-REPLACE MODE — root data files will NOT be updated !!!")
     print("VPN must be active (MTGDecks blocks requests without VPN).\n")
 
-    tiers = get_tiers()
+    # Tiers and every source's meta and winrates pages, fetched and parsed together;
+    # the tier mapping is attached to the matrices once all pages are in
+    jobs = ingestion_jobs(end_date_str)
+    start = time.time()
+    pages = fetch_and_parse(jobs, args.retries)
+    print(f"\nFetched and parsed {len(jobs)} pages in {time.time() - start:.1f}s")
+
+    tiers = pages["tiers"]
     print(f"  -> {len(tiers)} archetypes with tiers\n")
 
     all_data = {}
 
     for label, wr_path, meta_path in SOURCES:
         print(f"[{label}]")
-        time.sleep(1)
 
-        meta_shares = parse_meta_shares(fetch_html(f"https://mtgdecks.net/Premodern/{meta_path}"))
+        meta_shares = pages[label, "meta"]
         print(f"  -> {len(meta_shares)} meta shares")
-        time.sleep(1)
-
-        data = parse_matrix(
-            fetch_html(f"https://mtgdecks.net/Premodern/winrates/{wr_path}"),
-            label, tiers, end_date_str
-        )
 
+        data = pages[label, "winrates"]
+        if data:
+            data["tiers"] = tiers
         if not data:
             data = {
                 "time_frame": label,
@@ -0,0 +1,125 @@
+"""
+Persistent on-disk cache for Scryfall card lookups.
+
+Sits between the local card database and the network: resolved card records and
+confirmed misses survive app restarts and Streamlit Cloud redeploys, so the first
+users after a restart do not pay the lookup cost again. The cache is an SQLite file
+capped at `max_entries` rows with least-recently-used eviction; misses expire after
+`negative_ttl` seconds so a temporary spelling gap does not stick forever.
+"""
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+from src.card_db import card_key
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CARD_CACHE_PATH = os.path.join(BASE_DIR, "data", "card_cache.sqlite")
+DECKLISTS_PATH = os.path.join(BASE_DIR, "data", "decklists.json")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key       TEXT PRIMARY KEY,
+    record    TEXT,            -- card record as JSON, NULL for a confirmed miss
+    created   REAL NOT NULL,
+    last_used REAL NOT NULL
+) WITHOUT ROWID
+"""
+
+
+class CardCache:
+    def __init__(self, path=CARD_CACHE_PATH, max_entries=5000, negative_ttl=7 * 86400):
+        self.path = path
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()  # Streamlit serves sessions from several threads
+        with self._connect() as con:
+            con.execute(_SCHEMA)
+            con.execute("CREATE INDEX IF NOT EXISTS entries_lru ON entries(last_used)")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=10)
+        try:
+            with con:  # commit on success, roll back on error
+                yield con
+        finally:
+            con.close()
+
+    def __len__(self):
+        with self._connect() as con:
+            return con.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def get_many(self, names):
+        """
+        Split names into (hits {name: record}, known misses [name], unknown [name]).
+        Every entry touched has its last_used time refreshed.
+        """
+        keys = {name: card_key(name) for name in names}
+        now = time.time()
+        rows = {}
+        with self._lock, self._connect() as con:
+            unique = list(set(keys.values()))
+            for start in range(0, len(unique), 500):  # stay under SQLite's parameter limit
+                chunk = unique[start:start + 500]
+                marks = ",".join("?" * len(chunk))
+                for key, record, created in con.execute(
+                        f"SELECT key, record, created FROM entries WHERE key IN ({marks})", chunk):
+                    if record is None and now - created > self.negative_ttl:
+                        continue  # expired miss — look it up again
+                    rows[key] = record
+            con.executemany("UPDATE entries SET last_used = ? WHERE key = ?",
+                            [(now, k) for k in rows])
+
+        hits, misses, unknown = {}, [], []
+        for name, key in keys.items():
+            if key not in rows:
+                unknown.append(name)
+            elif rows[key] is None:
+                misses.append(name)
+            else:
+                hits[name] = json.loads(rows[key])
+        return hits, misses, unknown
+
+    def put_many(self, found, not_found=()):
+        """Store resolved records and confirmed misses, then evict down to max_entries."""
+        now = time.time()
+        rows = [(card_key(n), json.dumps(rec), now, now) for n, rec in found.items()]
+        rows += [(card_key(n), None, now, now) for n in not_found]
+        if not rows:
+            return
+        with self._lock, self._connect() as con:
+            con.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)", rows)
+            excess = con.execute("SELECT COUNT(*) FROM entries").fetchone()[0] - self.max_entries
+            if excess > 0:
+                con.execute(
+                    "DELETE FROM entries WHERE key IN "
+                    "(SELECT key FROM entries ORDER BY last_used ASC LIMIT ?)", (excess,))
+
+
+def decklist_card_names(path=DECKLISTS_PATH):
+    """Every distinct card name in data/decklists.json."""
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        decklists = json.load(f)
+    names = {c["name"] for decks in decklists.values() for d in decks for c in d.get("cards", []) if c.get("name")}
+    return sorted(names)
+
+
+def warm_from_decklists(cache, path=DECKLISTS_PATH):
+    """Resolve every card seen in the stored decklists so it is cached before anyone asks."""
+    from src.scryfall import resolve_cards
+
+    names = decklist_card_names(path)
+    found, missing = resolve_cards(names, cache=cache)
+    return len(found), missing
+
+
+if __name__ == "__main__":
+    cache = CardCache()
+    n_found, missing = warm_from_decklists(cache)
+    print(f"Warmed card cache: {n_found} cards resolved, {len(missing)} not found, {len(cache)} cached entries")
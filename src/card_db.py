@@ -0,0 +1,279 @@
+"""
+Local card database for Mana Check.
+
+Built offline from a Scryfall bulk-data file by scripts/build_card_db.py and stored in
+data/card_db.sqlite (one row per card name: type line, mana cost, produced mana).
+The whole table is read into a dict on first use, so lookups are O(1) and offline.
+Without the file the database falls back to PREMODERN_LAND_DATA alone.
+"""
+import json
+import os
+import sqlite3
+import string
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CARD_DB_PATH = os.path.join(BASE_DIR, "data", "card_db.sqlite")
+
+COLORS = ["W", "U", "B", "R", "G"]
+
+# Hardcoded produced_mana for all common Premodern lands.
+# Keys are lowercase card names. Value: list of color symbols produced.
+# Folded into the card database at build time: Scryfall reports no produced_mana for
+# fetch lands, so these entries are what make Flooded Strand count as a W/U source.
+_LT = "Land"
+_BL = "Basic Land"
+PREMODERN_LAND_DATA: dict[str, tuple[list[str], str]] = {
+    # ── Basics ────────────────────────────────────────────────────────────────
+    "plains":                    (["W"], f"{_BL} — Plains"),
+    "island":                    (["U"], f"{_BL} — Island"),
+    "swamp":                     (["B"], f"{_BL} — Swamp"),
+    "mountain":                  (["R"], f"{_BL} — Mountain"),
+    "forest":                    (["G"], f"{_BL} — Forest"),
+    "snow-covered plains":       (["W"], f"{_BL} — Plains"),
+    "snow-covered island":       (["U"], f"{_BL} — Island"),
+    "snow-covered swamp":        (["B"], f"{_BL} — Swamp"),
+    "snow-covered mountain":     (["R"], f"{_BL} — Mountain"),
+    "snow-covered forest":       (["G"], f"{_BL} — Forest"),
+    # ── Original Duals ────────────────────────────────────────────────────────
+    "tundra":                    (["W", "U"], _LT),
+    "underground sea":           (["U", "B"], _LT),
+    "badlands":                  (["B", "R"], _LT),
+    "taiga":                     (["R", "G"], _LT),
+    "savannah":                  (["G", "W"], _LT),
+    "scrubland":                 (["W", "B"], _LT),
+    "volcanic island":           (["U", "R"], _LT),
+    "bayou":                     (["B", "G"], _LT),
+    "plateau":                   (["R", "W"], _LT),
+    "tropical island":           (["G", "U"], _LT),
+    # ── Onslaught Fetch Lands ─────────────────────────────────────────────────
+    "flooded strand":            (["W", "U"], _LT),
+    "polluted delta":            (["U", "B"], _LT),
+    "bloodstained mire":         (["B", "R"], _LT),
+    "wooded foothills":          (["R", "G"], _LT),
+    "windswept heath":           (["G", "W"], _LT),
+    # ── Mirage Fetch Lands ────────────────────────────────────────────────────
+    "flood plain":               (["W", "U"], _LT),
+    "bad river":                 (["U", "B"], _LT),
+    "rocky tar pit":             (["B", "R"], _LT),
+    "mountain valley":           (["R", "G"], _LT),
+    "grasslands":                (["G", "W"], _LT),
+    # ── Pain Lands ────────────────────────────────────────────────────────────
+    "adarkar wastes":            (["W", "U"], _LT),
+    "underground river":         (["U", "B"], _LT),
+    "sulfurous springs":         (["B", "R"], _LT),
+    "karplusan forest":          (["R", "G"], _LT),
+    "brushland":                 (["G", "W"], _LT),
+    "caves of koilos":           (["W", "B"], _LT),
+    "shivan reef":               (["U", "R"], _LT),
+    "llanowar wastes":           (["B", "G"], _LT),
+    "battlefield forge":         (["R", "W"], _LT),
+    "yavimaya coast":            (["G", "U"], _LT),
+    # ── Invasion Lair Lands (tap for one of three colors) ─────────────────────
+    "dromar's cavern":           (["W", "U", "B"], _LT),
+    "treva's ruins":             (["G", "W", "U"], _LT),
+    "darigaaz's caldera":        (["B", "R", "G"], _LT),
+    "crosis's catacombs":        (["U", "B", "R"], _LT),
+    "rith's grove":              (["R", "G", "W"], _LT),
+    # ── Filter Lands ─────────────────────────────────────────────────────────
+    "adarkar wastes":            (["W", "U"], _LT),   # duplicate key safe, last wins
+    # ── 5-color / Any-color Lands ─────────────────────────────────────────────
+    "city of brass":             (["W", "U", "B", "R", "G"], _LT),
+    "undiscovered paradise":     (["W", "U", "B", "R", "G"], _LT),
+    "gemstone mine":             (["W", "U", "B", "R", "G"], _LT),
+    "reflecting pool":           (["W", "U", "B", "R", "G"], _LT),
+    "grand coliseum":            (["W", "U", "B", "R", "G"], _LT),
+    "forbidden orchard":         (["W", "U", "B", "R", "G"], _LT),
+    "mana confluence":           (["W", "U", "B", "R", "G"], _LT),
+    "chromatic lantern":         (["W", "U", "B", "R", "G"], _LT),  # not a land but harmless
+    # ── Mono-color Special Lands ─────────────────────────────────────────────
+    "tolarian academy":          (["U"], _LT),
+    "gaea's cradle":             (["G"], _LT),
+    "serra's sanctum":           (["W"], _LT),
+    "phyrexian tower":           (["B"], _LT),
+    "shivan gorge":              (["R"], _LT),
+    "library of alexandria":     (["U"], _LT),
+    "high market":               (["W"], _LT),
+    "hall of the bandit lord":   (["R"], _LT),
+    "den of the bugbear":        (["R"], _LT),
+    "cave of koilos":            (["W", "B"], _LT),
+    # ── Colorless / Utility Lands (no colored mana production) ───────────────
+    "wasteland":                 ([], _LT),
+    "strip mine":                ([], _LT),
+    "ancient tomb":              ([], _LT),
+    "city of traitors":          ([], _LT),
+    "rishadan port":             ([], _LT),
+    "mishra's factory":          ([], _LT),
+    "urza's mine":               ([], _LT),
+    "urza's tower":              ([], _LT),
+    "urza's power plant":        ([], _LT),
+    "maze of ith":               ([], _LT),
+    "the tabernacle at pendrell vale": ([], _LT),
+    "bazaar of baghdad":         ([], _LT),
+    "karakas":                   (["W"], _LT),
+    "kjeldoran outpost":         (["W"], _LT),
+    "soldevi excavations":       (["U"], _LT),
+    "kjeldoran dead":            ([], _LT),  # not a land
+    "petrified field":           ([], _LT),
+    "dust bowl":                 ([], _LT),
+    "ghost quarter":             ([], _LT),
+    "horizon canopy":            (["G", "W"], _LT),
+    "murmuring bosk":            (["G", "W"], _LT),
+    "sea of clouds":             (["W", "U"], _LT),
+    "morphic pool":              (["U", "B"], _LT),
+    "luxury suite":              (["B", "R"], _LT),
+    "spire garden":              (["R", "G"], _LT),
+    "bountiful promenade":       (["G", "W"], _LT),
+    "tsabo's web":               ([], _LT),   # not a land
+    # ── Taplands (Invasion, Apocalypse, etc.) ────────────────────────────────
+    "coastal tower":             (["W", "U"], _LT),
+    "urborg volcano":            (["U", "B"], _LT),
+    "tainted isle":              (["U", "B"], _LT),
+    "tainted field":             (["W", "B"], _LT),
+    "tainted wood":              (["B", "G"], _LT),
+    "tainted peak":              (["B", "R"], _LT),
+    "salt marsh":                (["U", "B"], _LT),
+    "elfhame palace":            (["G", "W"], _LT),
+    "shivan oasis":              (["R", "G"], _LT),
+    "irrigation ditch":          (["W", "U"], _LT),
+    "geothermal crevice":        (["B", "R"], _LT),
+    "peat bog":                  (["B"], _LT),
+    "river delta":               (["U", "B"], _LT),
+    "tinder farm":               (["R", "G"], _LT),
+    "rushwood grove":            (["G", "W"], _LT),
+    "sulfur vent":               (["B", "R"], _LT),
+    "mountain stronghold":       (["R"], _LT),
+    "skyshroud forest":          (["G", "U"], _LT),
+}
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS cards (
+    key           TEXT PRIMARY KEY,
+    name          TEXT NOT NULL,
+    type_line     TEXT NOT NULL,
+    mana_cost     TEXT NOT NULL,
+    produced_mana TEXT NOT NULL
+) WITHOUT ROWID
+"""
+
+
+def card_key(name: str) -> str:
+    """Normalized lookup key: lowercase, trimmed, split cards as 'fire // ice'."""
+    key = " ".join(name.lower().strip().split())
+    if "/" in key and "//" not in key:
+        key = " // ".join(p.strip() for p in key.split("/"))
+    return key
+
+
+def _record(name: str, type_line: str, mana_cost: str, produced: list[str] | str) -> dict:
+    """Card record in the same shape as a Scryfall card object."""
+    return {
+        "object": "card",
+        "name": name,
+        "type_line": type_line,
+        "mana_cost": mana_cost,
+        "produced_mana": [c for c in produced if c in COLORS],
+    }
+
+
+def card_from_scryfall(card: dict) -> dict:
+    """Reduce a Scryfall card object to the fields Mana Check uses."""
+    mana_cost = card.get("mana_cost") or ""
+    if not mana_cost and card.get("card_faces"):
+        mana_cost = card["card_faces"][0].get("mana_cost", "")
+    type_line = card.get("type_line") or ""
+    if not type_line and card.get("card_faces"):
+        type_line = card["card_faces"][0].get("type_line", "")
+    return _record(card.get("name", ""), type_line, mana_cost, card.get("produced_mana") or [])
+
+
+def _land_overrides(existing: dict[str, dict]) -> dict[str, dict]:
+    """
+    PREMODERN_LAND_DATA entries to fold in. An entry replaces the bulk record only when
+    the real card is a land (or unknown) — a few keys are non-lands kept as harmless
+    colourless "lands" and must not mask real data such as a creature's mana cost.
+    """
+    out = {}
+    for key, (produced, type_line) in PREMODERN_LAND_DATA.items():
+        real = existing.get(key)
+        if real is not None and "Land" not in real["type_line"]:
+            continue
+        name = real["name"] if real else string.capwords(key)
+        out[key] = _record(name, real["type_line"] if real else type_line, "", produced)
+    return out
+
+
+def iter_bulk_cards(path: str):
+    """
+    Stream cards from a Scryfall bulk-data JSON file. Bulk files put one card per line,
+    so they can be read without loading the whole array; anything else falls back to json.load.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        first = f.readline().strip()
+        if first != "[":
+            f.seek(0)
+            yield from json.load(f)
+            return
+        for line in f:
+            line = line.strip().rstrip(",")
+            if line and line != "]":
+                yield json.loads(line)
+
+
+def build_card_db(cards, path: str = CARD_DB_PATH) -> int:
+    """Write card records (Scryfall card objects) plus land overrides to an SQLite file."""
+    records: dict[str, dict] = {}
+    for card in cards:
+        rec = card_from_scryfall(card)
+        if not rec["name"]:
+            continue
+        records.setdefault(card_key(rec["name"]), rec)
+        # Also index the front face of split / MDFC cards ("Fire" for "Fire // Ice")
+        if " // " in rec["name"]:
+            records.setdefault(card_key(rec["name"].split(" // ")[0]), rec)
+    records.update(_land_overrides(records))
+
+    tmp = path + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    con = sqlite3.connect(tmp)
+    try:
+        con.execute(_SCHEMA)
+        con.executemany(
+            "INSERT INTO cards VALUES (?, ?, ?, ?, ?)",
+            ((k, r["name"], r["type_line"], r["mana_cost"], "".join(r["produced_mana"]))
+             for k, r in records.items()),
+        )
+        con.commit()
+        con.execute("VACUUM")
+    finally:
+        con.close()
+    os.replace(tmp, path)  # atomic swap — the app never sees a half-written file
+    return len(records)
+
+
+_DB_CACHE: dict[str, dict[str, dict]] = {}
+
+
+def load_card_db(path: str = CARD_DB_PATH) -> dict[str, dict]:
+    """Read the whole card table into a dict once per process."""
+    if path in _DB_CACHE:
+        return _DB_CACHE[path]
+    cards: dict[str, dict] = {}
+    if os.path.exists(path):
+        con = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        try:
+            for key, name, type_line, mana_cost, produced in con.execute("SELECT * FROM cards"):
+                cards[key] = _record(name, type_line, mana_cost, produced)
+        finally:
+            con.close()
+    else:
+        cards = _land_overrides({})
+    _DB_CACHE[path] = cards
+    return cards
+
+
+def lookup_card(name: str, path: str = CARD_DB_PATH) -> dict | None:
+    """Card record for a name, or None if it is not in the local database."""
+    rec = load_card_db(path).get(card_key(name))
+    return dict(rec) if rec else None
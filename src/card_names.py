@@ -0,0 +1,136 @@
+"""
+Offline fuzzy card-name resolver.
+
+A trigram index over every name in the local card database finds candidates for a
+misspelled name by shared trigrams (Dice coefficient); the best few are re-ranked by
+edit distance (Damerau–Levenshtein, adjacent swaps count as one edit). "Brainstrom"
+and "Goblin Lacky" resolve without a network round-trip.
+
+A name resolves when the closest candidate is within the edit budget for its length
+(none for names of 4 characters or fewer) and strictly closer than the runner-up. Otherwise the closest candidates come back as
+suggestions.
+
+Matching only happens when the full card database file is present, so the land
+table fallback cannot "fix" a real card into a land. normalize_card_name() is the
+form the scrapers use: the canonical name, or the input unchanged.
+"""
+import os
+from collections import Counter
+from dataclasses import dataclass
+
+from src.card_db import CARD_DB_PATH, card_key, load_card_db
+
+CANDIDATES = 25   # trigram candidates re-ranked by edit distance
+SUGGESTIONS = 3
+
+
+def _trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int | None = None) -> int:
+    """Optimal string alignment distance; stops early once every cell exceeds limit."""
+    if a == b:
+        return 0
+    if limit is not None and abs(len(a) - len(b)) > limit:
+        return limit + 1
+    prev2, prev = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = ca != cb
+            cur[j] = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            if prev2 is not None and i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                cur[j] = min(cur[j], prev2[j - 2] + 1)
+        if limit is not None and min(cur) > limit:
+            return limit + 1
+        prev2, prev = prev, cur
+    return prev[-1]
+
+
+def edit_budget(key: str) -> int:
+    """
+    Edits tolerated for a name of this length: none up to 4 characters (a short real
+    name one edit from another card must not be rewritten), 1 up to 11, then 1 per 6.
+    """
+    return 0 if len(key) <= 4 else max(1, len(key) // 6)
+
+
+@dataclass
+class NameMatch:
+    name: str          # canonical card name
+    distance: int      # edit distance between the normalized keys
+    similarity: float  # trigram Dice coefficient
+
+
+class NameIndex:
+    def __init__(self, names):
+        self.names: dict[str, str] = {}          # key → canonical name
+        for name in names:
+            self.names.setdefault(card_key(name), name)
+        self.keys = list(self.names)
+        self.grams = [_trigrams(k) for k in self.keys]
+        self.postings: dict[str, list[int]] = {}
+        for i, grams in enumerate(self.grams):
+            for g in grams:
+                self.postings.setdefault(g, []).append(i)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def candidates(self, name: str, limit: int = SUGGESTIONS) -> list[NameMatch]:
+        """Closest names by edit distance among the best trigram matches."""
+        key = card_key(name)
+        grams = _trigrams(key)
+        shared = Counter()
+        for g in grams:
+            shared.update(self.postings.get(g, ()))
+        ranked = []
+        for i, n in shared.most_common(CANDIDATES):
+            dice = 2 * n / (len(grams) + len(self.grams[i]))
+            ranked.append(NameMatch(self.names[self.keys[i]], edit_distance(key, self.keys[i]), dice))
+        ranked.sort(key=lambda m: (m.distance, -m.similarity))
+        return ranked[:limit]
+
+    def resolve(self, name: str) -> tuple[str | None, list[str]]:
+        """(canonical name or None, suggestions). Exact matches skip the fuzzy search."""
+        key = card_key(name)
+        if key in self.names:
+            return self.names[key], []
+        matches = self.candidates(name, SUGGESTIONS)
+        if not matches:
+            return None, []
+        best = matches[0]
+        unique = len(matches) == 1 or matches[1].distance > best.distance
+        budget = edit_budget(key)
+        if budget and best.distance <= budget and unique:
+            return best.name, []
+        return None, [m.name for m in matches]
+
+
+_INDEXES: dict[str, NameIndex] = {}
+
+
+def default_index(path: str = CARD_DB_PATH) -> NameIndex:
+    """Index over the local card database, built once per process."""
+    if path not in _INDEXES:
+        _INDEXES[path] = NameIndex(rec["name"] for rec in load_card_db(path).values())
+    return _INDEXES[path]
+
+
+def resolve_card_name(name: str, path: str = CARD_DB_PATH) -> tuple[str | None, list[str]]:
+    """
+    Resolve a possibly misspelled card name offline: (canonical or None, suggestions).
+    Without the card database file (land table only) nothing is matched.
+    """
+    if not os.path.exists(path):
+        return None, []
+    return default_index(path).resolve(name)
+
+
+def normalize_card_name(name: str, path: str = CARD_DB_PATH) -> str:
+    """Canonical spelling of a scraped card name, or the name unchanged if unsure."""
+    name = " ".join(name.split())
+    canonical, _ = resolve_card_name(name, path) if name else (None, [])
+    return canonical or name
@@ -0,0 +1,186 @@
+"""
+Persistent, resumable job queue for decklist scraping.
+
+One job per deck URL, in an SQLite file next to the data: the deck's listing metadata,
+its state (pending → done, or failed), attempts, the time of the next retry and the
+fetched cards. Every result is committed the moment it arrives, so an interruption
+(Cloudflare, a crash, Ctrl+C) loses at most the deck being fetched; the next run
+resumes with the first unfinished job. decklists.json is materialized from the queue.
+
+Failed jobs are retried with exponential backoff (backoff · 2^(attempts − 1) seconds)
+until max_attempts; after that they stay failed and materialize with no cards.
+
+A run is the set of archetypes listed since the queue was last reset. The scraper
+resets it at the start of a run only if the previous one finished.
+"""
+import contextlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DECK_QUEUE_PATH = os.path.join(BASE_DIR, "data", "deck_queue.sqlite")
+
+_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS archetypes (
+        archetype TEXT PRIMARY KEY,
+        position  INTEGER NOT NULL,     -- order archetypes were listed in
+        listed    REAL NOT NULL
+    )""",
+    """
+    CREATE TABLE IF NOT EXISTS jobs (
+        url          TEXT PRIMARY KEY,
+        archetype    TEXT NOT NULL,
+        position     INTEGER NOT NULL,  -- rank of the deck within its archetype
+        deck         TEXT NOT NULL,     -- listing metadata as JSON
+        state        TEXT NOT NULL DEFAULT 'pending',   -- pending / done / failed
+        attempts     INTEGER NOT NULL DEFAULT 0,
+        next_attempt REAL NOT NULL DEFAULT 0,
+        last_error   TEXT,
+        cards        TEXT,              -- JSON, once done
+        updated      REAL NOT NULL
+    )""",
+    "CREATE INDEX IF NOT EXISTS jobs_by_archetype ON jobs(archetype, position)",
+    "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)",
+]
+
+
+@dataclass
+class DeckJob:
+    url: str
+    archetype: str
+    deck: dict
+    attempts: int
+
+
+class DeckQueue:
+    def __init__(self, path=DECK_QUEUE_PATH, max_attempts=4, backoff=60.0):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._lock = threading.Lock()
+        with self._connect() as con:
+            for statement in _SCHEMA:
+                con.execute(statement)
+
+    @contextlib.contextmanager
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=10)
+        try:
+            with con:  # commit on success, roll back on error
+                yield con
+        finally:
+            con.close()
+
+    # ── Runs ──────────────────────────────────────────────────────────────────
+    def finished(self) -> bool:
+        """True if the last run was marked finished, or nothing was ever queued."""
+        with self._connect() as con:
+            row = con.execute("SELECT value FROM meta WHERE key = 'finished'").fetchone()
+            empty = con.execute("SELECT COUNT(*) FROM archetypes").fetchone()[0] == 0
+        return empty or (row is not None and row[0] == "1")
+
+    def reset(self):
+        """Start a new run: forget every archetype and job."""
+        with self._lock, self._connect() as con:
+            con.execute("DELETE FROM jobs")
+            con.execute("DELETE FROM archetypes")
+            con.execute("INSERT OR REPLACE INTO meta VALUES ('finished', '0')")
+
+    def mark_finished(self):
+        with self._lock, self._connect() as con:
+            con.execute("INSERT OR REPLACE INTO meta VALUES ('finished', '1')")
+
+    # ── Jobs ──────────────────────────────────────────────────────────────────
+    def has_archetype(self, archetype: str) -> bool:
+        with self._connect() as con:
+            return con.execute("SELECT 1 FROM archetypes WHERE archetype = ?", (archetype,)).fetchone() is not None
+
+    def enqueue(self, archetype: str, decks: list[dict]):
+        """Queue an archetype's selected decks (in rank order) in one transaction."""
+        now = time.time()
+        with self._lock, self._connect() as con:
+            position = con.execute("SELECT COUNT(*) FROM archetypes").fetchone()[0]
+            con.execute("INSERT OR REPLACE INTO archetypes VALUES (?, ?, ?)", (archetype, position, now))
+            con.executemany(
+                "INSERT OR IGNORE INTO jobs (url, archetype, position, deck, updated) VALUES (?, ?, ?, ?, ?)",
+                [(d["url"], archetype, i, json.dumps(d, ensure_ascii=False), now) for i, d in enumerate(decks)])
+
+    def next_job(self, archetype: str | None = None) -> DeckJob | None:
+        """The first job ready to run now (pending, or failed and due for a retry)."""
+        query = ("SELECT url, archetype, deck, attempts FROM jobs "
+                 "WHERE (state = 'pending' OR (state = 'failed' AND attempts < ?)) AND next_attempt <= ?")
+        params: list = [self.max_attempts, time.time()]
+        if archetype is not None:
+            query += " AND archetype = ?"
+            params.append(archetype)
+        query += " ORDER BY (SELECT position FROM archetypes a WHERE a.archetype = jobs.archetype), position LIMIT 1"
+        with self._connect() as con:
+            row = con.execute(query, params).fetchone()
+        if row is None:
+            return None
+        url, arch, deck, attempts = row
+        return DeckJob(url, arch, json.loads(deck), attempts)
+
+    def next_retry(self, archetype: str | None = None) -> float | None:
+        """When the earliest backed-off job becomes due (None if no retries are left)."""
+        query = "SELECT MIN(next_attempt) FROM jobs WHERE state = 'failed' AND attempts < ?"
+        params: list = [self.max_attempts]
+        if archetype is not None:
+            query += " AND archetype = ?"
+            params.append(archetype)
+        with self._connect() as con:
+            return con.execute(query, params).fetchone()[0]
+
+    def complete(self, url: str, cards: list[dict]):
+        with self._lock, self._connect() as con:
+            con.execute("UPDATE jobs SET state = 'done', cards = ?, last_error = NULL, updated = ? WHERE url = ?",
+                        (json.dumps(cards, ensure_ascii=False), time.time(), url))
+
+    def fail(self, url: str, error: str):
+        """Record a failed attempt and schedule the retry with exponential backoff."""
+        now = time.time()
+        with self._lock, self._connect() as con:
+            attempts = con.execute("SELECT attempts FROM jobs WHERE url = ?", (url,)).fetchone()[0] + 1
+            con.execute(
+                "UPDATE jobs SET state = 'failed', attempts = ?, next_attempt = ?, last_error = ?, updated = ? "
+                "WHERE url = ?", (attempts, now + self.backoff * 2 ** (attempts - 1), error, now, url))
+
+    def counts(self, archetype: str | None = None) -> dict[str, int]:
+        query = "SELECT state, COUNT(*) FROM jobs"
+        params: tuple = ()
+        if archetype is not None:
+            query += " WHERE archetype = ?"
+            params = (archetype,)
+        with self._connect() as con:
+            return dict(con.execute(query + " GROUP BY state", params).fetchall())
+
+    def settled(self, archetype: str) -> bool:
+        """No job of the archetype is pending or waiting for a retry."""
+        with self._connect() as con:
+            return con.execute(
+                "SELECT COUNT(*) FROM jobs WHERE archetype = ? AND "
+                "(state = 'pending' OR (state = 'failed' AND attempts < ?))",
+                (archetype, self.max_attempts)).fetchone()[0] == 0
+
+    # ── Output ────────────────────────────────────────────────────────────────
+    def materialize(self, decklists: dict | None = None) -> dict[str, list[dict]]:
+        """
+        decklists.json content: `decklists` with every settled archetype in the queue
+        replaced by its decks in rank order (failed decks with no cards).
+        """
+        decklists = dict(decklists or {})
+        with self._connect() as con:
+            archetypes = [a for (a,) in con.execute("SELECT archetype FROM archetypes ORDER BY position")]
+            rows = con.execute("SELECT archetype, deck, cards FROM jobs ORDER BY archetype, position").fetchall()
+        by_archetype: dict[str, list[dict]] = {}
+        for arch, deck, cards in rows:
+            by_archetype.setdefault(arch, []).append({**json.loads(deck), "cards": json.loads(cards) if cards else []})
+        for arch in archetypes:
+            if by_archetype.get(arch) and self.settled(arch):
+                decklists[arch] = by_archetype[arch]
+        return decklists
@@ -0,0 +1,66 @@
+"""
+Targeted HTML parsing for the scrapers.
+
+An mtgdecks.net page is mostly navigation, scripts and ads around the one table a
+scraper reads. Instead of building a BeautifulSoup tree for the whole page,
+find_table() cuts the target table out of the raw HTML — its start tag matched by id
+or class, nested <table> tags balanced — and parses only that slice. Pages whose rows
+are spread over several tables (decklists) use strained_soup(), a SoupStrainer parse
+that only builds the tags asked for.
+
+scripts/bench_html_parsing.py measures both against full-page parsing on saved pages.
+"""
+import re
+from html import unescape
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+_TABLE_TAG = re.compile(r'<(/?)table\b[^>]*>', re.IGNORECASE)
+_ATTR = re.compile(r'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s"\'>]+))')
+
+
+def tag_attributes(start_tag: str) -> dict[str, str]:
+    """Attributes of a raw start tag (or of the text after its name), entities decoded."""
+    return {m.group(1).lower(): unescape(next(v for v in m.groups()[1:] if v is not None))
+            for m in _ATTR.finditer(start_tag)}
+
+
+def _wanted(start_tag: str, id: str | None, class_: str | None) -> bool:
+    attrs = tag_attributes(start_tag)
+    if id is not None and attrs.get('id') != id:
+        return False
+    if class_ is not None and class_ not in attrs.get('class', '').split():
+        return False
+    return True
+
+
+def table_html(html: str, id: str | None = None, class_: str | None = None) -> str | None:
+    """
+    Raw HTML of the first <table> with this id / class (the first table if neither is
+    given), found with a regex scan instead of a parse. None if there is no such table.
+    """
+    depth = 0
+    start = None
+    for m in _TABLE_TAG.finditer(html):
+        closing = bool(m.group(1))
+        if start is None:
+            if not closing and _wanted(m.group(0), id, class_):
+                start, depth = m.start(), 1
+            continue
+        depth += -1 if closing else 1
+        if depth == 0:
+            return html[start:m.end()]
+    return html[start:] if start is not None else None  # unclosed: the parser closes it
+
+
+def find_table(html: str | None, id: str | None = None, class_: str | None = None):
+    """The table as a BeautifulSoup Tag, parsed on its own; None if the page lacks it."""
+    fragment = table_html(html, id, class_) if html else None
+    if fragment is None:
+        return None
+    return BeautifulSoup(fragment, 'html.parser').table
+
+
+def strained_soup(html: str, names) -> BeautifulSoup:
+    """Parse only the given tags (with their contents), e.g. strained_soup(html, ['th', 'tr'])."""
+    return BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer(names))
@@ -0,0 +1,125 @@
+"""
+On-disk HTTP cache with conditional requests, shared by the scrapers.
+
+Keyed by URL, each entry holds the page body (zlib-compressed) with its ETag and
+Last-Modified validators. A copy younger than the caller's freshness TTL is served
+without touching the network; an older one is revalidated with If-None-Match /
+If-Modified-Since, and a 304 answer serves the stored body, so only headers cross
+the wire. Decklist pages practically never change, so re-running the decklist
+scrapers transfers almost no bodies.
+
+Like the card cache this is an SQLite file with least-recently-used eviction. Set
+HTTP_CACHE_PATH to move it, or to "off" to disable caching.
+"""
+import contextlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HTTP_CACHE_PATH = os.environ.get("HTTP_CACHE_PATH", os.path.join(BASE_DIR, "data", "http_cache.sqlite"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    url           TEXT PRIMARY KEY,
+    body          BLOB NOT NULL,   -- zlib-compressed UTF-8
+    etag          TEXT,
+    last_modified TEXT,
+    fetched       REAL NOT NULL,   -- last download or successful revalidation
+    last_used     REAL NOT NULL
+) WITHOUT ROWID
+"""
+
+
+@dataclass
+class CachedPage:
+    body: str
+    etag: str | None
+    last_modified: str | None
+    fetched: float
+
+    def age(self) -> float:
+        return time.time() - self.fetched
+
+    def validators(self) -> dict[str, str]:
+        """Conditional-request headers for revalidating this copy."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class HttpCache:
+    def __init__(self, path=HTTP_CACHE_PATH, max_entries=5000):
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()  # scrapers fetch from several threads
+        with self._connect() as con:
+            con.execute(_SCHEMA)
+            con.execute("CREATE INDEX IF NOT EXISTS pages_lru ON pages(last_used)")
+
+    @contextlib.contextmanager
+    def _connect(self):
+        con = sqlite3.connect(self.path, timeout=10)
+        try:
+            with con:  # commit on success, roll back on error
+                yield con
+        finally:
+            con.close()
+
+    def __len__(self):
+        with self._connect() as con:
+            return con.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def urls(self) -> list[str]:
+        with self._connect() as con:
+            return [url for (url,) in con.execute("SELECT url FROM pages ORDER BY url")]
+
+    def get(self, url: str) -> CachedPage | None:
+        with self._lock, self._connect() as con:
+            row = con.execute("SELECT body, etag, last_modified, fetched FROM pages WHERE url = ?",
+                              (url,)).fetchone()
+            if row is None:
+                return None
+            con.execute("UPDATE pages SET last_used = ? WHERE url = ?", (time.time(), url))
+        body, etag, last_modified, fetched = row
+        return CachedPage(zlib.decompress(body).decode("utf-8"), etag, last_modified, fetched)
+
+    def put(self, url: str, body: str, etag: str | None = None, last_modified: str | None = None):
+        """Store a freshly downloaded page, then evict down to max_entries."""
+        now = time.time()
+        row = (url, zlib.compress(body.encode("utf-8")), etag, last_modified, now, now)
+        with self._lock, self._connect() as con:
+            con.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?)", row)
+            excess = con.execute("SELECT COUNT(*) FROM pages").fetchone()[0] - self.max_entries
+            if excess > 0:
+                con.execute(
+                    "DELETE FROM pages WHERE url IN "
+                    "(SELECT url FROM pages ORDER BY last_used ASC LIMIT ?)", (excess,))
+
+    def revalidated(self, url: str):
+        """The server answered 304: the stored copy is fresh again."""
+        now = time.time()
+        with self._lock, self._connect() as con:
+            con.execute("UPDATE pages SET fetched = ?, last_used = ? WHERE url = ?", (now, now, url))
+
+
+_default: HttpCache | None = None
+_default_lock = threading.Lock()
+
+
+def default_http_cache() -> HttpCache | None:
+    """The process-wide cache at HTTP_CACHE_PATH, or None when caching is off."""
+    global _default
+    if HTTP_CACHE_PATH.lower() == "off":
+        return None
+    with _default_lock:
+        if _default is None:
+            os.makedirs(os.path.dirname(HTTP_CACHE_PATH) or ".", exist_ok=True)
+            _default = HttpCache(HTTP_CACHE_PATH)
+        return _default
@@ -0,0 +1,137 @@
+"""
+Shared HTTP fetching for the scrapers.
+
+One requests.Session per process keeps connections alive and pooled per host, so
+consecutive pages from mtgdecks.net skip the TCP/TLS handshake. Request starts are
+paced by the host's adaptive rate limiter (src/rate_limiter.py), shared across all
+threads, so fetching pages concurrently lowers wall time without outrunning what the
+host accepts. fetch_concurrently() keeps a bounded number of pages in flight and
+parses each one in its worker as soon as it arrives.
+
+Every fetch goes through the on-disk conditional-request cache (src/http_cache.py)
+unless the caller passes ttl=None.
+
+MTGDECKS_URL overrides the site the scrapers read, e.g. with the local replay server
+(scripts/replay_server.py). With HTTP_RECORD_DIR set, every page fetched is also saved
+there as a fixture the replay server can serve (layout: fixture_path()).
+"""
+import os
+import threading
+import urllib.parse
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.http_cache import default_http_cache
+from src.rate_limiter import limiter_for
+
+BROWSER_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Upgrade-Insecure-Requests': '1',
+}
+MAX_IN_FLIGHT = 3     # concurrent requests per fetch_concurrently() call
+MTGDECKS_URL = os.environ.get("MTGDECKS_URL", "https://mtgdecks.net").rstrip("/")
+RECORD_DIR = os.environ.get("HTTP_RECORD_DIR")
+
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """The process-wide pooled session (created on first use)."""
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=8, pool_maxsize=MAX_IN_FLIGHT * 2)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update(BROWSER_HEADERS)
+            _session = session
+        return _session
+
+
+def fixture_path(directory: str, url: str) -> str:
+    """File of a recorded page: the URL's path and query, percent-encoded (no ':' or '?'), plus .html."""
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path.strip("/") or "index"
+    if parts.query:
+        path += "?" + parts.query
+    return os.path.join(directory, *urllib.parse.quote(path, safe="/").split("/")) + ".html"
+
+
+def save_fixture(directory: str, url: str, body: str):
+    path = fixture_path(directory, url)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(body)
+
+
+def fetch_html(url: str, timeout: float = 10, ttl: float | None = 0, headers: dict | None = None) -> str:
+    """
+    GET a page through the pooled session and the on-disk HTTP cache. A cached copy
+    younger than ttl seconds is returned without a request; an older one is sent
+    with its validators and a 304 serves it from disk. ttl=None bypasses the cache.
+    Requests wait for the host's rate limiter and report back to it.
+    Raises requests.HTTPError on 4xx/5xx.
+    """
+    body = _fetch_html(url, timeout, ttl, headers)
+    if RECORD_DIR:
+        save_fixture(RECORD_DIR, url, body)
+    return body
+
+
+def _fetch_html(url, timeout, ttl, headers):
+    cache = default_http_cache() if ttl is not None else None
+    cached = cache.get(url) if cache is not None else None
+    if cached and cached.age() < ttl:
+        return cached.body
+
+    limiter = limiter_for(url)
+    limiter.wait()
+    try:
+        response = get_session().get(url, timeout=timeout,
+                                     headers={**(headers or {}), **(cached.validators() if cached else {})})
+    except requests.Timeout:
+        limiter.backoff()  # an overloaded host often stops answering before it refuses
+        raise
+    limiter.observe(response.status_code, response.headers.get('Retry-After'))
+    if cached and response.status_code == 304:
+        cache.revalidated(url)
+        return cached.body
+    response.raise_for_status()
+    body = response.content.decode('utf-8', errors='ignore')
+    if cache is not None:
+        cache.put(url, body, response.headers.get('ETag'), response.headers.get('Last-Modified'))
+    return body
+
+
+def fetch_concurrently(urls, parse, max_in_flight: int = MAX_IN_FLIGHT, timeout: float = 10,
+                       ttl: float | None = 0):
+    """
+    Fetch urls with at most max_in_flight requests open, running parse(html) in the
+    worker as each page arrives. Yields (url, parsed) in url order; a failed page
+    raises its exception at its position. Closing the generator early (e.g. once
+    enough results are in) cancels every page not yet started.
+    """
+    urls = list(urls)
+    pool = ThreadPoolExecutor(max_workers=max_in_flight)
+    running: dict = {}
+    finished: dict = {}
+    submitted = 0
+    try:
+        for i, url in enumerate(urls):
+            while i not in finished:
+                while submitted < len(urls) and len(running) < max_in_flight:
+                    task = pool.submit(lambda u: parse(fetch_html(u, timeout, ttl=ttl)), urls[submitted])
+                    running[task] = submitted
+                    submitted += 1
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for task in done:
+                    finished[running.pop(task)] = task
+            yield url, finished.pop(i).result()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
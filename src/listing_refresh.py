@@ -0,0 +1,50 @@
+"""
+Incremental refresh of archetype listings.
+
+mtgdecks.net lists an archetype's decks newest first, so a refresh that already has
+the archetype's recent decks only needs the pages down to them. caught_up() tells
+the pager when to stop: after a page whose decks are all known, or once a page
+reaches decks older than the newest stored one. Card lists are then fetched for the
+new decks only.
+"""
+import re
+from datetime import date
+
+_DATE = re.compile(r'(\d{1,2})-([A-Za-z]{3})\s*-\s*(\d{4})')
+_MONTHS = {m: i for i, m in enumerate(
+    ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"], 1)}
+
+
+def parse_listing_date(text: str | None) -> date | None:
+    """The date of a listing row as stored in decklists.json (e.g. "21-Feb -2026"); None if unparsable."""
+    m = _DATE.search(text or "")
+    month = _MONTHS.get(m.group(2).lower()) if m else None
+    if month is None:
+        return None
+    try:
+        return date(int(m.group(3)), month, int(m.group(1)))
+    except ValueError:
+        return None
+
+
+def newest_date(decks: list[dict]) -> date | None:
+    """Date of the newest deck in a stored archetype list."""
+    dates = [d for d in (parse_listing_date(deck.get("date")) for deck in decks) if d]
+    return max(dates, default=None)
+
+
+def caught_up(page_decks: list[dict], known_urls: set[str], newest_known: date | None) -> bool:
+    """
+    True if the listing pages after this one can only hold decks we already have:
+    every deck on the page is known, or the page goes back past the newest stored date.
+    A page without decks proves nothing.
+    """
+    if not page_decks:
+        return False
+    if all(d["url"] in known_urls for d in page_decks):
+        return True
+    if newest_known is not None:
+        dates = [d for d in (parse_listing_date(deck.get("date")) for deck in page_decks) if d]
+        if dates and min(dates) < newest_known:
+            return True
+    return False
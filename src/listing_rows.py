@@ -0,0 +1,238 @@
+"""
+Rows of the mtgdecks.net archetype listings, shared by every decklist scraper.
+
+parse_listing_rows() cuts the deck table out of a listing page (html_tables.table_html)
+and streams it once, reducing each row to a typed ListingRow as the tokens go by: no
+BeautifulSoup tree, no find_all() or get_text() per cell. The scrapers
+then decide which rows they keep with the same precompiled heuristics:
+top_finish() (is the rank a top-8 finish, and how big was the event) and rank_points()
+(the rank part of the TPS score).
+
+scripts/bench_listing_parser.py measures it against the per-row BeautifulSoup parsing
+the scrapers used before.
+"""
+import dataclasses
+import re
+from dataclasses import dataclass, field
+from html import unescape
+
+from src.html_tables import table_html, tag_attributes
+from src.http_client import MTGDECKS_URL
+
+# Listing columns: 0 rank, 1 blank, 2 deck link + player, 3 colors, 4 format, 5 event,
+# 6 level, 7 players, 8 spiciness, 9 date
+_RANK, _DECK, _COLORS, _EVENT, _PLAYERS, _SPICE, _DATE = 0, 2, 3, 5, 7, 8, 9
+MIN_CELLS = 8
+
+# A rank starting like "1st"…"8th", "1"…"8", "Top 4"/"Top 8" (any case)
+_TOP8_RANK = re.compile(r'(?:top ?[48]|[1-8])', re.IGNORECASE)
+_MATCH_RECORD = re.compile(r'(\d+)-(\d+)(?:-(\d+))?')
+_FIRST_NUMBER = re.compile(r'\d+')
+_NON_DIGITS = re.compile(r'\D')
+
+# Minimum event size implied by the number of Swiss rounds played
+_PLAYERS_BY_ROUNDS = {3: 4, 4: 9, 5: 17, 6: 33, 7: 65}
+
+RANK_POINTS = {
+    '1st': 100, '1': 100,
+    '2nd': 85, '2': 85,
+    '3rd': 70, '3': 70,
+    '4th': 70, '4': 70,
+    'top4': 70,
+    '5-0': 100,  # MTGO League 5-0
+    '5th': 55, '5': 55,
+    '6th': 55, '6': 55,
+    '7th': 55, '7': 55,
+    '8th': 55, '8': 55,
+    'top8': 55,
+    'top16': 30,
+    'top32': 15,
+    'top64': 5,
+}
+
+
+@dataclass
+class ListingRow:
+    player: str
+    rank: str            # as listed, without the parenthesised suffix
+    players: int         # as listed; 0 when the listing gives none
+    event: str
+    date: str            # e.g. "21-Feb -2026"
+    colors: list[str] = field(default_factory=list)
+    spice: int = 0
+    url: str = ""        # absolute
+
+    def to_deck(self, **overrides) -> dict:
+        """The row as a stored deck entry (the decklists.json fields), e.g. to_deck(players=estimate)."""
+        return {**dataclasses.asdict(self), **overrides}
+
+
+def top_finish(rank: str, players: int) -> tuple[int, bool]:
+    """
+    (players, is_top_8) for a listed rank. Without a player count, a match record
+    like "5-0" gives the minimum event size for its number of rounds, and a strong
+    record (undefeated over 3+ wins, or 80%+ over 5+ rounds) counts as a top finish;
+    a placing like "1st" with no count is taken as a small (16-player) event.
+    """
+    is_top_8 = _TOP8_RANK.match(rank) is not None
+    if players:
+        return players, is_top_8
+    record = _MATCH_RECORD.fullmatch(rank)
+    if record:
+        wins, losses = int(record.group(1)), int(record.group(2))
+        rounds = wins + losses + int(record.group(3) or 0)
+        players = 129 if rounds >= 8 else _PLAYERS_BY_ROUNDS.get(rounds, 0)
+        if (losses == 0 and wins >= 3) or (rounds >= 5 and wins / rounds >= 0.80):
+            is_top_8 = True
+    elif is_top_8:
+        players = 16
+    return players, is_top_8
+
+
+def rank_points(rank: str) -> int:
+    """Base TPS points of a rank: the RANK_POINTS entry, else by its first number (0: unranked)."""
+    rank = rank.lower()
+    points = RANK_POINTS.get(rank)
+    if points is not None:
+        return points
+    number = _FIRST_NUMBER.search(rank)
+    if not number:
+        return 0
+    place = int(number.group())
+    for limit, points in ((1, 100), (2, 85), (4, 70), (8, 55), (16, 30), (32, 15)):
+        if place <= limit:
+            return points
+    return 0
+
+
+class ListingRowParser:
+    """
+    Single streaming pass over a listing table. A regex tokenizer walks its tags and
+    text (attributes are only parsed for the tags read); each cell keeps only what is
+    read from it (its stripped text parts, the first link, the <strong> player name,
+    mana-symbol classes, the progress-bar value) and a row becomes a ListingRow at its
+    </tr>.
+    """
+    _TOKEN = re.compile(r'<!--.*?-->|<(/?)([a-zA-Z][\w-]*)([^>]*)>|([^<]+)|<', re.DOTALL)
+
+    def __init__(self, base_url: str = MTGDECKS_URL):
+        self.base_url = base_url
+        self.rows: list[ListingRow] = []
+        self.n_rows = 0       # <tr>s seen, header included
+        self._cells = None    # finished cells of the current row
+        self._text = None     # stripped text parts of the open cell; None between cells
+        self._href = None
+        self._strong = None   # text parts inside the cell's first <strong>
+        self._in_strong = 0
+        self._colors = []
+        self._spice = None
+        self._nested = 0      # tables open inside the cell: their rows belong to it
+
+    def feed(self, html: str):
+        for m in self._TOKEN.finditer(html):
+            closing, tag, attrs, data = m.groups()
+            if tag:
+                tag = tag.lower()
+                if closing:
+                    self.handle_endtag(tag)
+                else:
+                    self.handle_starttag(tag, attrs)
+            elif data and self._text is not None:
+                self.handle_data(unescape(data) if '&' in data else data)
+
+    def handle_starttag(self, tag, attrs: str):
+        if self._nested:
+            self._nested += tag == 'table'
+        elif tag == 'tr':
+            self._end_row()
+            self.n_rows += 1
+            self._cells = []
+        elif tag == 'td' and self._cells is not None:
+            self._end_cell()  # an unclosed cell ends where the next one starts
+            self._text, self._href, self._strong, self._in_strong = [], None, None, 0
+            self._colors, self._spice = [], None
+            return
+        if self._text is None:
+            return
+        if tag == 'table':
+            self._nested = 1
+        elif tag == 'a':
+            if self._href is None:
+                self._href = tag_attributes(attrs).get('href', "")
+        elif tag == 'strong':
+            if self._strong is None:  # the first <strong> of the cell holds the player
+                self._strong = []
+                self._in_strong = 1
+            elif self._in_strong:
+                self._in_strong += 1
+        elif tag == 'span' or (tag == 'div' and self._spice is None):
+            attrs = tag_attributes(attrs)
+            classes = attrs.get('class', "").split()
+            if tag == 'span' and 'ms-cost' in classes:
+                self._colors.extend(c[3:].upper() for c in classes if len(c) == 4 and c.startswith('ms-'))
+            elif tag == 'div' and 'progress-bar' in classes:
+                value = attrs.get('aria-valuenow', "")
+                self._spice = int(value) if value.isdigit() else 0
+
+    def handle_endtag(self, tag):
+        if self._nested:
+            self._nested -= tag == 'table'
+        elif tag == 'td':
+            self._end_cell()
+        elif tag == 'strong' and self._in_strong:
+            self._in_strong -= 1
+        elif tag in ('tr', 'table'):
+            self._end_row()
+
+    def handle_data(self, data):
+        data = data.strip()
+        if data:
+            self._text.append(data)
+            if self._in_strong:
+                self._strong.append(data)
+
+    def close(self):
+        self._end_row()
+
+    def _end_cell(self):
+        if self._text is not None:
+            self._cells.append((self._text, self._href, self._strong, self._colors, self._spice))
+            self._text = None
+
+    def _end_row(self):
+        if self._cells is not None:
+            self._end_cell()
+        cells, self._cells = self._cells, None
+        if cells is None or len(cells) < MIN_CELLS:
+            return
+        href = cells[_DECK][1]
+        if not href:
+            return
+        strong = cells[_DECK][2]
+        players = _NON_DIGITS.sub('', "".join(cells[_PLAYERS][0]))
+        self.rows.append(ListingRow(
+            player="".join(strong).replace('By', '').strip() if strong is not None else "Unknown",
+            rank="".join(cells[_RANK][0]).split('(')[0].strip(),
+            players=int(players) if players else 0,
+            event="".join(cells[_EVENT][0]),
+            date=" ".join(cells[_DATE][0]) if len(cells) > _DATE else "",
+            colors=cells[_COLORS][3],
+            spice=(cells[_SPICE][4] or 0) if len(cells) > _SPICE else 0,
+            url=href if href.startswith('http') else self.base_url + href,
+        ))
+
+
+def parse_listing_rows(html: str | None, base_url: str = MTGDECKS_URL) -> list[ListingRow] | None:
+    """
+    Every deck row of a listing page, in page order. None when the page has no deck
+    table or only its header (past the last page).
+    """
+    fragment = table_html(html, class_='clickable') if html else None
+    if fragment is None:
+        return None
+    parser = ListingRowParser(base_url)
+    parser.feed(fragment)
+    parser.close()
+    if parser.n_rows <= 1:
+        return None
+    return parser.rows
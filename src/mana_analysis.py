@@ -0,0 +1,176 @@
+"""
+Streamlit-free mana analysis shared by the Mana Check page and the offline decklist
+audit (scripts/audit_decklist_mana.py): card classification, source aggregation, the
+Karsten land formula and a compact per-deck summary.
+"""
+import re
+import statistics
+from collections import Counter
+
+from src.mana_exact import exact_castability
+from src.mana_sim import COLORS, spell_requirement
+
+# Frank Karsten: cheap cantrips allow playing fewer lands (~0.28 each)
+CANTRIP_SAVINGS = {
+    "brainstorm": 0.28,
+    "portent": 0.28,
+    "opt": 0.28,
+    "sleight of hand": 0.28,
+    "impulse": 0.28,
+    "serum visions": 0.28,
+    "ponder": 0.28,
+    "preordain": 0.28,
+    "careful study": 0.14,
+    "accumulated knowledge": 0.14,
+    "telling time": 0.14,
+    "scroll rack": 0.14,
+    "lat-nam's legacy": 0.14,
+}
+
+
+def parse_mana_cost(mc: str) -> dict:
+    """'{2}{W}{U}' → {'cmc': 4, 'pips': {'W':1,'U':1,...}}"""
+    pips = {c: 0 for c in COLORS}
+    cmc = 0
+    for token in re.findall(r'\{([^}]+)\}', mc.upper()):
+        if token.isdigit():
+            cmc += int(token)
+        elif token in COLORS:
+            pips[token] += 1
+            cmc += 1
+        elif "/" in token:
+            # Hybrid mana e.g. {W/U} — counts as 1 CMC, adds 0.5 to each color
+            parts = [p for p in token.split("/") if p in COLORS]
+            for p in parts:
+                pips[p] += 0.5
+            cmc += 1
+        elif token == "X":
+            pass  # X spells: ignore for CMC
+        elif token not in ("S", "C", "T"):
+            try:
+                cmc += int(token)
+            except ValueError:
+                pass
+    return {"cmc": cmc, "pips": pips}
+
+
+def classify_cards(raw_cards: list[tuple[int, str]], card_data: dict[str, dict]):
+    """
+    Split (qty, name) entries into lands, spells and non-land mana permanents.
+    Returns (lands [(qty, name, produced)], spells [(qty, name, cmc, pips)],
+    mana_perms [(qty, name, produced)], auto-detected cantrip adjustment).
+    Cards missing from card_data are skipped.
+    """
+    lands: list[tuple[int, str, list[str]]] = []
+    spells: list[tuple[int, str, float, dict]] = []
+    mana_perms: list[tuple[int, str, list[str]]] = []
+    cantrip_adj = 0.0
+
+    for qty, name in raw_cards:
+        d = card_data.get(name)
+        if d is None:
+            continue
+        type_line = d.get("type_line", "")
+
+        if "Land" in type_line:
+            produced = [c for c in d.get("produced_mana", []) if c in COLORS]
+            lands.append((qty, name, produced))
+        else:
+            # Handle split/MDFC cards — take first face mana cost
+            mc = d.get("mana_cost") or ""
+            if not mc and "card_faces" in d:
+                mc = d["card_faces"][0].get("mana_cost", "")
+            parsed = parse_mana_cost(mc)
+            spells.append((qty, name, parsed["cmc"], parsed["pips"]))
+            if name.lower() in CANTRIP_SAVINGS:
+                cantrip_adj += qty * CANTRIP_SAVINGS[name.lower()]
+            # Non-land permanents that produce colored mana count as sources
+            # (Mox Diamond, Birds of Paradise, Chrome Mox, etc.)
+            # Exclude Instants and Sorceries (Dark Ritual is one-shot, not a permanent source)
+            if "Instant" not in type_line and "Sorcery" not in type_line:
+                produced = [c for c in d.get("produced_mana", []) if c in COLORS]
+                if produced:
+                    mana_perms.append((qty, name, produced))
+    return lands, spells, mana_perms, cantrip_adj
+
+
+def aggregate_sources(lands, mana_perms) -> tuple[dict[str, int], int, int]:
+    """(coloured sources per colour, total lands, total mana sources incl. mana permanents)."""
+    total_lands = sum(q for q, _, _ in lands)
+    sources: dict[str, int] = {c: 0 for c in COLORS}
+    for qty, _, produced in lands:
+        for c in produced:
+            sources[c] += qty
+    # Add mana-producing non-land permanents to colored sources
+    for qty, _, produced in mana_perms:
+        for c in produced:
+            sources[c] += qty
+    # Total mana sources = lands + mana permanents (Moxen etc. also pay generic mana)
+    total_mana_sources = total_lands + sum(q for q, _, _ in mana_perms)
+    return sources, total_lands, total_mana_sources
+
+
+def average_cmc(spells) -> float:
+    spell_qty = sum(q for q, _, _, _ in spells)
+    return sum(q * cmc for q, _, cmc, _ in spells) / spell_qty if spell_qty else 0
+
+
+def recommended_lands(avg_cmc: float, cantrip_adj: float) -> int:
+    """Karsten 2022 regression, clamped to 14–28 lands."""
+    return max(14, min(28, round(19.59 + 1.90 * avg_cmc - cantrip_adj)))
+
+
+def deck_mana_summary(raw_cards: list[tuple[int, str]], card_data: dict[str, dict],
+                      deck_size: int | None = None, on_draw: bool = False) -> dict:
+    """
+    Compact mana health of one decklist: land and source counts, recommended-lands
+    delta and exact P(castable on curve) per spell, averaged over spell copies.
+    """
+    lands, spells, mana_perms, cantrip_adj = classify_cards(raw_cards, card_data)
+    sources, total_lands, total_mana_sources = aggregate_sources(lands, mana_perms)
+    deck_size = deck_size or sum(q for q, _ in raw_cards)
+    avg_cmc = average_cmc(spells)
+    recommended = recommended_lands(avg_cmc, cantrip_adj)
+
+    castable = [(q, name, spell_requirement(cmc, pips)) for q, name, cmc, pips in spells if cmc > 0]
+    probs = exact_castability([(q, produced) for q, _, produced in lands + mana_perms],
+                              deck_size, [req for _, _, req in castable], on_draw)
+    on_curve = {name: round(probs[req], 4) for _, name, req in castable}
+    copies = sum(q for q, _, _ in castable)
+    worst = min(on_curve, key=on_curve.get) if on_curve else None
+    return {
+        "deck_size": deck_size,
+        "lands": total_lands,
+        "mana_sources": total_mana_sources,
+        "sources": {c: n for c, n in sources.items() if n},
+        "avg_cmc": round(avg_cmc, 2),
+        "recommended_lands": recommended,
+        "land_delta": total_lands - recommended,
+        "avg_on_curve": round(sum(q * probs[req] for q, _, req in castable) / copies, 4) if copies else 1.0,
+        "worst_spell": worst,
+        "worst_on_curve": on_curve[worst] if worst else 1.0,
+        "on_curve": on_curve,
+        "unknown_cards": sum(q for q, name in raw_cards if name not in card_data),
+    }
+
+
+def archetype_mana_summary(deck_summaries: list[dict]) -> dict:
+    """Median mana health over an archetype's decklists (the "typical" list)."""
+    if not deck_summaries:
+        return {}
+    med = lambda key: statistics.median(s[key] for s in deck_summaries)
+    colors = sorted({c for s in deck_summaries for c in s["sources"]}, key=COLORS.index)
+    worst = [s["worst_spell"] for s in deck_summaries if s["worst_spell"]]
+    return {
+        "decks": len(deck_summaries),
+        "lands": med("lands"),
+        "lands_range": [min(s["lands"] for s in deck_summaries), max(s["lands"] for s in deck_summaries)],
+        "mana_sources": med("mana_sources"),
+        "sources": {c: statistics.median(s["sources"].get(c, 0) for s in deck_summaries) for c in colors},
+        "avg_cmc": round(med("avg_cmc"), 2),
+        "recommended_lands": med("recommended_lands"),
+        "land_delta": med("land_delta"),
+        "avg_on_curve": round(med("avg_on_curve"), 4),
+        "worst_on_curve": round(med("worst_on_curve"), 4),
+        "typical_worst_spell": Counter(worst).most_common(1)[0][0] if worst else None,
+    }
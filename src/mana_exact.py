@@ -0,0 +1,137 @@
+"""
+Exact castability probabilities for the Mana Check page.
+
+Same model as src/mana_sim.py — a spell is castable on turn T if the sources seen by
+then can pay its cost with one mana each — but computed exactly from the joint
+multivariate hypergeometric distribution instead of sampled.
+
+For one requirement, mana sources are first merged by the colours they offer *for
+that spell* (for a {U}{U} spell an Underground Sea and a City of Brass are the
+same thing), then a dynamic program walks the merged classes and sums
+
+    Π C(N_i, k_i) · C(N_other, n − Σ k_i) / C(N, n)
+
+over every draw (k_i) that can pay the cost. The DP state is what has been drawn so
+far, capped at what the requirement can use: sources covering each subset of the
+required colours (capped at that subset's pip total, Hall's condition) and all
+sources (capped at the mana value). Capping collapses most states, so subproblems
+are shared, and whole results are memoized by (class counts, cards seen,
+requirement), so spells with the same cost share work across reruns. Requirements
+with at most one colour skip the DP and read the cached hypergeometric tail tables;
+two-colour requirements, and others with few source classes, enumerate every draw in
+one NumPy pass, which is much faster than the DP at that size.
+
+Because the cache key only holds the classes a spell can tell apart, editing a
+decklist (a Swamp for an Underground Sea) only recomputes the spells of the colours
+involved; the rest are cache hits.
+"""
+import functools
+import math
+import numpy as np
+
+from src.mana_sim import COLORS, cards_seen_on_turn, source_categories
+from src.mana_tables import log_factorials, tail_table
+
+ENUMERATE_MAX_CLASSES = 5   # beyond this many source classes the capped DP is faster
+
+
+def requirement_classes(categories, category_counts, requirement) -> tuple[tuple[int, int], ...]:
+    """
+    Merge source categories by the required colours they produce.
+    Returns ((colour bitmask over the required colours, copies), ...), sorted.
+    """
+    needed = [c for c, n in zip(COLORS, requirement[1]) if n]
+    merged: dict[int, int] = {}
+    for cat, qty in zip(categories, category_counts):
+        mask = sum(1 << b for b, c in enumerate(needed) if c in cat)
+        merged[mask] = merged.get(mask, 0) + qty
+    return tuple(sorted(merged.items()))
+
+
+@functools.lru_cache(maxsize=16384)
+def castable_probability(classes: tuple[tuple[int, int], ...], n_other: int, cards_seen: int,
+                         requirement: tuple[int, tuple[int, ...]]) -> float:
+    """
+    P(the first cards_seen cards can pay requirement) for a deck of `classes` sources
+    (see requirement_classes) plus n_other cards that make no mana.
+    """
+    cmc, colored = requirement
+    pips = [n for n in colored if n]
+    if len(pips) <= 1:
+        return _single_colour_probability(classes, n_other, cards_seen, cmc, pips[0] if pips else 0)
+    subsets = range(1, 1 << len(pips))
+    caps = tuple(sum(p for b, p in enumerate(pips) if s >> b & 1) for s in subsets) + (cmc,)
+    # covers[i][j]: does class i count towards cap j (the last cap is the total)
+    covers = [tuple(bool(s & mask) for s in subsets) + (True,) for mask, _ in classes]
+    deck_size = n_other + sum(qty for _, qty in classes)
+    cards_seen = min(cards_seen, deck_size)
+    if len(pips) == 2 or len(classes) <= ENUMERATE_MAX_CLASSES:
+        return _enumerated_probability(classes, n_other, cards_seen, caps, covers)
+
+    @functools.lru_cache(maxsize=None)
+    def ways(i: int, left: int, state: tuple[int, ...]) -> int:
+        """Number of ways to draw `left` more cards from classes i.. and pay the cost."""
+        if i == len(classes):
+            return math.comb(n_other, left) if state == caps else 0
+        qty = classes[i][1]
+        total = 0
+        for j in range(min(qty, left) + 1):
+            nxt = tuple(min(cap, s + j) if hit else s for s, cap, hit in zip(state, caps, covers[i]))
+            total += math.comb(qty, j) * ways(i + 1, left - j, nxt)
+        return total
+
+    return ways(0, cards_seen, (0,) * len(caps)) / math.comb(deck_size, cards_seen)
+
+
+def _enumerated_probability(classes, n_other: int, cards_seen: int, caps, covers) -> float:
+    """Sum the multivariate hypergeometric pmf over every payable draw, vectorized."""
+    draws = np.zeros((1, 0), dtype=int)
+    for _, qty in classes:
+        j = np.arange(min(qty, cards_seen) + 1)
+        draws = np.hstack([np.repeat(draws, len(j), axis=0), np.tile(j, len(draws))[:, None]])
+        draws = draws[draws.sum(axis=1) <= cards_seen]
+    coverage = draws @ np.array(covers, dtype=int).reshape(len(classes), len(caps))
+    draws = draws[(coverage >= np.array(caps)).all(axis=1)]
+    rest = cards_seen - draws.sum(axis=1)
+    draws = draws[rest <= n_other]
+    rest = rest[rest <= n_other]
+
+    qty = np.array([q for _, q in classes])
+    deck_size = n_other + int(qty.sum())
+    lf = log_factorials(deck_size)
+    log_ways = (lf[qty] - lf[draws] - lf[qty - draws]).sum(axis=1) + lf[n_other] - lf[rest] - lf[n_other - rest]
+    log_total = lf[deck_size] - lf[cards_seen] - lf[deck_size - cards_seen]
+    return float(min(1.0, np.exp(log_ways - log_total).sum()))
+
+
+def _single_colour_probability(classes, n_other: int, cards_seen: int, cmc: int, pips: int) -> float:
+    """
+    Closed form for one colour: Σ over l ≥ cmc of P(l sources seen) · P(≥ pips of the
+    coloured ones among those l), both read from tail tables.
+    """
+    n_sources = sum(qty for _, qty in classes)
+    n_colour = sum(qty for mask, qty in classes if mask)
+    deck_size = n_other + n_sources
+    source_tail = tail_table(deck_size, n_sources)[min(cards_seen, deck_size)]
+    if not pips:
+        return float(source_tail[min(cmc, n_sources + 1)])
+    source_pmf = source_tail[:-1] - source_tail[1:]
+    colour_tail = tail_table(n_sources, n_colour)[:, min(pips, n_colour + 1)]
+    return float(source_pmf[cmc:] @ colour_tail[cmc:])
+
+
+def exact_castability(sources: list[tuple[int, list[str]]], deck_size: int, requirements,
+                      on_draw: bool = False) -> dict:
+    """
+    Exact counterpart of mana_sim.simulate_castability: P(castable on curve) for each
+    requirement (see mana_sim.spell_requirement). Returns {requirement: probability}.
+    """
+    categories, cat_counts = source_categories(sources)
+    n_sources = sum(cat_counts)
+    n_cards = max(deck_size, n_sources)
+    result = {}
+    for req in dict.fromkeys(requirements):
+        classes = requirement_classes(categories, cat_counts, req)
+        seen = cards_seen_on_turn(max(1, req[0]), on_draw, n_cards)
+        result[req] = castable_probability(classes, n_cards - n_sources, seen, req)
+    return result
@@ -0,0 +1,117 @@
+"""
+Vectorized London-mulligan simulation for the Mana Check page.
+
+Uses the same deck representation and batched shuffle as src/mana_sim.py. Every
+trial draws seven cards; after k mulligans it keeps 7 − k of them, putting k on the
+bottom. The hand is kept if its mana sources fall in the keep range for its size and,
+optionally, its sources can produce every required colour. Trials still unhappy draw
+a fresh seven from a new shuffle until the minimum hand size, which is always kept.
+
+Bottom choice: keep as many sources as the hand has, clipped into the keep range,
+preferring sources that make more colours (colourless lands go to the bottom first);
+the remaining slots are filled with spells in the order they were drawn.
+
+Castability after mulligans: a spell is castable on curve if the kept hand plus the
+draws up to its turn can pay it (same pip assignment check as mana_sim.castable).
+Cards put on the bottom are never drawn within the turns that matter.
+"""
+import numpy as np
+
+from src.mana_sim import COLORS, N_TRIALS, castable, deck_array, draw_prefixes, seen_counts, source_categories
+
+OPENING_HAND = 7
+# Mana sources to keep per hand size (Karsten-style defaults); smaller hands are always kept
+DEFAULT_KEEP_SOURCES = {7: (2, 5), 6: (2, 4), 5: (1, 4)}
+MIN_HAND_SIZE = 4
+
+
+def keep_ranges(low: int, high: int) -> dict[int, tuple[int, int]]:
+    """Keep ranges for 7/6/5-card hands from the range for a seven-card hand (low <= high in each)."""
+    low = min(low, high)
+    return {7: (low, high), 6: (low, max(low, high - 1)), 5: (max(0, low - 1), max(1, high - 1))}
+
+
+def _bottom(opener: np.ndarray, n_colours: np.ndarray, hand_size: int, low: int, high: int) -> np.ndarray:
+    """Boolean mask over the 7-card openers: which cards stay in the kept hand."""
+    n_open = opener.shape[1]
+    is_source = opener > 0
+    sources = is_source.sum(axis=1)
+    spells = n_open - sources
+    keep_sources = np.clip(sources, low, high)
+    keep_sources = np.clip(keep_sources, np.maximum(0, hand_size - spells), np.minimum(sources, hand_size))
+
+    # Sources ranked by colours produced (then draw order), spells by draw order
+    position = np.arange(n_open)
+    score = np.where(is_source, n_colours[opener] * n_open + (n_open - position), -1)
+    order = np.argsort(-score, axis=1, kind="stable")
+    rank = np.empty_like(order)
+    np.put_along_axis(rank, order, np.broadcast_to(position, order.shape), axis=1)
+    return np.where(is_source, rank < keep_sources[:, None],
+                    rank - sources[:, None] < (hand_size - keep_sources)[:, None])
+
+
+def simulate_mulligans(sources: list[tuple[int, list[str]]], deck_size: int, requirements=(),
+                       required_colors=(), keep_sources: dict | None = None, on_draw: bool = False,
+                       min_hand_size: int = MIN_HAND_SIZE, n_trials: int = N_TRIALS, seed: int = 0) -> dict:
+    """
+    Simulate London mulligans for a deck of (qty, produced colours) mana sources.
+
+    requirements: spell requirements (mana_sim.spell_requirement) to score after mulligans.
+    required_colors: colours every kept hand (above the minimum size) must produce.
+    keep_sources: {hand size: (min, max) mana sources to keep}, default DEFAULT_KEEP_SOURCES.
+    Returns {"hand_sizes": {size: share}, "mulligan_rate": share, "avg_hand_size": float,
+    "castable": {requirement: P(castable on curve after mulligans)}}.
+    """
+    keep_sources = keep_sources or DEFAULT_KEEP_SOURCES
+    requirements = list(dict.fromkeys(requirements))
+    categories, cat_counts = source_categories(sources)
+    n_cat = len(categories)
+    deck = deck_array(cat_counts, deck_size)
+    n_colours = np.array([0] + [len(c) for c in categories])
+    color_req = (0, tuple(1 if c in required_colors else 0 for c in COLORS))
+
+    draws_for = {req: max(1, req[0]) - (0 if on_draw else 1) for req in requirements}
+    max_draws = max(draws_for.values(), default=0)
+    n_seen = min(OPENING_HAND + max_draws, len(deck))
+
+    rng = np.random.default_rng(seed)
+    hand_size = np.zeros(n_trials, dtype=int)
+    kept = np.zeros((n_trials, n_cat + 1), dtype=np.int16)
+    drawn = np.zeros((n_trials, n_seen - OPENING_HAND + 1, n_cat + 1), dtype=np.int16)
+    pending = np.arange(n_trials)
+    one_hot = np.arange(n_cat + 1, dtype=deck.dtype)
+
+    for size in range(OPENING_HAND, min_hand_size - 1, -1):
+        if not len(pending):
+            break
+        cards = draw_prefixes(deck, len(pending), n_seen, rng)
+        opener = cards[:, :OPENING_HAND]
+        low, high = keep_sources.get(size, (0, size))
+        keep_mask = _bottom(opener, n_colours, size, low, high)
+        counts = ((opener[:, :, None] == one_hot) & keep_mask[:, :, None]).sum(axis=1, dtype=np.int16)
+
+        if size == min_hand_size:
+            keep = np.ones(len(pending), dtype=bool)
+        else:
+            n_sources = counts[:, 1:].sum(axis=1)
+            keep = (n_sources >= low) & (n_sources <= high)
+            if required_colors:
+                keep &= castable(counts, categories, color_req)
+
+        done = pending[keep]
+        hand_size[done] = size
+        kept[done] = counts[keep]
+        drawn[done] = seen_counts(cards[keep, OPENING_HAND:], n_cat)
+        pending = pending[~keep]
+
+    sizes, freq = np.unique(hand_size, return_counts=True)
+    result = {
+        "hand_sizes": {int(s): float(f / n_trials) for s, f in zip(sizes[::-1], freq[::-1])},
+        "mulligan_rate": float(np.mean(hand_size < OPENING_HAND)),
+        "avg_hand_size": float(hand_size.mean()),
+        "castable": {},
+    }
+    for req in requirements:
+        n_draws = min(draws_for[req], drawn.shape[1] - 1)
+        result["castable"][req] = float(castable(kept + drawn[:, n_draws], categories, req).mean())
+    return result
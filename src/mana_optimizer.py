@@ -0,0 +1,111 @@
+"""
+Land-count and basic-land split optimizer for the Mana Check page.
+
+Starting from the classification show_mana_check already makes (lands with the
+colours they produce, non-land mana permanents, spells with their pips), every
+candidate configuration keeps the non-basic lands and mana permanents as they are
+and varies the number of lands and how the basics are split between the deck's
+colours. Each candidate is scored with the exact castability model
+(src/mana_exact.py). A spell's probability only depends on the land count and the
+basics of its own colours, so evaluations are memoized on exactly that key; most
+candidates are pure cache lookups and a whole search takes well under a second.
+
+More lands always raise castability on curve (the cost is flood, which this model
+does not see), so the search ranks splits within each land count and leaves the
+choice of count to the Karsten land formula and the table of what each extra land buys.
+"""
+import itertools
+
+from src.mana_exact import castable_probability, requirement_classes
+from src.mana_sim import COLORS, cards_seen_on_turn, source_categories, spell_requirement
+
+BASIC_LANDS = {"plains": "W", "island": "U", "swamp": "B", "mountain": "R", "forest": "G"}
+OBJECTIVES = ("weighted", "minimum")
+
+
+def basic_land_color(name: str) -> str | None:
+    """Colour of a basic land name (snow basics included), else None."""
+    key = name.lower().removeprefix("snow-covered ").strip()
+    return BASIC_LANDS.get(key)
+
+
+def _splits(total: int, n_parts: int):
+    """Every way to write total as an ordered sum of n_parts non-negative integers."""
+    for bars in itertools.combinations(range(total + n_parts - 1), n_parts - 1):
+        edges = (-1,) + bars + (total + n_parts - 1,)
+        yield tuple(edges[i + 1] - edges[i] - 1 for i in range(n_parts))
+
+
+def optimize_mana(lands, mana_perms, spells, deck_size: int, on_draw: bool = False,
+                  land_counts=None, objective: str = "weighted", top: int = 3) -> dict[int, list[dict]]:
+    """
+    Search basic splits at each land count for the best castability on curve.
+
+    lands: [(qty, name, produced colours)], mana_perms: [(qty, name, produced colours)],
+    spells: [(qty, name, cmc, pips)] — the lists show_mana_check builds.
+    objective "weighted" maximizes the copy-weighted mean P(castable on curve) over the
+    spells, "minimum" maximizes the worst spell (ties broken by the weighted mean).
+    Returns {land count: the `top` configurations, best first}, each configuration as
+    {"lands", "basics" {colour: count}, "weighted", "minimum", "worst" spell name}.
+    Land counts default to the current count ± 3.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"objective must be one of {OBJECTIVES}")
+
+    fixed = [(q, produced) for q, name, produced in lands if not basic_land_color(name)]
+    fixed += [(q, produced) for q, _, produced in mana_perms]
+    n_fixed_lands = sum(q for q, name, _ in lands if not basic_land_color(name))
+    colors = [c for c in COLORS if any(p.get(c, 0) >= 0.5 for _, _, _, p in spells)]
+    if not colors:
+        colors = sorted({basic_land_color(n) for _, n, _ in lands if basic_land_color(n)},
+                        key=COLORS.index)
+
+    weighted_spells = [(q, name, spell_requirement(cmc, pips)) for q, name, cmc, pips in spells if cmc > 0]
+    requirements = list(dict.fromkeys(req for _, _, req in weighted_spells))
+    spell_copies = sum(q for q, _, _ in weighted_spells)
+    if land_counts is None:
+        current = sum(q for q, _, _ in lands)
+        land_counts = range(max(n_fixed_lands, current - 3), current + 4)
+
+    fixed_cats, fixed_counts = source_categories(fixed)
+    n_fixed_sources = sum(fixed_counts)
+    basic_cats = [frozenset(c) for c in colors]
+    req_colors = {req: [i for i, c in enumerate(colors) if req[1][COLORS.index(c)]] for req in requirements}
+    memo: dict[tuple, float] = {}
+
+    def probability(req, n_lands, split):
+        key = (req, n_lands, tuple(split[i] for i in req_colors[req]))
+        if key not in memo:
+            classes = requirement_classes(fixed_cats + basic_cats, fixed_counts + list(split), req)
+            n_sources = n_fixed_sources + sum(split)
+            n_cards = max(deck_size, n_sources)
+            seen = cards_seen_on_turn(max(1, req[0]), on_draw, n_cards)
+            memo[key] = castable_probability(classes, n_cards - n_sources, seen, req)
+        return memo[key]
+
+    if objective == "weighted":
+        rank = lambda r: (-r["weighted"], -r["minimum"])
+    else:
+        rank = lambda r: (-r["minimum"], -r["weighted"])
+
+    best: dict[int, list[dict]] = {}
+    for n_lands in land_counts:
+        n_basics = n_lands - n_fixed_lands
+        if n_basics < 0 or n_lands > deck_size:
+            continue
+        results = []
+        for split in (_splits(n_basics, len(colors)) if colors else [()]):
+            probs = {req: probability(req, n_lands, split) for req in requirements}
+            per_spell = [(probs[req], name) for _, name, req in weighted_spells]
+            weighted = (sum(q * probs[req] for q, _, req in weighted_spells) / spell_copies
+                        if spell_copies else 1.0)
+            minimum, worst = min(per_spell) if per_spell else (1.0, "")
+            results.append({
+                "lands": n_lands,
+                "basics": dict(zip(colors, split)),
+                "weighted": weighted,
+                "minimum": minimum,
+                "worst": worst,
+            })
+        best[n_lands] = sorted(results, key=rank)[:top]
+    return best
@@ -0,0 +1,145 @@
+"""
+Vectorized Monte Carlo "goldfish" mana simulator for the Mana Check page.
+
+The deck is an integer array of card categories: 0 for cards that make no mana and
+1..K for mana sources grouped by the set of colours they produce (mono-coloured
+lands, duals, five-colour lands, colourless lands, Moxen…). All trials are shuffled
+at once by argsorting a (trials × deck) block of random keys, and only the first
+cards of each shuffle — the opening hand plus the draws up to the last turn of
+interest — are kept. The castability estimate uses one fixed set of shuffles per
+deck size, so results are stable across reruns and spells share the same draws.
+
+A spell is castable on turn T if the sources among the cards seen by then can pay its
+whole cost with one mana each: there must be at least CMC sources, and the coloured
+pips must have a matching (Hall's condition: for every set of required colours, the
+sources producing any of them must cover the pips of that set). A W/U dual therefore
+counts for white or blue but never for both, which the per-colour independence
+approximation in show_mana_check cannot express.
+
+Like Karsten's tables the model counts sources seen, not land drops made.
+"""
+import functools
+import itertools
+import math
+import numpy as np
+
+COLORS = ["W", "U", "B", "R", "G"]
+N_TRIALS = 100_000
+
+
+def spell_requirement(cmc: float, pips: dict) -> tuple[int, tuple[int, ...]]:
+    """(mana value, pips per colour in COLORS order) as the simulator checks them."""
+    colored = tuple(max(1, int(math.ceil(pips.get(c, 0)))) if pips.get(c, 0) >= 0.5 else 0 for c in COLORS)
+    return int(cmc), colored
+
+
+def cards_seen_on_turn(turn: int, on_draw: bool, deck_size: int) -> int:
+    """Opening hand plus one draw per turn (none on turn 1 on the play)."""
+    return min(7 + (turn if on_draw else turn - 1), deck_size)
+
+
+def source_categories(sources: list[tuple[int, list[str]]]) -> tuple[list[frozenset], list[int]]:
+    """
+    Group (qty, produced colours) mana sources by colour set.
+    Returns (colour set per category, copies per category); category ids start at 1.
+    """
+    counts: dict[frozenset, int] = {}
+    for qty, produced in sources:
+        key = frozenset(c for c in produced if c in COLORS)
+        counts[key] = counts.get(key, 0) + qty
+    cats = sorted(counts, key=lambda s: (len(s), [COLORS.index(c) for c in sorted(s, key=COLORS.index)]))
+    return cats, [counts[c] for c in cats]
+
+
+def deck_array(category_counts: list[int], deck_size: int) -> np.ndarray:
+    """Integer deck: category k (1-based) repeated count times, padded with 0s to deck_size."""
+    deck = np.repeat(np.arange(1, len(category_counts) + 1), category_counts)
+    n = max(deck_size, len(deck))
+    return np.concatenate([deck, np.zeros(n - len(deck), dtype=deck.dtype)]).astype(np.int8)
+
+
+def draw_prefixes(deck: np.ndarray, n_trials: int, n_seen: int, rng: np.random.Generator) -> np.ndarray:
+    """The first n_seen cards of n_trials independent shuffles, as one batched argsort."""
+    keys = rng.random((n_trials, len(deck)), dtype=np.float32)
+    order = np.argsort(keys, axis=1)[:, :n_seen]
+    return deck[order]
+
+
+def seen_counts(hands: np.ndarray, n_categories: int) -> np.ndarray:
+    """counts[t, s, k] = copies of category k among the first s cards of trial t."""
+    one_hot = hands[:, :, None] == np.arange(n_categories + 1, dtype=hands.dtype)
+    counts = np.zeros((hands.shape[0], hands.shape[1] + 1, n_categories + 1), dtype=np.int16)
+    np.cumsum(one_hot, axis=1, dtype=np.int16, out=counts[:, 1:])
+    return counts
+
+
+def castable(counts: np.ndarray, categories: list[frozenset], requirement) -> np.ndarray:
+    """
+    Boolean per row of counts (trials × categories, category 0 first): can the seen
+    sources pay the requirement from spell_requirement()?
+    """
+    cmc, colored = requirement
+    ok = counts[:, 1:].sum(axis=1) >= cmc
+    needed = [c for c, n in zip(COLORS, colored) if n]
+    for r in range(1, len(needed) + 1):
+        for subset in itertools.combinations(needed, r):
+            covers = np.array([bool(cat.intersection(subset)) for cat in categories])
+            pip_sum = sum(colored[COLORS.index(c)] for c in subset)
+            ok &= counts[:, 1:][:, covers].sum(axis=1) >= pip_sum
+    return ok
+
+
+@functools.lru_cache(maxsize=2)
+def shuffle_order(deck_len: int, n_trials: int = N_TRIALS, seed: int = 0) -> np.ndarray:
+    """
+    n_trials random permutations of deck positions (read-only). Positions do not depend
+    on what the deck holds, so every deck of this size reuses the same shuffles.
+    """
+    keys = np.random.default_rng(seed).random((n_trials, deck_len), dtype=np.float32)
+    order = np.argsort(keys, axis=1).astype(np.int16)
+    order.flags.writeable = False
+    return order
+
+
+def project_sources(sources, colors) -> tuple[tuple[int, tuple[str, ...]], ...]:
+    """
+    Sources as a spell of these colours sees them: produced colours cut down to `colors`
+    and merged by what is left. Swapping a Swamp for an Underground Sea leaves the
+    projection for a red spell unchanged. Hashable and canonical, so it can key a cache.
+    """
+    merged: dict[tuple[str, ...], int] = {}
+    for qty, produced in sources:
+        key = tuple(c for c in COLORS if c in produced and c in colors)
+        merged[key] = merged.get(key, 0) + qty
+    return tuple((qty, key) for key, qty in sorted(merged.items()))
+
+
+@functools.lru_cache(maxsize=4096)
+def castable_share(projected: tuple, deck_size: int, requirement, on_draw: bool = False,
+                   n_trials: int = N_TRIALS, seed: int = 0) -> float:
+    """Share of shuffles in which one requirement is castable on curve, for projected sources."""
+    categories, cat_counts = source_categories(projected)
+    deck = deck_array(cat_counts, deck_size)
+    seen = cards_seen_on_turn(max(1, requirement[0]), on_draw, len(deck))
+    hands = deck[shuffle_order(len(deck), n_trials, seed)[:, :seen]]
+    # Per-trial category counts as one bincount over (trial, category) cells
+    n_cat = len(categories) + 1
+    cells = np.arange(n_trials)[:, None] * n_cat + hands
+    counts = np.bincount(cells.ravel(), minlength=n_trials * n_cat).reshape(n_trials, n_cat)
+    return float(castable(counts, categories, requirement).mean())
+
+
+def simulate_castability(sources: list[tuple[int, list[str]]], deck_size: int, requirements,
+                         on_draw: bool = False, n_trials: int = N_TRIALS, seed: int = 0) -> dict:
+    """
+    P(castable on curve) for each requirement in `requirements` (see spell_requirement),
+    all estimated from the same n_trials shuffles. Turn = mana value (at least 1).
+    Each requirement is scored on the sources projected to its colours and cached on
+    that pair, so editing a decklist only re-simulates the spells whose sources changed.
+    Returns {requirement: probability}.
+    """
+    result = {}
+    for req in dict.fromkeys(requirements):
+        colors = [c for c, n in zip(COLORS, req[1]) if n]
+        result[req] = castable_share(project_sources(sources, colors), deck_size, req, on_draw, n_trials, seed)
+    return result
@@ -0,0 +1,96 @@
+"""
+Precomputed hypergeometric tables for the Mana Check page.
+
+tail_table(N, K) holds P(X ≥ k) for X ~ Hypergeometric(N, K, n) for every number of
+cards seen n and every k at once, built in one vectorized pass from log-factorials
+(ln n! = ln (n−1)! + ln n, accumulated with a cumulative sum). Tables are cached per
+(N, K), so after the first query for a deck every further query is an array lookup.
+"""
+import functools
+import numpy as np
+
+
+@functools.lru_cache(maxsize=8)
+def log_factorials(n_max: int) -> np.ndarray:
+    """ln(i!) for i = 0..n_max."""
+    out = np.zeros(n_max + 1)
+    np.cumsum(np.log(np.arange(1, n_max + 1)), out=out[1:])
+    return out
+
+
+@functools.lru_cache(maxsize=1024)
+def tail_table(N: int, K: int) -> np.ndarray:
+    """
+    Read-only array T of shape (N + 1, K + 2) with T[n, k] = P(X ≥ k) when n of N cards
+    are seen and K of them are successes. Column K + 1 is all zeros.
+    """
+    K = min(max(K, 0), N)
+    lf = log_factorials(N)
+    n = np.arange(N + 1)[:, None]
+    i = np.arange(K + 1)[None, :]
+    valid = (i <= n) & (n - i <= N - K)
+    ii, nn = np.broadcast_arrays(i, n)
+    ni = np.where(valid, nn - ii, 0)
+    log_pmf = (lf[K] - lf[ii] - lf[K - ii]
+               + lf[N - K] - lf[ni] - lf[np.where(valid, N - K - ni, 0)]
+               - (lf[N] - lf[nn] - lf[N - nn]))
+    pmf = np.where(valid, np.exp(log_pmf), 0.0)
+
+    table = np.zeros((N + 1, K + 2))
+    table[:, :K + 1] = np.cumsum(pmf[:, ::-1], axis=1)[:, ::-1]
+    np.clip(table, 0.0, 1.0, out=table)
+    table.flags.writeable = False
+    return table
+
+
+def hypergeom_at_least(N: int, K: int, n: int, k: int) -> float:
+    """P(X >= k) for X ~ Hypergeometric(N, K, n), read from the cached tail table."""
+    if k <= 0:
+        return 1.0
+    if N <= 0 or K < k:
+        return 0.0
+    table = tail_table(N, K)
+    return float(table[min(max(n, 0), N), min(k, table.shape[1] - 1)])
+
+
+# ── Source requirements (generalized Karsten table) ──────────────────────────
+MAX_TURN = 8
+MAX_PIPS = 4
+
+
+@functools.lru_cache(maxsize=256)
+def source_requirement_grid(N: int, mana_sources: int, target: float, on_draw: bool) -> np.ndarray:
+    """
+    Minimum coloured sources for every (pips, turn): grid[p, t] is the smallest K such
+    that, with `mana_sources` mana sources in an N-card deck of which K produce the
+    colour, P(at least p of them seen by turn t | at least t mana sources seen) ≥ target.
+    Conditioning on hitting the land drops is Frank Karsten's convention. Row and column
+    0 are unused; -1 marks combinations no source count reaches (or p > t).
+    """
+    L = min(max(mana_sources, 0), N)
+    grid = np.full((MAX_PIPS + 1, MAX_TURN + 1), -1, dtype=int)
+    if L == 0:
+        grid.flags.writeable = False
+        return grid
+    # successes[K, l, p] = P(≥ p of K coloured among l mana sources seen), K = 0..L
+    successes = np.zeros((L + 1, L + 1, MAX_PIPS + 1))
+    for K in range(L + 1):
+        table = tail_table(L, K)
+        width = min(MAX_PIPS + 1, table.shape[1])
+        successes[K, :, :width] = table[:, :width]
+    land_tail = tail_table(N, L)
+
+    for turn in range(1, MAX_TURN + 1):
+        seen = min(7 + (turn if on_draw else turn - 1), N)
+        if turn > min(L, seen):
+            continue
+        # P(exactly l mana sources seen), restricted to l ≥ turn
+        land_pmf = land_tail[seen, :-1] - land_tail[seen, 1:]
+        land_pmf[:turn] = 0.0
+        probs = np.einsum("l,klp->kp", land_pmf, successes) / land_tail[seen, turn]
+        for pips in range(1, min(turn, MAX_PIPS) + 1):
+            reached = probs[:, pips] >= target - 1e-12
+            if reached.any():
+                grid[pips, turn] = int(np.argmax(reached))
+    grid.flags.writeable = False
+    return grid
@@ -3,7 +3,7 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from src.analytics import load_period_data, wilson_score_interval, calculate_polarity
-from src.ui import THEME, style_winrate, get_icon_b64
+from src.ui import THEME, style_winrate, get_icon_b64, html_kpi_card
 import os
 import json
 
@@ -68,6 +68,42 @@ def _style_wr_col(df, col="Win Rate"):
     except AttributeError:
         return df.style.applymap(style_winrate, subset=[col])
 
+def _show_mana_health(deck, data_dir):
+    """Typical mana health of the stored lists, precomputed by scripts/audit_decklist_mana.py."""
+    health_file = os.path.join(data_dir, "mana_health.json")
+    if not os.path.exists(health_file):
+        return
+    try:
+        with open(health_file, "r", encoding="utf-8") as f:
+            report = json.load(f)
+        health = report.get("archetypes", {}).get(deck)
+        on_draw = bool(report.get("on_draw"))
+    except Exception:
+        return
+    if not health:
+        return
+
+    st.markdown("<h3>Typical Mana Health</h3>", unsafe_allow_html=True)
+    st.caption(f"Median over {health['decks']} stored lists, {'on the draw' if on_draw else 'on the play'}. Full per-list analysis: Mana Check.")
+    delta = health["land_delta"]
+    delta_color = THEME["success"] if abs(delta) <= 1 else THEME["warning"] if abs(delta) <= 2 else THEME["danger"]
+    p_color = lambda p: THEME["success"] if p >= 0.9 else THEME["warning"] if p >= 0.8 else THEME["danger"]
+    lo, hi = health["lands_range"]
+    k1, k2, k3, k4 = st.columns(4)
+    with k1:
+        st.markdown(html_kpi_card("Lands", f"{health['lands']:g}" + (f" ({lo}–{hi})" if lo != hi else "")), unsafe_allow_html=True)
+    with k2:
+        st.markdown(html_kpi_card("vs Recommended", f"{delta:+g}", color=delta_color), unsafe_allow_html=True)
+    with k3:
+        st.markdown(html_kpi_card("Avg P on Curve", f"{health['avg_on_curve']:.0%}",
+                                  color=p_color(health["avg_on_curve"])), unsafe_allow_html=True)
+    with k4:
+        st.markdown(html_kpi_card("Weakest Spell", f"{health['worst_on_curve']:.0%}", color=p_color(health["worst_on_curve"]),
+                                  help_text=f"Most often the weakest: {health.get('typical_worst_spell') or '—'}"),
+                    unsafe_allow_html=True)
+    st.markdown(f'<div style="margin: 12px 0; border-top: 1px solid {THEME["border"]};"></div>', unsafe_allow_html=True)
+
+
 def show_analysis(matrix_dict, all_archetypes, records_data, data_dir, timeframes):
     st.markdown('<h1 class="page-title">Deck Analysis</h1>', unsafe_allow_html=True)
 
@@ -369,6 +405,8 @@ def show_analysis(matrix_dict, all_archetypes, records_data, data_dir, timeframe
                 except Exception as e:
                     pass
                     
+        _show_mana_health(target_deck, data_dir)
+
         if not decks:
             st.info("No recent decklists found.")
         else:
@@ -1,13 +1,20 @@
 import streamlit as st
 import re
 import math
-import time
-import urllib.request
-import urllib.parse
-import json
 import base64
 import os
 from src.ui import THEME, html_kpi_card
+from src.card_db import card_key, lookup_card
+from src.card_names import resolve_card_name
+from src.scryfall import resolve_cards
+from src.mana_sim import simulate_castability, spell_requirement
+from src.mana_mulligan import keep_ranges, simulate_mulligans
+from src.mana_exact import exact_castability
+from src.mana_analysis import (
+    CANTRIP_SAVINGS, aggregate_sources, average_cmc, classify_cards, recommended_lands,
+)
+from src.mana_optimizer import optimize_mana
+from src.mana_tables import MAX_PIPS, MAX_TURN, hypergeom_at_least, source_requirement_grid
 
 COLORS = ["W", "U", "B", "R", "G"]
 COLOR_NAMES = {"W": "White", "U": "Blue", "B": "Black", "R": "Red", "G": "Green"}
@@ -43,188 +50,6 @@ def mana_cost_html(pips: dict, size: int = 16) -> str:
         parts.extend([mana_img(c, size)] * count)
     return "".join(parts) or "—"
 
-# Frank Karsten: cheap cantrips allow playing fewer lands (~0.28 each)
-CANTRIP_SAVINGS = {
-    "brainstorm": 0.28,
-    "portent": 0.28,
-    "opt": 0.28,
-    "sleight of hand": 0.28,
-    "impulse": 0.28,
-    "serum visions": 0.28,
-    "ponder": 0.28,
-    "preordain": 0.28,
-    "careful study": 0.14,
-    "accumulated knowledge": 0.14,
-    "telling time": 0.14,
-    "scroll rack": 0.14,
-    "lat-nam's legacy": 0.14,
-}
-
-# Hardcoded produced_mana for all common Premodern lands.
-# Keys are lowercase card names. Value: list of color symbols produced.
-# This avoids Scryfall API calls for lands (which are finite and well-known).
-_LT = "Land"
-_BL = "Basic Land"
-PREMODERN_LAND_DATA: dict[str, tuple[list[str], str]] = {
-    # ── Basics ────────────────────────────────────────────────────────────────
-    "plains":                    (["W"], f"{_BL} — Plains"),
-    "island":                    (["U"], f"{_BL} — Island"),
-    "swamp":                     (["B"], f"{_BL} — Swamp"),
-    "mountain":                  (["R"], f"{_BL} — Mountain"),
-    "forest":                    (["G"], f"{_BL} — Forest"),
-    "snow-covered plains":       (["W"], f"{_BL} — Plains"),
-    "snow-covered island":       (["U"], f"{_BL} — Island"),
-    "snow-covered swamp":        (["B"], f"{_BL} — Swamp"),
-    "snow-covered mountain":     (["R"], f"{_BL} — Mountain"),
-    "snow-covered forest":       (["G"], f"{_BL} — Forest"),
-    # ── Original Duals ────────────────────────────────────────────────────────
-    "tundra":                    (["W", "U"], _LT),
-    "underground sea":           (["U", "B"], _LT),
-    "badlands":                  (["B", "R"], _LT),
-    "taiga":                     (["R", "G"], _LT),
-    "savannah":                  (["G", "W"], _LT),
-    "scrubland":                 (["W", "B"], _LT),
-    "volcanic island":           (["U", "R"], _LT),
-    "bayou":                     (["B", "G"], _LT),
-    "plateau":                   (["R", "W"], _LT),
-    "tropical island":           (["G", "U"], _LT),
-    # ── Onslaught Fetch Lands ─────────────────────────────────────────────────
-    "flooded strand":            (["W", "U"], _LT),
-    "polluted delta":            (["U", "B"], _LT),
-    "bloodstained mire":         (["B", "R"], _LT),
-    "wooded foothills":          (["R", "G"], _LT),
-    "windswept heath":           (["G", "W"], _LT),
-    # ── Mirage Fetch Lands ────────────────────────────────────────────────────
-    "flood plain":               (["W", "U"], _LT),
-    "bad river":                 (["U", "B"], _LT),
-    "rocky tar pit":             (["B", "R"], _LT),
-    "mountain valley":           (["R", "G"], _LT),
-    "grasslands":                (["G", "W"], _LT),
-    # ── Pain Lands ────────────────────────────────────────────────────────────
-    "adarkar wastes":            (["W", "U"], _LT),
-    "underground river":         (["U", "B"], _LT),
-    "sulfurous springs":         (["B", "R"], _LT),
-    "karplusan forest":          (["R", "G"], _LT),
-    "brushland":                 (["G", "W"], _LT),
-    "caves of koilos":           (["W", "B"], _LT),
-    "shivan reef":               (["U", "R"], _LT),
-    "llanowar wastes":           (["B", "G"], _LT),
-    "battlefield forge":         (["R", "W"], _LT),
-    "yavimaya coast":            (["G", "U"], _LT),
-    # ── Invasion Lair Lands (tap for one of three colors) ─────────────────────
-    "dromar's cavern":           (["W", "U", "B"], _LT),
-    "treva's ruins":             (["G", "W", "U"], _LT),
-    "darigaaz's caldera":        (["B", "R", "G"], _LT),
-    "crosis's catacombs":        (["U", "B", "R"], _LT),
-    "rith's grove":              (["R", "G", "W"], _LT),
-    # ── Filter Lands ─────────────────────────────────────────────────────────
-    "adarkar wastes":            (["W", "U"], _LT),   # duplicate key safe, last wins
-    # ── 5-color / Any-color Lands ─────────────────────────────────────────────
-    "city of brass":             (["W", "U", "B", "R", "G"], _LT),
-    "undiscovered paradise":     (["W", "U", "B", "R", "G"], _LT),
-    "gemstone mine":             (["W", "U", "B", "R", "G"], _LT),
-    "reflecting pool":           (["W", "U", "B", "R", "G"], _LT),
-    "grand coliseum":            (["W", "U", "B", "R", "G"], _LT),
-    "forbidden orchard":         (["W", "U", "B", "R", "G"], _LT),
-    "mana confluence":           (["W", "U", "B", "R", "G"], _LT),
-    "chromatic lantern":         (["W", "U", "B", "R", "G"], _LT),  # not a land but harmless
-    # ── Mono-color Special Lands ─────────────────────────────────────────────
-    "tolarian academy":          (["U"], _LT),
-    "gaea's cradle":             (["G"], _LT),
-    "serra's sanctum":           (["W"], _LT),
-    "phyrexian tower":           (["B"], _LT),
-    "shivan gorge":              (["R"], _LT),
-    "library of alexandria":     (["U"], _LT),
-    "high market":               (["W"], _LT),
-    "hall of the bandit lord":   (["R"], _LT),
-    "den of the bugbear":        (["R"], _LT),
-    "cave of koilos":            (["W", "B"], _LT),
-    # ── Colorless / Utility Lands (no colored mana production) ───────────────
-    "wasteland":                 ([], _LT),
-    "strip mine":                ([], _LT),
-    "ancient tomb":              ([], _LT),
-    "city of traitors":          ([], _LT),
-    "rishadan port":             ([], _LT),
-    "mishra's factory":          ([], _LT),
-    "urza's mine":               ([], _LT),
-    "urza's tower":              ([], _LT),
-    "urza's power plant":        ([], _LT),
-    "maze of ith":               ([], _LT),
-    "the tabernacle at pendrell vale": ([], _LT),
-    "bazaar of baghdad":         ([], _LT),
-    "karakas":                   (["W"], _LT),
-    "kjeldoran outpost":         (["W"], _LT),
-    "soldevi excavations":       (["U"], _LT),
-    "kjeldoran dead":            ([], _LT),  # not a land
-    "petrified field":           ([], _LT),
-    "dust bowl":                 ([], _LT),
-    "ghost quarter":             ([], _LT),
-    "horizon canopy":            (["G", "W"], _LT),
-    "murmuring bosk":            (["G", "W"], _LT),
-    "sea of clouds":             (["W", "U"], _LT),
-    "morphic pool":              (["U", "B"], _LT),
-    "luxury suite":              (["B", "R"], _LT),
-    "spire garden":              (["R", "G"], _LT),
-    "bountiful promenade":       (["G", "W"], _LT),
-    "tsabo's web":               ([], _LT),   # not a land
-    # ── Taplands (Invasion, Apocalypse, etc.) ────────────────────────────────
-    "coastal tower":             (["W", "U"], _LT),
-    "urborg volcano":            (["U", "B"], _LT),
-    "tainted isle":              (["U", "B"], _LT),
-    "tainted field":             (["W", "B"], _LT),
-    "tainted wood":              (["B", "G"], _LT),
-    "tainted peak":              (["B", "R"], _LT),
-    "salt marsh":                (["U", "B"], _LT),
-    "elfhame palace":            (["G", "W"], _LT),
-    "shivan oasis":              (["R", "G"], _LT),
-    "irrigation ditch":          (["W", "U"], _LT),
-    "geothermal crevice":        (["B", "R"], _LT),
-    "peat bog":                  (["B"], _LT),
-    "river delta":               (["U", "B"], _LT),
-    "tinder farm":               (["R", "G"], _LT),
-    "rushwood grove":            (["G", "W"], _LT),
-    "sulfur vent":               (["B", "R"], _LT),
-    "mountain stronghold":       (["R"], _LT),
-    "skyshroud forest":          (["G", "U"], _LT),
-}
-
-# Karsten 90%-consistency source minimums: (pip_count, target_turn) → sources needed
-# Based on 60-card deck, on the play
-KARSTEN_SOURCES = {
-    (1, 1): 14, (1, 2): 13, (1, 3): 12, (1, 4): 11,
-    (2, 2): 21, (2, 3): 18, (2, 4): 16,
-    (3, 3): 23, (3, 4): 20,
-}
-
-
-@st.cache_data(ttl=604800, show_spinner=False)  # 7-day cache, shared across sessions on Cloud
-def _scryfall_fetch(card_name: str) -> dict | None:
-    """Fetch card data from Scryfall. Retries once on 429 rate-limit."""
-    # Check hardcoded land data first — never hits the API for known lands
-    key = card_name.lower().strip()
-    if key in PREMODERN_LAND_DATA:
-        produced, type_line = PREMODERN_LAND_DATA[key]
-        return {"object": "card", "name": card_name, "type_line": type_line,
-                "mana_cost": "", "produced_mana": produced}
-
-    url = f"https://api.scryfall.com/cards/named?fuzzy={urllib.parse.quote(card_name)}"
-    headers = {"User-Agent": "PremodernLab/1.0", "Accept": "application/json"}
-
-    for attempt in range(2):
-        try:
-            req = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(req, timeout=8) as r:
-                return json.loads(r.read())
-        except urllib.error.HTTPError as e:
-            if e.code == 429 and attempt == 0:
-                time.sleep(2.0)  # back off and retry once
-                continue
-            return None  # 404 not found or other error
-        except Exception:
-            return None
-    return None
-
-
 def _parse_decklist(text: str) -> list[tuple[int, str]]:
     cards = []
     for line in text.strip().splitlines():
@@ -239,50 +64,56 @@ def _parse_decklist(text: str) -> list[tuple[int, str]]:
     return cards
 
 
-def _parse_mana_cost(mc: str) -> dict:
-    """'{2}{W}{U}' → {'cmc': 4, 'pips': {'W':1,'U':1,...}}"""
-    pips = {c: 0 for c in COLORS}
-    cmc = 0
-    for token in re.findall(r'\{([^}]+)\}', mc.upper()):
-        if token.isdigit():
-            cmc += int(token)
-        elif token in COLORS:
-            pips[token] += 1
-            cmc += 1
-        elif "/" in token:
-            # Hybrid mana e.g. {W/U} — counts as 1 CMC, adds 0.5 to each color
-            parts = [p for p in token.split("/") if p in COLORS]
-            for p in parts:
-                pips[p] += 0.5
-            cmc += 1
-        elif token == "X":
-            pass  # X spells: ignore for CMC
-        elif token not in ("S", "C", "T"):
-            try:
-                cmc += int(token)
-            except ValueError:
-                pass
-    return {"cmc": cmc, "pips": pips}
-
-
 def _hypergeom_at_least(N: int, K: int, n: int, k: int) -> float:
     """P(X >= k) for X ~ Hypergeometric(N, K, n). Draws without replacement."""
-    if k <= 0:
-        return 1.0
-    if K < k:
-        return 0.0
-    n = min(n, N)
-    total = math.comb(N, n)
-    if total == 0:
-        return 0.0
-    prob = sum(
-        math.comb(K, i) * math.comb(max(0, N - K), max(0, n - i))
-        for i in range(k, min(K, n) + 1)
-    ) / total
-    return min(1.0, max(0.0, prob))
-
-
-def show_mana_check():
+    return hypergeom_at_least(N, K, n, k)
+
+
+def _lookup_cards(names: list[str], card_cache=None) -> tuple[dict[str, dict], list[str]]:
+    """
+    Card records for names, memoized per session: each name goes through the local
+    database, the card cache and Scryfall once, so re-analyzing an edited list only
+    looks up the lines that changed. Confirmed misses are memoized too, but not names
+    whose lookup failed. Returns (card data, names not found).
+    """
+    memo: dict[str, dict | None] = st.session_state.setdefault("mana_check_cards", {})
+    missing: list[str] = []
+    for name in names:
+        if name not in memo:
+            data = lookup_card(name)
+            if data:
+                memo[name] = data
+            else:
+                missing.append(name)
+    if missing:
+        with st.spinner(f"Looking up {len(missing)} card(s) on Scryfall…"):
+            remote, not_found = resolve_cards(missing, cache=card_cache)
+        memo.update(remote)
+        # Only misses Scryfall confirmed (recorded in the card cache) are memoized; names
+        # lost to a failed request are looked up again on the next analysis
+        if card_cache is not None and not_found:
+            _, confirmed, _ = card_cache.get_many(not_found)
+            memo.update(dict.fromkeys(confirmed))
+    card_data = {n: memo[n] for n in names if memo.get(n)}
+    return card_data, [n for n in names if n not in card_data]
+
+
+@st.cache_data(show_spinner=False)
+def _simulated_mulligans(sources: tuple, deck_size: int, requirements: tuple, required_colors: tuple,
+                         keep_low: int, keep_high: int, on_draw: bool) -> dict:
+    return simulate_mulligans(list(sources), deck_size, requirements, required_colors,
+                              keep_ranges(keep_low, keep_high), on_draw)
+
+
+@st.cache_data(show_spinner=False)
+def _optimized_mana(lands: tuple, mana_perms: tuple, spells: tuple, deck_size: int, on_draw: bool,
+                    low: int, high: int, objective: str) -> dict:
+    """optimize_mana on hashable lists (pips as item tuples), so reruns reuse the search."""
+    return optimize_mana(list(lands), list(mana_perms), [(q, n, cmc, dict(pips)) for q, n, cmc, pips in spells],
+                         deck_size, on_draw, land_counts=range(low, high + 1), objective=objective, top=1)
+
+
+def show_mana_check(card_cache=None):
     st.markdown('<h1 class="page-title">Mana Check</h1>', unsafe_allow_html=True)
     st.caption(
         "Paste your decklist to get recommended land count, color source checks, "
@@ -315,6 +146,28 @@ def show_mana_check():
                 min_value=0, max_value=40, value=0, step=1,
                 help="Total copies of cheap draw/filter spells that reduce your land requirement by ~0.28 each.",
             )
+        optimize_for = st.radio(
+            "Land optimizer goal",
+            ["Average spell", "Worst spell"],
+            horizontal=True,
+            help="Rank basic-land splits by copy-weighted average castability, or by the least castable spell.",
+        )
+        keep_low, keep_high = st.slider(
+            "Keep 7-card hands with (mana sources)",
+            0, 7, (2, 5),
+            help="London mulligan keep rule. 6-card hands keep one source fewer at the top, 5-card hands one fewer at both ends; 4 cards are always kept.",
+        )
+        mull_for_colors = st.toggle(
+            "Mulligan hands missing a color",
+            value=False,
+            help="Also require the kept hand's sources to produce every color your spells use.",
+        )
+        live = st.toggle(
+            "Live analysis",
+            value=True,
+            help="Re-analyze on every edit of the decklist (Ctrl+Enter or click outside the box). "
+                 "Only the cards and spells an edit touches are recomputed.",
+        )
 
     with col_input:
         st.subheader("Decklist")
@@ -332,9 +185,9 @@ def show_mana_check():
             ),
             label_visibility="collapsed",
         )
-        analyze_btn = st.button("Analyze Mana", type="primary")
+        analyze_btn = False if live else st.button("Analyze Mana", type="primary")
 
-    if not analyze_btn or not decklist_text.strip():
+    if not (live or analyze_btn) or not decklist_text.strip():
         _how_it_works()
         return
 
@@ -344,56 +197,25 @@ def show_mana_check():
         st.error("Could not parse decklist. Each line must start with a number: `4 Card Name`.")
         return
 
-    # ── Scryfall lookups ──────────────────────────────────────────────────────
-    unique_names = list({name for _, name in raw_cards})
-    card_data: dict[str, dict] = {}
-    not_found: list[str] = []
-
-    prog = st.progress(0, text="Looking up cards on Scryfall…")
-    for idx, name in enumerate(unique_names):
-        data = _scryfall_fetch(name)
-        if data and data.get("object") == "card":
-            card_data[name] = data
-        else:
-            not_found.append(name)
-        time.sleep(0.1)  # 100ms between requests — Scryfall recommends ≥50ms
-        prog.progress((idx + 1) / len(unique_names), text=f"Scryfall: {name}")
-    prog.empty()
+    # ── Card lookups ──────────────────────────────────────────────────────────
+    # Local card database first (offline, O(1)), then the persistent card cache;
+    # Scryfall only for cards neither of them knows
+    unique_names = list(dict.fromkeys(name for _, name in raw_cards))
+    card_data, not_found = _lookup_cards(unique_names, card_cache)
 
+    corrected = [f"{name} → {rec['name']}" for name, rec in card_data.items()
+                 if rec.get("name") and card_key(rec["name"]) != card_key(name)]
+    if corrected:
+        st.info(f"Corrected card names: {', '.join(corrected)}")
     if not_found:
-        st.warning(f"Not found on Scryfall (check spelling): {', '.join(not_found)}")
+        labels = []
+        for name in not_found:
+            _, suggestions = resolve_card_name(name)
+            labels.append(f"{name} (did you mean {' / '.join(suggestions)}?)" if suggestions else name)
+        st.warning(f"Not found on Scryfall (check spelling): {', '.join(labels)}")
 
     # ── Classify cards ────────────────────────────────────────────────────────
-    lands: list[tuple[int, str, list[str]]] = []       # (qty, name, produced_colors)
-    spells: list[tuple[int, str, float, dict]] = []     # (qty, name, cmc, pips)
-    mana_perms: list[tuple[int, str, list[str]]] = []   # non-land mana permanents (Mox, dorks…)
-    auto_cantrip_adj = 0.0
-
-    for qty, name in raw_cards:
-        d = card_data.get(name)
-        if d is None:
-            continue
-        type_line = d.get("type_line", "")
-
-        if "Land" in type_line:
-            produced = [c for c in d.get("produced_mana", []) if c in COLORS]
-            lands.append((qty, name, produced))
-        else:
-            # Handle split/MDFC cards — take first face mana cost
-            mc = d.get("mana_cost") or ""
-            if not mc and "card_faces" in d:
-                mc = d["card_faces"][0].get("mana_cost", "")
-            parsed = _parse_mana_cost(mc)
-            spells.append((qty, name, parsed["cmc"], parsed["pips"]))
-            if name.lower() in CANTRIP_SAVINGS:
-                auto_cantrip_adj += qty * CANTRIP_SAVINGS[name.lower()]
-            # Non-land permanents that produce colored mana count as sources
-            # (Mox Diamond, Birds of Paradise, Chrome Mox, etc.)
-            # Exclude Instants and Sorceries (Dark Ritual is one-shot, not a permanent source)
-            if "Instant" not in type_line and "Sorcery" not in type_line:
-                produced = [c for c in d.get("produced_mana", []) if c in COLORS]
-                if produced:
-                    mana_perms.append((qty, name, produced))
+    lands, spells, mana_perms, auto_cantrip_adj = classify_cards(raw_cards, card_data)
 
     # Use manual cantrip count if toggle is on, otherwise use auto-detected
     if manual_cantrips:
@@ -402,24 +224,9 @@ def show_mana_check():
         cantrip_adj = auto_cantrip_adj
 
     # ── Aggregate ─────────────────────────────────────────────────────────────
-    total_lands = sum(q for q, _, _ in lands)
-    sources: dict[str, int] = {c: 0 for c in COLORS}
-    for qty, _, produced in lands:
-        for c in produced:
-            sources[c] += qty
-    # Add mana-producing non-land permanents to colored sources
-    for qty, _, produced in mana_perms:
-        for c in produced:
-            sources[c] += qty
-
-    # Total mana sources = lands + mana permanents (Moxen etc. also pay generic mana)
-    total_mana_sources = total_lands + sum(q for q, _, _ in mana_perms)
-
-    spell_qty = sum(q for q, _, _, _ in spells)
-    avg_cmc = sum(q * cmc for q, _, cmc, _ in spells) / spell_qty if spell_qty else 0
-
-    recommended_raw = 19.59 + 1.90 * avg_cmc - cantrip_adj
-    recommended = max(14, min(28, round(recommended_raw)))
+    sources, total_lands, total_mana_sources = aggregate_sources(lands, mana_perms)
+    avg_cmc = average_cmc(spells)
+    recommended = recommended_lands(avg_cmc, cantrip_adj)
 
     # ── KPI row ───────────────────────────────────────────────────────────────
     st.divider()
@@ -453,7 +260,11 @@ def show_mana_check():
 
     if used_colors:
         st.markdown("### Color Source Check")
-        caption = "Karsten minimums for 90% consistency on the play, 60 cards. Green = threshold met · Red = below threshold."
+        caption = (
+            f"Minimum sources for {target_pct}% consistency {'on the draw' if on_draw else 'on the play'}, "
+            f"{int(deck_size)} cards, {total_mana_sources} mana sources (Karsten method: given you hit your land drops). "
+            "Green = threshold met · Red = below threshold."
+        )
         if mana_perms:
             perm_names = ", ".join(f"{q}× {n}" for q, n, _ in mana_perms)
             caption += f"  ·  Sources include mana-producing permanents: {perm_names}."
@@ -466,6 +277,8 @@ def show_mana_check():
         _ok     = THEME["success"]
         _bad    = THEME["danger"]
 
+        grid = source_requirement_grid(int(deck_size), total_mana_sources, target_pct / 100, on_draw)
+
         cols = st.columns(len(used_colors))
         for col, c in zip(cols, used_colors):
             actual = sources[c]
@@ -473,15 +286,15 @@ def show_mana_check():
             for _, _, cmc, pips in spells:
                 pip_f = pips.get(c, 0)
                 if pip_f >= 0.5:
-                    pip_i = min(3, max(1, int(math.ceil(pip_f))))
-                    turn_i = min(4, max(1, int(cmc)))
+                    pip_i = min(MAX_PIPS, max(1, int(math.ceil(pip_f))))
+                    turn_i = min(MAX_TURN, max(pip_i, int(cmc)))
                     relevant.add((pip_i, turn_i))
 
             with col:
                 rows_html = ""
                 for pip_i, turn_i in sorted(relevant):
-                    needed = KARSTEN_SOURCES.get((pip_i, turn_i))
-                    if needed is None:
+                    needed = int(grid[pip_i, turn_i])
+                    if needed < 0:
                         continue
                     ok = actual >= needed
                     clr = _ok if ok else _bad
@@ -521,6 +334,31 @@ def show_mana_check():
                     unsafe_allow_html=True,
                 )
 
+    # ── Mulligans ─────────────────────────────────────────────────────────────
+    sim_sources = tuple((q, tuple(produced)) for q, _, produced in lands + mana_perms)
+    requirements = tuple(spell_requirement(cmc, pips) for _, _, cmc, pips in spells if cmc > 0)
+    mulls = _simulated_mulligans(
+        sim_sources, int(deck_size), requirements,
+        tuple(used_colors) if mull_for_colors else (), keep_low, keep_high, on_draw,
+    )
+    st.markdown("### Mulligans")
+    st.caption(
+        f"100,000 simulated London mulligans: keep 7 with {keep_low}–{keep_high} mana sources"
+        f"{', every color present' if mull_for_colors else ''}; extra sources or spells go to the bottom."
+    )
+    sizes = mulls["hand_sizes"]
+    m1, m2, m3, m4 = st.columns(4)
+    with m1:
+        keep7 = sizes.get(7, 0.0)
+        keep_color = THEME["success"] if keep7 >= 0.85 else THEME["warning"] if keep7 >= 0.75 else THEME["danger"]
+        st.markdown(html_kpi_card("Keep 7", f"{keep7:.1%}", color=keep_color), unsafe_allow_html=True)
+    with m2:
+        st.markdown(html_kpi_card("Keep 6", f"{sizes.get(6, 0.0):.1%}"), unsafe_allow_html=True)
+    with m3:
+        st.markdown(html_kpi_card("5 or fewer", f"{sum(p for n, p in sizes.items() if n <= 5):.1%}"), unsafe_allow_html=True)
+    with m4:
+        st.markdown(html_kpi_card("Avg hand size", f"{mulls['avg_hand_size']:.2f}"), unsafe_allow_html=True)
+
     # ── Spell probability table ───────────────────────────────────────────────
     st.markdown("### Casting Probability on Curve")
     st.caption(
@@ -536,6 +374,12 @@ def show_mana_check():
     _bg2 = THEME["bg"]
     _tgt = target_pct / 100
 
+    # Exact joint probabilities with real multi-colour land assignment (duals pay one pip,
+    # not two), cross-checked by the goldfish simulation. Both are cached per spell on
+    # the sources it can use, so an edit only recomputes the rows it affects.
+    exact = exact_castability(list(sim_sources), int(deck_size), requirements, on_draw)
+    simulated = simulate_castability(list(sim_sources), int(deck_size), requirements, on_draw)
+
     table_rows = ""
     for qty, name, cmc, pips in sorted(spells, key=lambda x: (x[2], x[1])):
         cmc_int = int(cmc)
@@ -549,6 +393,8 @@ def show_mana_check():
                 f"<td style='padding:6px 10px;'>{mc_html}</td>"
                 f"<td style='padding:6px 10px;font-size:14px;font-weight:600;"
                 f"color:{THEME['success']};'>100%</td>"
+                f"<td style='padding:6px 10px;font-size:13px;color:{_mut};'>100%</td>"
+                f"<td style='padding:6px 10px;font-size:13px;color:{_mut};'>100%</td>"
                 f"<td style='padding:6px 10px;font-size:13px;color:{_mut};'>—</td>"
                 f"</tr>"
             )
@@ -585,9 +431,7 @@ def show_mana_check():
         else:
             land_prob = 1.0
 
-        combined = land_prob
-        for p in color_probs.values():
-            combined *= p
+        combined = exact[spell_requirement(cmc, pips)]
 
         # Color: green if on/above target, yellow if within 10pp below, red otherwise
         if combined >= _tgt:
@@ -616,12 +460,16 @@ def show_mana_check():
             f"<td style='padding:6px 10px;'>{mc_html}</td>"
             f"<td style='padding:6px 10px;font-size:15px;font-weight:700;color:{prob_color};'>"
             f"{combined:.1%}</td>"
+            f"<td style='padding:6px 10px;font-size:13px;color:{_mut};'>"
+            f"{simulated[spell_requirement(cmc, pips)]:.1%}</td>"
+            f"<td style='padding:6px 10px;font-size:13px;color:{_mut};'>"
+            f"{mulls['castable'][spell_requirement(cmc, pips)]:.1%}</td>"
             f"<td style='padding:6px 10px;font-size:13px;'>{bottleneck_html}</td>"
             f"</tr>"
         )
 
     if table_rows:
-        headers = ["Card", "CMC", "Mana Cost", "P (on curve)", "Bottleneck"]
+        headers = ["Card", "CMC", "Mana Cost", "P (on curve)", "Simulated", "After Mulligans", "Bottleneck"]
         header_html = "".join(
             f"<th style='padding:7px 10px;text-align:left;border-bottom:1px solid {_brd};"
             f"color:{_fnt};font-size:12px;font-weight:500;'>{h}</th>"
@@ -635,7 +483,68 @@ def show_mana_check():
             unsafe_allow_html=True,
         )
 
+    # ── Land optimizer ────────────────────────────────────────────────────────
+    if spells and lands:
+        low = max(14, min(total_lands, recommended) - 2)
+        high = min(28, max(total_lands, recommended) + 2)
+        best = _optimized_mana(
+            tuple((q, name, tuple(produced)) for q, name, produced in lands),
+            tuple((q, name, tuple(produced)) for q, name, produced in mana_perms),
+            tuple((q, name, cmc, tuple(sorted(pips.items()))) for q, name, cmc, pips in spells),
+            int(deck_size), on_draw, low, high,
+            "weighted" if optimize_for == "Average spell" else "minimum",
+        )
+        if best:
+            st.markdown("### Land Optimizer")
+            st.caption(
+                "Best basic-land split for each land count; non-basic lands and mana permanents are kept as listed. "
+                f"Ranked by {'average' if optimize_for == 'Average spell' else 'worst'} P (on curve). "
+                "More lands always cast spells more reliably — weigh the gain against flood."
+            )
+            opt_rows = ""
+            for n_lands, configs in best.items():
+                if not configs:
+                    continue
+                cfg = configs[0]
+                basics_html = "  ".join(
+                    f"<span style='white-space:nowrap;'>{n} {mana_img(c, 15)}</span>"
+                    for c, n in cfg["basics"].items()
+                ) or "—"
+                tags = []
+                if n_lands == total_lands:
+                    tags.append("current")
+                if n_lands == recommended:
+                    tags.append("recommended")
+                tag_html = f" <span style='color:{_fnt};font-size:12px;'>({', '.join(tags)})</span>" if tags else ""
+                weight = "700" if tags else "400"
+                opt_rows += (
+                    f"<tr style='border-bottom:1px solid {_bg2};'>"
+                    f"<td style='padding:6px 10px;font-size:14px;font-weight:{weight};'>{n_lands}{tag_html}</td>"
+                    f"<td style='padding:6px 10px;font-size:13px;'>{basics_html}</td>"
+                    f"<td style='padding:6px 10px;font-size:14px;font-weight:600;'>{cfg['weighted']:.1%}</td>"
+                    f"<td style='padding:6px 10px;font-size:13px;color:{_mut};'>"
+                    f"{cfg['worst']} ({cfg['minimum']:.1%})</td>"
+                    f"</tr>"
+                )
+            header_html = "".join(
+                f"<th style='padding:7px 10px;text-align:left;border-bottom:1px solid {_brd};"
+                f"color:{_fnt};font-size:12px;font-weight:500;'>{h}</th>"
+                for h in ["Lands", "Basics", "Average P", "Worst spell"]
+            )
+            st.markdown(
+                f"<table style='width:100%;border-collapse:collapse;background:{_sur};"
+                f"border-radius:8px;overflow:hidden;'>"
+                f"<thead><tr>{header_html}</tr></thead>"
+                f"<tbody>{opt_rows}</tbody></table>",
+                unsafe_allow_html=True,
+            )
+
     # ── Methodology ───────────────────────────────────────────────────────────
+    summary_grid = source_requirement_grid(int(deck_size), total_mana_sources, target_pct / 100, on_draw)
+    source_summary = "  ·  ".join(
+        f"T{t} {p}-pip → {summary_grid[p, t]}"
+        for t in range(1, 4) for p in range(1, t + 1) if summary_grid[p, t] >= 0
+    ) or "—"
     with st.expander("Methodology"):
         st.markdown(f"""
 **Hypergeometric distribution** — correct model for sampling without replacement.
@@ -649,13 +558,19 @@ P = P(draw ≥ k blue sources). No separate land check — an Island satisfies b
 P = P(draw ≥ k colored sources) × P(draw ≥ CMC total mana sources).
 Total mana sources = lands + mana-producing permanents (Mox Diamond etc.).
 
-Multi-color is treated as independent per color (slight underestimate when colors share dual lands).
+The per-color factors above are what the Bottleneck column shows. The P column itself is exact for multi-color decks: it sums over every joint draw of mono lands, duals, five-color and colorless sources, with each source paying one pip. Multiplying the per-color factors instead would treat colors as independent and underestimate decks with dual lands.
+
+**After Mulligans** — the same check on the hand actually kept under the keep rule above (London mulligan, cards on the bottom are not drawn), so it includes the benefit of shipping back bad hands and the cost of smaller ones.
+
+**Simulated** — 100,000 shuffled games of the actual deck. A spell counts as castable when the sources seen can pay its whole cost with each source assigned to one pip, so a dual land helps either color but not both at once.
 
 **Land recommendation**: `19.59 + 1.90 × avgCMC − cantrip_adjustment`
 Frank Karsten 2022 regression. Cantrips: −{list(CANTRIP_SAVINGS.values())[0]} per copy.
 
-**Source minimums** (Karsten, 90%, 60 cards, on the play):
-T1 1-pip → 14  ·  T2 1-pip → 13  ·  T2 2-pip → 21  ·  T3 1-pip → 12  ·  T3 2-pip → 18  ·  T3 3-pip → 23
+**Source minimums** ({target_pct}%, {int(deck_size)} cards, {total_mana_sources} mana sources, {'on the draw' if on_draw else 'on the play'}):
+{source_summary}
+
+Smallest number of sources of a color so that P(≥ pips of that color by turn T | ≥ T mana sources by turn T) reaches the target — Karsten's convention of conditioning on hitting land drops, computed exactly for your deck size and settings.
         """)
 
 
@@ -665,7 +580,7 @@ def _how_it_works():
     c1, c2, c3 = st.columns(3)
     with c1:
         st.markdown("**1. Paste decklist**")
-        st.caption("Standard `4 Card Name` format. Each card is looked up on Scryfall automatically to get mana cost and land color production.")
+        st.caption("Standard `4 Card Name` format. Mana costs and land color production come from a local Scryfall card database; unknown cards are looked up on Scryfall.")
     with c2:
         st.markdown("**2. Hypergeometric math**")
         st.caption("For each spell, calculates P(have enough lands AND enough colored sources) by turn = CMC. Based on Frank Karsten's methodology.")
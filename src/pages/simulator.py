@@ -2,9 +2,18 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 from src.analytics import calculate_expected_winrate
+from src.tournament_sim import estimate_top8_odds, swiss_rounds
 from src.ui import THEME, style_winrate, html_deck_table
 
 _PLOTLY_NO_TOOLBAR = {"displayModeBar": False}
+_TOP8_TARGET_SE = 0.01  # stop simulating once every Top 8 estimate is this precise
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _cached_top8_odds(candidates, shares_items, _matchups_matrix, matrix_key, n_players):
+    """Swiss Top 8 odds per candidate deck; shares are passed as a tuple so they hash."""
+    return estimate_top8_odds(list(candidates), dict(shares_items), _matchups_matrix,
+                              n_players=n_players, target_se=_TOP8_TARGET_SE)
 
 def show_simulator(matrix_dict, all_archetypes, records_data):
     st.markdown('<h1 class="page-title">Tournament Simulator</h1>', unsafe_allow_html=True)
@@ -76,6 +85,11 @@ def show_simulator(matrix_dict, all_archetypes, records_data):
 
     meta_shares["Other Decks"] = remaining / 100
 
+    n_players = st.number_input(
+        "Tournament size (players)", min_value=8, max_value=256, value=64, step=8, key="sim_n_players",
+        help="Used for the Top 8 odds: a Swiss tournament of this size, followed by a cut to Top 8.",
+    )
+
     col_btn1, col_btn2 = st.columns([0.25, 0.75])
     with col_btn1:
         calc_btn = st.button("Calculate Projected EV", type="primary")
@@ -98,15 +112,29 @@ def show_simulator(matrix_dict, all_archetypes, records_data):
             ev_df = ev_df.sort_values("Projected Win Rate", ascending=False).reset_index(drop=True)
             ev_df["#"] = ev_df.index + 1
 
+            # Top 8 odds from simulated Swiss tournaments, reported with their standard error
+            matrix_key = (matrix_dict.get("time_frame"), matrix_dict.get("end_date"))
+            top8, n_sim = _cached_top8_odds(
+                tuple(ev_df["Deck"]), tuple(sorted(meta_shares.items())),
+                matchups_matrix, matrix_key, int(n_players),
+            )
+            ev_df["Top 8 Odds"] = ev_df["Deck"].map(
+                lambda deck: f"{top8[deck][0]:.1%} ± {top8[deck][1]:.1%}" if deck in top8 else "—"
+            )
+
             st.divider()
 
             st.markdown("<h3>Best Deck for the Field</h3>", unsafe_allow_html=True)
-            d = ev_df[["#", "Deck", "Projected Win Rate"]].head(10).copy()
+            d = ev_df[["#", "Deck", "Projected Win Rate", "Top 8 Odds"]].head(10).copy()
             d["Projected Win Rate"] = d["Projected Win Rate"].map(lambda x: f"{x:.1%}")
             
             # Show the table full-width, centered
             _, tbl_col, _ = st.columns([0.1, 0.8, 0.1])
             with tbl_col:
-                st.markdown(html_deck_table(d, ["#", "Deck", "Projected Win Rate"], wr_col="Projected Win Rate"), unsafe_allow_html=True)
+                st.markdown(html_deck_table(d, ["#", "Deck", "Projected Win Rate", "Top 8 Odds"], wr_col="Projected Win Rate"), unsafe_allow_html=True)
+                st.caption(
+                    f"Top 8 Odds: {n_sim:,} simulated {int(n_players)}-player tournaments "
+                    f"({swiss_rounds(int(n_players))} Swiss rounds + Top 8 cut), ± one standard error."
+                )
 
 
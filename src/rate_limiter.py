@@ -0,0 +1,126 @@
+"""
+Adaptive request pacing for the scrapers.
+
+A token bucket whose refill rate adapts to how the site responds (AIMD): every
+successful request raises the rate a little (additive increase), a block, 403 or 429
+halves it (multiplicative decrease; 503 too). A healthy host is therefore fetched faster and
+faster up to max_rate, while one that pushes back is slowed down at once, with no
+hand-tuned sleeps.
+
+reserve() takes a token and returns how long the caller has to wait for it, so the
+same limiter paces threads (wait()) and asyncio tasks (wait_async()) alike.
+
+Every outbound client takes its limiter from limiter_for(url): one per site, shared by
+all threads of the process, starting from the site's entry in HOST_LIMITS (which also
+covers its subdomains). Clients
+report each answer with observe(status, retry_after).
+"""
+import asyncio
+import threading
+import time
+import urllib.parse
+from email.utils import parsedate_to_datetime
+
+# Starting pace per site, subdomains included; anything else gets DEFAULT_LIMITS
+HOST_LIMITS = {
+    "mtgdecks.net": dict(rate=1.0, max_rate=4.0),                   # blocks bursts with 403s
+    "moxfield.com": dict(rate=1.0, max_rate=2.0),
+    "api.scryfall.com": dict(rate=8.0, burst=2.0, max_rate=10.0),   # asks for 50–100 ms between requests
+}
+DEFAULT_LIMITS = dict(rate=2.0, max_rate=8.0)
+BACKOFF_STATUSES = {403, 429, 503}
+
+
+class AdaptiveRateLimiter:
+    def __init__(self, rate: float = 1.0, burst: float = 1.0, min_rate: float = 0.05, max_rate: float = 4.0,
+                 increase: float = 0.05, decrease: float = 0.5):
+        self.rate = rate                  # requests per second, adapted
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take the next request slot; seconds until it starts (0 if a token is available now)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= 1  # a negative balance queues the callers behind each other
+            return max(0.0, -self._tokens / self.rate)
+
+    def wait(self):
+        delay = self.reserve()
+        if delay:
+            time.sleep(delay)
+
+    async def wait_async(self):
+        delay = self.reserve()
+        if delay:
+            await asyncio.sleep(delay)
+
+    def success(self):
+        """The host answered normally: raise the rate a notch."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def backoff(self, retry_after: float | None = None):
+        """The host pushed back: halve the rate and, given Retry-After, pause everyone that long."""
+        with self._lock:
+            self._refill(time.monotonic())
+            self.rate = max(self.min_rate, self.rate * self.decrease)
+            self._tokens = min(self._tokens, 0.0)
+            if retry_after:
+                self._tokens = min(self._tokens, -retry_after * self.rate)
+
+    def observe(self, status: int, retry_after: str | None = None):
+        """Adapt to an HTTP answer: back off on 403/429/503, speed up on anything else below 500."""
+        if status in BACKOFF_STATUSES:
+            self.backoff(parse_retry_after(retry_after))
+        elif 0 < status < 500:
+            self.success()
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """Seconds from a Retry-After header (delta-seconds or HTTP date); None if absent or unparsable."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+_limiters: dict[str, AdaptiveRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def _site(host: str) -> str:
+    """The HOST_LIMITS entry a host falls under (api.moxfield.com -> moxfield.com), else the host itself."""
+    for site in HOST_LIMITS:
+        if host == site or host.endswith("." + site):
+            return site
+    return host[4:] if host.startswith("www.") else host
+
+
+def limiter_for(url: str) -> AdaptiveRateLimiter:
+    """
+    The process-wide limiter of the URL's site (a bare host name works too). Subdomains
+    of a HOST_LIMITS entry share its limiter, so www. and api. hosts are paced together.
+    """
+    host = (urllib.parse.urlsplit(url).hostname if "//" in url else url.split(":")[0]) or ""
+    site = _site(host.lower())
+    with _limiters_lock:
+        if site not in _limiters:
+            _limiters[site] = AdaptiveRateLimiter(**HOST_LIMITS.get(site, DEFAULT_LIMITS))
+        return _limiters[site]
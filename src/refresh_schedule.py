@@ -0,0 +1,128 @@
+"""
+Staleness-priority scheduling of archetype decklist refreshes.
+
+Each archetype is scored by how many new decks we expect to find and how much they
+matter: expected new decks = new-deck rate × days since it was last checked (or since
+its newest stored deck, if never), capped at the decks kept per archetype; value =
+expected new decks × its 30-day meta share (with a small floor, so niche decks are
+still refreshed eventually). plan() orders archetypes by value and keeps as many as
+fit a per-run request budget, so the decks users look at stay fresh and quiet
+archetypes cost nothing.
+
+The new-deck rate starts from the spacing of the stored decks' dates and is then
+learned from what each refresh actually finds; it and the date of the last check are
+kept in data/refresh_state.json, next to the data the scrapers commit.
+"""
+import json
+import math
+import os
+from dataclasses import dataclass
+from datetime import date
+
+from src.listing_refresh import newest_date, parse_listing_date
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REFRESH_STATE_FILE = os.path.join(BASE_DIR, "data", "refresh_state.json")
+META_FILE = os.path.join(BASE_DIR, "data", "mtgdecks_matrix_30_days.json")
+
+DEFAULT_BUDGET = 200        # requests per run
+DEFAULT_RATE = 1 / 30       # new decks per day when nothing is known
+SHARE_FLOOR = 0.002         # meta share assumed for archetypes outside the 30-day file
+RATE_MEMORY = 0.5           # weight of the previous rate when a refresh reports a new one
+
+
+@dataclass
+class Staleness:
+    archetype: str
+    newest: date | None     # newest stored deck
+    days: float             # since the last check (or the newest deck)
+    share: float
+    rate: float             # new decks per day
+    expected_new: float
+    value: float
+    cost: int               # estimated requests to refresh
+
+
+def load_meta_shares(path: str = META_FILE) -> dict[str, float]:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f).get("meta_shares", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def deck_rate(decks: list[dict]) -> float:
+    """New decks per day implied by the spacing of the stored decks' dates."""
+    dates = sorted(d for d in (parse_listing_date(deck.get("date")) for deck in decks) if d)
+    if len(dates) < 2:
+        return DEFAULT_RATE
+    return (len(dates) - 1) / max((dates[-1] - dates[0]).days, 1)
+
+
+def listing_cost(expected_new: float) -> int:
+    """One listing page plus a decklist per expected new deck."""
+    return 1 + math.ceil(expected_new)
+
+
+class RefreshScheduler:
+    def __init__(self, decklists: dict[str, list[dict]], meta_shares: dict[str, float] | None = None,
+                 state_path: str = REFRESH_STATE_FILE, today: date | None = None, max_decks: int = 20):
+        self.decklists = decklists
+        self.meta_shares = load_meta_shares() if meta_shares is None else meta_shares
+        self.state_path = state_path
+        self.today = today or date.today()
+        self.max_decks = max_decks
+        try:
+            with open(state_path, "r", encoding="utf-8") as f:
+                self.state = json.load(f)
+        except (OSError, ValueError):
+            self.state = {}
+
+    def score(self, arch: str, cost=listing_cost) -> Staleness:
+        decks = self.decklists.get(arch, [])
+        newest = newest_date(decks)
+        state = self.state.get(arch, {})
+        checked = date.fromisoformat(state["checked"]) if "checked" in state else newest
+        rate = state.get("rate", deck_rate(decks))
+        if checked is None:
+            expected = float(self.max_decks)  # never scraped: everything is new
+            days = math.inf
+        else:
+            days = max((self.today - checked).days, 0)
+            expected = min(self.max_decks, rate * days)
+        share = max(self.meta_shares.get(arch, 0.0), SHARE_FLOOR)
+        return Staleness(arch, newest, days, share, rate, expected, expected * share, cost(expected))
+
+    def plan(self, archetypes, budget: int = DEFAULT_BUDGET, cost=listing_cost) -> list[Staleness]:
+        """The archetypes worth refreshing this run, most valuable first, within `budget` requests (0: no limit)."""
+        ranked = sorted((self.score(a, cost) for a in archetypes), key=lambda s: s.value, reverse=True)
+        if budget <= 0:
+            return ranked
+        chosen, spent = [], 0
+        for s in ranked:
+            if s.expected_new > 0 and spent + s.cost <= budget:
+                chosen.append(s)
+                spent += s.cost
+        return chosen
+
+    def record(self, arch: str, new_decks: int):
+        """A refresh of `arch` found `new_decks` new decks: learn the rate, mark it checked today, save."""
+        s = self.score(arch)
+        rate = s.rate
+        if math.isfinite(s.days) and s.days > 0:
+            rate = RATE_MEMORY * rate + (1 - RATE_MEMORY) * new_decks / s.days
+        self.state[arch] = {"checked": self.today.isoformat(), "rate": round(rate, 5)}
+        tmp = self.state_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.state_path)
+
+
+def print_plan(plan: list[Staleness], skipped: int = 0):
+    print(f"{'Archetype':<28} {'newest':>10} {'days':>5} {'share':>6} {'rate/d':>7} {'exp.new':>7} {'cost':>5}")
+    for s in plan:
+        days = "never" if not math.isfinite(s.days) else f"{s.days:.0f}"
+        print(f"{s.archetype[:28]:<28} {str(s.newest or '-'):>10} {days:>5} {s.share:6.1%} "
+              f"{s.rate:7.3f} {s.expected_new:7.1f} {s.cost:>5}")
+    print(f"{len(plan)} archetype(s), ~{sum(s.cost for s in plan)} requests"
+          + (f"; {skipped} deferred to a later run" if skipped else ""))
@@ -0,0 +1,141 @@
+"""
+Scryfall client for cards missing from the local card database.
+
+Typos are first fixed offline by the trigram resolver in src/card_names.py. Names still
+unresolved are sent in batches of up to 75 identifiers to POST /cards/collection,
+so a whole decklist costs one or two round-trips. Names the collection endpoint cannot
+match exactly fall back to one GET /cards/named?fuzzy= each.
+
+Requests are paced by the host's adaptive rate limiter (src/rate_limiter.py), which
+starts near Scryfall's requested 50–100 ms spacing and backs off on 429.
+
+The base URL can be pointed at the local stand-in (scripts/scryfall_standin.py) with
+the SCRYFALL_API_URL environment variable.
+"""
+import json
+import os
+import urllib.error
+import urllib.parse
+import urllib.request
+
+from src.card_db import card_from_scryfall, card_key, lookup_card
+from src.card_names import resolve_card_name
+from src.rate_limiter import limiter_for
+
+SCRYFALL_API = os.environ.get("SCRYFALL_API_URL", "https://api.scryfall.com").rstrip("/")
+COLLECTION_BATCH = 75   # Scryfall's limit for /cards/collection
+HEADERS = {"User-Agent": "PremodernLab/1.0", "Accept": "application/json"}
+
+
+def _request_json(url: str, payload: dict | None = None, timeout: int = 15) -> tuple[int, dict | None]:
+    """
+    GET (or POST a JSON payload) and decode the response, paced by the host's rate
+    limiter. Retries once on 429, after the limiter's backoff (or Retry-After).
+    Returns (HTTP status, body); status 0 means the request itself failed.
+    """
+    data = json.dumps(payload).encode() if payload is not None else None
+    headers = dict(HEADERS, **({"Content-Type": "application/json"} if data else {}))
+    limiter = limiter_for(url)
+    for attempt in range(2):
+        limiter.wait()
+        try:
+            req = urllib.request.Request(url, data=data, headers=headers)
+            with urllib.request.urlopen(req, timeout=timeout) as r:
+                limiter.observe(r.status)
+                return r.status, json.loads(r.read())
+        except urllib.error.HTTPError as e:
+            limiter.observe(e.code, e.headers.get("Retry-After"))
+            if e.code == 429 and attempt == 0:
+                continue
+            return e.code, None  # 404 not found or other error
+        except Exception:
+            return 0, None
+    return 429, None
+
+
+def fetch_collection(names: list[str], base_url: str = SCRYFALL_API) -> tuple[dict[str, dict], list[str]]:
+    """
+    Resolve exact card names in batches of COLLECTION_BATCH.
+    Returns ({requested name: card record}, [names Scryfall reported as not found]).
+    Names from a batch that failed outright are in neither.
+    """
+    found: dict[str, dict] = {}
+    not_found: list[str] = []
+    pending = list(dict.fromkeys(names))
+    for start in range(0, len(pending), COLLECTION_BATCH):
+        chunk = pending[start:start + COLLECTION_BATCH]
+        status, resp = _request_json(
+            f"{base_url}/cards/collection",
+            {"identifiers": [{"name": n} for n in chunk]},
+        )
+        if status != 200 or not resp:
+            continue
+        # Match returned cards back to the requested spelling (case, split-card front face)
+        by_key: dict[str, dict] = {}
+        for card in resp.get("data", []):
+            rec = card_from_scryfall(card)
+            by_key.setdefault(card_key(rec["name"]), rec)
+            if " // " in rec["name"]:
+                by_key.setdefault(card_key(rec["name"].split(" // ")[0]), rec)
+        for name in chunk:
+            rec = by_key.get(card_key(name))
+            if rec:
+                found[name] = rec
+            else:
+                not_found.append(name)
+    return found, not_found
+
+
+def fetch_fuzzy(name: str, base_url: str = SCRYFALL_API) -> tuple[dict | None, bool]:
+    """
+    Resolve a single, possibly misspelled, card name.
+    Returns (card record or None, whether Scryfall confirmed there is no such card).
+    """
+    status, card = _request_json(f"{base_url}/cards/named?fuzzy={urllib.parse.quote(name)}", timeout=8)
+    if card and card.get("object") == "card":
+        return card_from_scryfall(card), False
+    return None, status == 404
+
+
+def resolve_cards(names: list[str], base_url: str = SCRYFALL_API, fuzzy_fallback: bool = True,
+                  cache=None) -> tuple[dict[str, dict], list[str]]:
+    """
+    Local card database first (exact, then the offline fuzzy resolver), then the
+    persistent card cache (if given), then batched /cards/collection, then fuzzy lookups
+    for whatever is left. Results and confirmed misses are written back to the cache.
+    Returns ({name: card record}, [names not found]).
+    """
+    found: dict[str, dict] = {}
+    missing: list[str] = []
+    for name in dict.fromkeys(names):
+        rec = lookup_card(name)
+        if not rec:
+            canonical, _ = resolve_card_name(name)
+            rec = lookup_card(canonical) if canonical else None
+        if rec:
+            found[name] = rec
+        else:
+            missing.append(name)
+
+    known_missing: list[str] = []
+    if cache is not None and missing:
+        hits, known_missing, missing = cache.get_many(missing)
+        found.update(hits)
+    if not missing:
+        return found, known_missing
+
+    remote, confirmed = fetch_collection(missing, base_url)
+    found.update(remote)
+    unresolved = [n for n in missing if n not in remote]
+    if fuzzy_fallback:
+        confirmed = []
+        for name in unresolved:
+            rec, gone = fetch_fuzzy(name, base_url)
+            if rec:
+                remote[name] = found[name] = rec
+            elif gone:
+                confirmed.append(name)
+
+    if cache is not None:
+        cache.put_many(remote, confirmed)
+    return found, known_missing + [n for n in unresolved if n not in found]
@@ -0,0 +1,196 @@
+"""
+Monte Carlo Swiss tournament sampler for the Tournament Simulator page.
+
+Each simulated tournament seats one "hero" player on the candidate deck and fills
+the remaining seats from the field composition. Rounds are paired by sorting on
+points (random tiebreak), match results come from the matchup matrix, and the hero
+makes Top 8 if fewer than 8 players finish ahead after the last round.
+
+Four variance reduction techniques are available and enabled by default:
+  * common random numbers — every candidate deck plays the exact same fields,
+    tiebreaks and match uniforms, so differences between decks are paired;
+  * antithetic variates — every tournament is mirrored with 1 − U for all uniforms;
+  * stratified field sampling — opponent decks are drawn by systematic sampling
+    from the field CDF, so each tournament's field matches the shares almost exactly;
+  * conditioning on the hero's final match — both outcomes are scored and weighted by
+    the hero's win probability, which turns the 0/1 Top 8 indicator into a smoother value.
+
+Plain sampling (all four switched off) is kept for benchmarking, see
+scripts/bench_tournament_sampling.py.
+"""
+import math
+import numpy as np
+
+TOP_CUT = 8
+BATCH_SIZE = 500  # tournaments per batch; keeps (decks × tournaments × players) arrays small
+
+
+def swiss_rounds(n_players: int) -> int:
+    """Number of Swiss rounds needed to find an undefeated player."""
+    return max(1, math.ceil(math.log2(max(2, n_players))))
+
+
+def build_win_prob_table(decks: list[str], matrix: dict) -> np.ndarray:
+    """
+    P[i, j] = probability that decks[i] beats decks[j].
+    Missing matchups default to 50%. Both directions of the matrix are averaged so
+    that P[i, j] + P[j, i] == 1.
+    """
+    n = len(decks)
+    raw = np.full((n, n), 0.5)
+    for i, a in enumerate(decks):
+        row = matrix.get(a, {})
+        for j, b in enumerate(decks):
+            cell = row.get(b)
+            if cell and cell.get("total_matches", 0) > 0:
+                raw[i, j] = cell.get("win_rate", 0.5)
+    probs = (raw + (1.0 - raw.T)) / 2.0
+    np.fill_diagonal(probs, 0.5)
+    return probs
+
+
+def _field_decks(u_field, field_cdf, stratified):
+    """Map uniforms to opponent deck indices via the inverse field CDF."""
+    if stratified:
+        # Systematic sampling: one offset per tournament, seats spread evenly over [0, 1)
+        n_seats = u_field.shape[-1]
+        offsets = u_field[..., :1]
+        positions = (np.arange(n_seats) + offsets) / n_seats
+    else:
+        positions = u_field
+    return np.minimum(np.searchsorted(field_cdf, positions, side="right"), len(field_cdf) - 1)
+
+
+def _run_batch(hero_idx, field_idx, field_cdf, probs, n_players, n_rounds, rng,
+               n_obs, antithetic, common_random_numbers, stratified, conditional):
+    """
+    Simulate one batch and return a (candidates × n_obs) matrix of i.i.d. observations:
+    the 0/1 Top 8 indicator, or the mean of a mirrored pair when antithetic.
+    """
+    n_cand = len(hero_idx)
+    # With common random numbers every candidate shares one stream (leading axis of 1)
+    lead = 1 if common_random_numbers else n_cand
+    half = n_players // 2
+
+    def _uniforms(*shape):
+        u = rng.random((lead, n_obs) + shape)
+        return np.concatenate([u, 1.0 - u], axis=1) if antithetic else u
+
+    u_field = _uniforms(n_players - 1)
+    u_match = _uniforms(n_rounds, half)
+    # The hero's own match gets a dedicated uniform per round, so its results stay coupled
+    # across candidate decks even after pairings diverge
+    u_hero = _uniforms(n_rounds)
+    # Tiebreak noise is not mirrored — it only orders players on equal points
+    noise = rng.random((lead, u_field.shape[1], n_rounds + 1, n_players)) * 0.5
+
+    opp_decks = field_idx[_field_decks(u_field, field_cdf, stratified)]
+    hero = np.broadcast_to(hero_idx[:, None, None], (n_cand, u_field.shape[1], 1))
+    decks = np.concatenate([hero, np.broadcast_to(opp_decks, (n_cand,) + opp_decks.shape[1:])], axis=2)
+
+    points = np.zeros(decks.shape)
+    for r in range(n_rounds):
+        order = np.argsort(-(points + noise[:, :, r]), axis=2)
+        a, b = order[..., 0::2], order[..., 1::2]
+        p_a = probs[np.take_along_axis(decks, a, axis=2), np.take_along_axis(decks, b, axis=2)]
+        hero_slot = (a == 0) | (b == 0)
+        u = np.where(hero_slot, np.where(a == 0, u_hero[:, :, r, None], 1.0 - u_hero[:, :, r, None]),
+                     u_match[:, :, r])
+        a_wins = (u < p_a).astype(float)
+        before = points
+        points = points.copy()
+        np.put_along_axis(points, a, np.take_along_axis(points, a, axis=2) + a_wins, axis=2)
+        np.put_along_axis(points, b, np.take_along_axis(points, b, axis=2) + 1.0 - a_wins, axis=2)
+
+    final = points + noise[:, :, n_rounds]
+    if not conditional:
+        top8 = ((final[..., 1:] > final[..., :1]).sum(axis=2) < TOP_CUT).astype(float)
+        return (top8[:, :n_obs] + top8[:, n_obs:]) / 2.0 if antithetic else top8
+
+    # Conditional Monte Carlo on the hero's final match: score both outcomes and weight
+    # them by the hero's win probability instead of using the sampled 0/1 result
+    slot = hero_slot.argmax(axis=2)[..., None]
+    hero_is_a = np.take_along_axis(a, slot, axis=2) == 0
+    opp = np.where(hero_is_a, np.take_along_axis(b, slot, axis=2), np.take_along_axis(a, slot, axis=2))
+    p_hero = np.where(hero_is_a, np.take_along_axis(p_a, slot, axis=2),
+                      1.0 - np.take_along_axis(p_a, slot, axis=2))[..., 0]
+    base_hero = before[..., 0] + noise[:, :, n_rounds, 0]
+    base_opp = np.take_along_axis(before, opp, axis=2) + np.take_along_axis(noise[:, :, n_rounds], opp, axis=2)
+
+    def _top8(hero_pts, opp_pts):
+        scored = final.copy()
+        np.put_along_axis(scored, opp, opp_pts, axis=2)
+        return (scored[..., 1:] > hero_pts[..., None]).sum(axis=2) < TOP_CUT
+
+    top8 = p_hero * _top8(base_hero + 1.0, base_opp) + (1.0 - p_hero) * _top8(base_hero, base_opp + 1.0)
+    if antithetic:
+        return (top8[:, :n_obs] + top8[:, n_obs:]) / 2.0
+    return top8
+
+
+def sample_top8_observations(candidates, meta_shares, matrix, n_players=64, n_rounds=None,
+                             n_tournaments=2000, seed=0, antithetic=True,
+                             common_random_numbers=True, stratified=True, conditional=True):
+    """
+    I.i.d. Top 8 observations, shape (len(candidates), n_obs).
+    Without antithetic variates n_obs == n_tournaments; with them every observation is
+    the average of a mirrored pair, so n_obs == n_tournaments // 2.
+    """
+    field = [(d, s) for d, s in meta_shares.items() if s > 0]
+    if not field or not candidates:
+        return np.zeros((len(candidates), 0))
+    n_players += n_players % 2  # Swiss pairing needs an even field
+    n_rounds = n_rounds or swiss_rounds(n_players)
+
+    decks = list(dict.fromkeys(list(candidates) + [d for d, _ in field]))
+    index = {d: i for i, d in enumerate(decks)}
+    probs = build_win_prob_table(decks, matrix)
+    hero_idx = np.array([index[c] for c in candidates])
+    field_idx = np.array([index[d] for d, _ in field])
+    shares = np.array([s for _, s in field], dtype=float)
+    field_cdf = np.cumsum(shares / shares.sum())
+
+    rng = np.random.default_rng(seed)
+    per_obs = 2 if antithetic else 1
+    total_obs = max(1, n_tournaments // per_obs)
+    batch_obs = max(1, BATCH_SIZE // per_obs)
+    batches = []
+    for start in range(0, total_obs, batch_obs):
+        batches.append(_run_batch(hero_idx, field_idx, field_cdf, probs, n_players, n_rounds, rng,
+                                  min(batch_obs, total_obs - start), antithetic,
+                                  common_random_numbers, stratified, conditional))
+    return np.concatenate(batches, axis=1)
+
+
+def summarize_observations(obs):
+    """Return (mean, standard error) arrays for every candidate."""
+    n = obs.shape[1]
+    means = obs.mean(axis=1) if n else np.zeros(obs.shape[0])
+    se = obs.std(axis=1, ddof=1) / np.sqrt(n) if n > 1 else np.full(obs.shape[0], np.nan)
+    return means, se
+
+
+def estimate_top8_odds(candidates, meta_shares, matrix, n_players=64, target_se=0.01,
+                       max_tournaments=8000, seed=0, **sampler_kwargs):
+    """
+    Run batches until every candidate's Top 8 estimate has standard error ≤ target_se
+    (or max_tournaments is reached). With an empty field every estimate is NaN.
+    Returns ({deck: (top8_probability, standard_error)}, tournaments_simulated).
+    """
+    per_obs = 2 if sampler_kwargs.get("antithetic", True) else 1
+    chunks = []
+    done = 0
+    means, se = np.full(len(candidates), np.nan), np.full(len(candidates), np.nan)
+    while done < max_tournaments:
+        size = min(BATCH_SIZE, max_tournaments - done)
+        chunks.append(sample_top8_observations(
+            candidates, meta_shares, matrix, n_players=n_players,
+            n_tournaments=size, seed=seed + len(chunks), **sampler_kwargs,
+        ))
+        if not chunks[-1].shape[1]:
+            break  # no field (all meta shares 0) or no candidates: nothing to simulate
+        done += chunks[-1].shape[1] * per_obs
+        means, se = summarize_observations(np.concatenate(chunks, axis=1))
+        if np.all(se <= target_se):
+            break
+    return {c: (float(m), float(s)) for c, m, s in zip(candidates, means, se)}, done
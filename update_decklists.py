@@ -1,12 +1,14 @@
 """
 Update decklists.json with fresh data from mtgdecks.net.
-Merges new decks with existing ones (deduplicates by URL).
-Usage: python update_decklists.py [--archetypes "Psychatog,Burn"] [--max-decks 10]
+Merges new decks with existing ones (deduplicates by URL). Listings are read only down
+to the decks already stored (--full re-scans every page). Without --archetypes, the
+stalest high-meta-share archetypes are refreshed first, within --budget requests
+(src/refresh_schedule.py).
+Usage: python update_decklists.py [--archetypes "Psychatog,Burn"] [--max-decks 10] [--full] [--budget 200]
 """
 import sys
 import os
 import json
-import time
 import argparse
 import unittest.mock as mock
 
@@ -14,7 +16,9 @@ import unittest.mock as mock
 import streamlit as st
 st.cache_data = lambda *a, **kw: (lambda f: f)
 
+from src.listing_refresh import newest_date
 from src.mtgdecks_scraper import get_recent_top_decks, get_decklist
+from src.refresh_schedule import DEFAULT_BUDGET, RefreshScheduler, print_plan
 
 DATA_PATH = "data/decklists.json"
 
@@ -31,12 +35,17 @@ def save(data):
         json.dump(data, f, indent=2, ensure_ascii=False)
     os.replace(tmp, DATA_PATH)  # atomic rename — safe against interruption
 
-def update_archetype(arch, existing_decks, max_decks):
+def update_archetype(arch, existing_decks, max_decks, incremental=True):
     existing_cards = {d["url"]: d.get("cards", []) for d in existing_decks}
 
     print(f"\n  [{arch}] Fetching top decks...")
     try:
-        top_decks = get_recent_top_decks(arch)
+        if incremental and existing_decks:
+            # Listing is newest-first: stop paging once we reach decks we already have
+            top_decks = get_recent_top_decks(arch, known_urls=frozenset(existing_cards),
+                                             newest_known=newest_date(existing_decks))
+        else:
+            top_decks = get_recent_top_decks(arch)
     except Exception as e:
         print(f"  [!] Error fetching list for '{arch}': {e}")
         return existing_decks  # safe fallback
@@ -60,7 +69,6 @@ def update_archetype(arch, existing_decks, max_decks):
         except Exception as e:
             print(f"  [!] Error fetching decklist: {e}")
             deck["cards"] = []
-        time.sleep(0.5)
 
     # Merge existing + new, deduplicate, sort newest first (by URL ID), keep top max_decks
     merged = {d["url"]: d for d in existing_decks}
@@ -80,10 +88,14 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--archetypes", help="Comma-separated list of archetypes to update (default: all)")
     parser.add_argument("--max-decks", type=int, default=20, help="Max decks to keep per archetype (default: 20)")
+    parser.add_argument("--full", action="store_true", help="Re-scan all listing pages instead of stopping at known decks")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET,
+                        help=f"Estimated requests per run when scheduling (default: {DEFAULT_BUDGET}, 0: no limit)")
     args = parser.parse_args()
 
     data = load_existing()
     all_archetypes = list(data.keys())
+    scheduler = RefreshScheduler(data, max_decks=args.max_decks)
 
     if args.archetypes:
         targets = [a.strip() for a in args.archetypes.split(",")]
@@ -92,7 +104,10 @@ def main():
             if t not in data:
                 data[t] = []
     else:
-        targets = all_archetypes
+        # Stalest, most-played archetypes first, as many as the request budget allows
+        plan = scheduler.plan(all_archetypes, args.budget)
+        print_plan(plan, len(all_archetypes) - len(plan))
+        targets = [s.archetype for s in plan]
 
     print(f"Updating {len(targets)} archetype(s), max {args.max_decks} decks each.")
     print("=" * 60)
@@ -102,7 +117,11 @@ def main():
         print(f"\n[{i}/{len(targets)}] {arch}")
         existing = data.get(arch, [])
         before = len(existing)
-        data[arch] = update_archetype(arch, existing, args.max_decks)
+        updated = update_archetype(arch, existing, args.max_decks, incremental=not args.full)
+        if updated is not existing:  # the listing was read (a failure returns the list untouched)
+            known = {d["url"] for d in existing}
+            scheduler.record(arch, sum(d["url"] not in known for d in updated))
+        data[arch] = updated
         after = len(data[arch])
         if after > before:
             updated_count += after - before
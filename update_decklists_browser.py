@@ -2,21 +2,30 @@
 Update decklists.json using Playwright browser.
 Otevře Chrome, ty projdeš Cloudflare challenge, pak skript převezme session.
 
-Usage: python update_decklists_browser.py [--archetypes "Psychatog,Burn"] [--max-decks 20]
+Listing pages are read only down to the decks already stored (--full re-scans them).
+After the challenge, --tabs tabs of the same browser context (sharing its cookies)
+work through a queue of listings and then of decklists, paced by one adaptive rate
+limiter; results are merged and saved by the main coroutine. Without --archetypes, the
+stalest high-meta-share archetypes go first, within --budget requests
+(src/refresh_schedule.py).
+
+Usage: python update_decklists_browser.py [--archetypes "Psychatog,Burn"] [--max-decks 20] [--full] [--tabs 4] [--budget 200]
 """
 import sys
 import json
-import time
+import asyncio
 import argparse
-import re
-from bs4 import BeautifulSoup
-from playwright.sync_api import sync_playwright
+from playwright.async_api import async_playwright
+from src.card_names import normalize_card_name
+from src.html_tables import strained_soup
+from src.http_client import MTGDECKS_URL
+from src.listing_refresh import caught_up, newest_date
+from src.listing_rows import parse_listing_rows, top_finish
+from src.rate_limiter import limiter_for
+from src.refresh_schedule import DEFAULT_BUDGET, RefreshScheduler, print_plan
 
 DATA_PATH = "data/decklists.json"
-BASE_URL = "https://mtgdecks.net"
-
-VALID_RANKS = ["1st", "2nd", "3rd", "4th", "5th", "6th", "7th", "8th",
-               "top 4", "top 8", "top4", "top8", "1", "2", "3", "4", "5", "6", "7", "8"]
+BASE_URL = MTGDECKS_URL
 
 def load_existing():
     try:
@@ -39,21 +48,34 @@ def arch_to_slug(name):
     }
     return mapping.get(slug, slug)
 
-def wait_for_human(page, url):
-    """Navigate to URL and wait for user to pass any challenge."""
-    page.goto(url, wait_until="domcontentloaded", timeout=30000)
+async def wait_for_human(page, url, limiter=None):
+    """Navigate to URL (when the limiter allows) and wait for user to pass any challenge."""
+    if limiter:
+        await limiter.wait_async()
+    response = await page.goto(url, wait_until="domcontentloaded", timeout=30000)
+    challenged = False
     # If Cloudflare challenge detected, wait for user to solve it
-    for _ in range(30):  # up to 30 seconds
-        content = page.content()
+    for _ in range(30):  # up to 60 seconds
+        content = await page.content()
         if "Just a moment" in content or "challenge" in page.url:
+            challenged = True
             print("  [!] Cloudflare challenge detected — solve it in the browser...")
-            time.sleep(2)
+            await asyncio.sleep(2)
         else:
             break
-    time.sleep(1)
-    return page.content()
-
-def scrape_top_decks(page, arch, max_decks=20):
+    if limiter:
+        # Challenges and 403/429 slow every tab down; clean pages speed them up
+        if challenged:
+            limiter.backoff()
+        elif response is not None:
+            limiter.observe(response.status, response.headers.get("retry-after"))
+    return await page.content()
+
+async def scrape_top_decks(page, arch, max_decks=20, known_urls=None, newest_known=None, limiter=None):
+    """
+    Top decks from the archetype's listing, newest first. Given the stored decks'
+    URLs / newest date, paging stops at the first page that only holds known decks.
+    """
     slug = arch_to_slug(arch)
     existing_urls = set()
     top_decks = []
@@ -61,100 +83,34 @@ def scrape_top_decks(page, arch, max_decks=20):
     for page_num in range(1, 6):
         url = f"{BASE_URL}/Premodern/{slug}/page:{page_num}"
         print(f"  Fetching: {url}")
-        html = wait_for_human(page, url)
-        soup = BeautifulSoup(html, "html.parser")
-        table = soup.find("table", class_="clickable")
-        if not table:
-            break
-
-        rows = table.find_all("tr")
-        if len(rows) <= 1:
+        html = await wait_for_human(page, url, limiter)
+        rows = parse_listing_rows(html, BASE_URL)
+        if not rows:
             break
 
-        found_any = False
+        page_decks = []
         for row in rows:
-            cols = row.find_all("td")
-            if len(cols) < 8:
-                continue
-            try:
-                rank_text = cols[0].get_text(strip=True).split("(")[0].strip()
-                player_td = cols[2]
-                deck_link = player_td.find("a")
-                deck_url = deck_link["href"] if deck_link else ""
-                if not deck_url:
-                    continue
-                if not deck_url.startswith("http"):
-                    deck_url = BASE_URL + deck_url
-                if deck_url in existing_urls:
-                    continue
-
-                strong_tag = player_td.find("strong")
-                player = strong_tag.get_text(strip=True).replace("By", "").strip() if strong_tag else "Unknown"
-                event = cols[5].get_text(strip=True)
-                players_text = cols[7].get_text(strip=True)
-                players = int(re.sub(r"\D", "", players_text)) if re.sub(r"\D", "", players_text) else 0
-                date_text = cols[9].get_text(separator=" ", strip=True) if len(cols) > 9 else ""
-
-                color_td = cols[3]
-                colors_list = []
-                for span in color_td.find_all("span", class_="ms-cost"):
-                    for cls in span.get("class", []):
-                        if cls.startswith("ms-") and len(cls) == 4 and cls != "ms-cost":
-                            colors_list.append(cls.replace("ms-", "").upper())
-
-                spice_td = cols[8] if len(cols) > 8 else None
-                spice_val = 0
-                if spice_td:
-                    spice_bar = spice_td.find("div", class_="progress-bar")
-                    spice_val = int(spice_bar["aria-valuenow"]) if spice_bar and "aria-valuenow" in spice_bar.attrs else 0
-
-                rank_lower = rank_text.lower()
-                is_top_8 = any(r == rank_lower or rank_lower.startswith(r) for r in VALID_RANKS)
-
-                if players == 0:
-                    match_record = re.match(r"^(\d+)-(\d+)(?:-(\d+))?$", rank_text)
-                    if match_record:
-                        wins = int(match_record.group(1))
-                        losses = int(match_record.group(2))
-                        draws = int(match_record.group(3)) if match_record.group(3) else 0
-                        total_rounds = wins + losses + draws
-                        if total_rounds >= 8: players = 129
-                        elif total_rounds == 7: players = 65
-                        elif total_rounds == 6: players = 33
-                        elif total_rounds == 5: players = 17
-                        elif total_rounds == 4: players = 9
-                        elif total_rounds == 3: players = 4
-                        if wins >= 3 and losses == 0:
-                            is_top_8 = True
-
-                if players >= 50 and is_top_8:
-                    top_decks.append({
-                        "player": player,
-                        "rank": rank_text,
-                        "players": players,
-                        "event": event,
-                        "date": date_text,
-                        "colors": colors_list,
-                        "spice": spice_val,
-                        "url": deck_url,
-                    })
-                    existing_urls.add(deck_url)
-                    found_any = True
-
-            except Exception as e:
-                print(f"  [!] Row parse error: {e}")
+            if row.url in existing_urls:
                 continue
+            players, is_top_8 = top_finish(row.rank, row.players)
+            if players >= 50 and is_top_8:
+                page_decks.append(row.to_deck(players=players))
+                existing_urls.add(row.url)
 
-        if not found_any or len(top_decks) >= max_decks:
+        top_decks.extend(page_decks)
+        if not page_decks or len(top_decks) >= max_decks:
+            break
+        if (known_urls is not None or newest_known is not None) and \
+                caught_up(page_decks, known_urls or set(), newest_known):
             break
 
     return top_decks[:max_decks]
 
 
-def scrape_decklist(page, url):
+async def scrape_decklist(page, url, limiter=None):
     print(f"    -> Fetching decklist: {url}")
-    html = wait_for_human(page, url)
-    soup = BeautifulSoup(html, "html.parser")
+    html = await wait_for_human(page, url, limiter)
+    soup = strained_soup(html, ["th", "tr"])
 
     cards = []
     current_section = "Maindeck"
@@ -175,7 +131,7 @@ def scrape_decklist(page, url):
                 try:
                     cards.append({
                         "qty": int(qty),
-                        "name": name,
+                        "name": normalize_card_name(name),
                         "section": current_section,
                         "type": current_type,
                     })
@@ -185,13 +141,112 @@ def scrape_decklist(page, url):
     return cards
 
 
+async def run_on_tabs(tabs, jobs, handler):
+    """
+    Run handler(tab, job) for every job, each tab taking the next job from a shared
+    queue as soon as it is free. Yields (job, result) in completion order; a job that
+    raised yields None.
+    """
+    todo = asyncio.Queue()
+    for job in jobs:
+        todo.put_nowait(job)
+    done = asyncio.Queue()
+
+    async def worker(tab):
+        while not todo.empty():
+            job = todo.get_nowait()
+            try:
+                result = await handler(tab, job)
+            except Exception as e:
+                print(f"  [!] Tab error: {e}")
+                result = None
+            done.put_nowait((job, result))
+
+    workers = [asyncio.create_task(worker(tab)) for tab in tabs]
+    try:
+        for _ in range(len(jobs)):
+            yield await done.get()
+    finally:
+        for w in workers:
+            w.cancel()
+
+
+async def update_all(data, targets, args, scheduler):
+    limiter = limiter_for(BASE_URL)
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=False, slow_mo=200)
+        context = await browser.new_context(
+            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36"
+        )
+        page = await context.new_page()
+
+        # Warm up — visit homepage so user can solve any initial challenge
+        print("\nOpening mtgdecks.net — solve any Cloudflare challenge in the browser...")
+        await wait_for_human(page, f"{BASE_URL}/Premodern")
+        await asyncio.to_thread(input, "\nPress Enter when the page is loaded and challenge is solved...")
+
+        # The challenge cookies live in the context, so extra tabs skip it
+        tabs = [page] + [await context.new_page() for _ in range(args.tabs - 1)]
+
+        # 1) Listings, one archetype per job
+        async def list_archetype(tab, arch):
+            existing = data.get(arch, [])
+            if args.full or not existing:
+                return await scrape_top_decks(tab, arch, args.max_decks, limiter=limiter)
+            return await scrape_top_decks(tab, arch, args.max_decks, {d["url"] for d in existing},
+                                          newest_date(existing), limiter)
+
+        new_decks = {}
+        async for arch, top_decks in run_on_tabs(tabs, targets, list_archetype):
+            existing_urls = {d["url"] for d in data.get(arch, [])}
+            new_decks[arch] = [d for d in (top_decks or []) if d["url"] not in existing_urls]
+            print(f"  [{arch}] Found {len(top_decks or [])} total, {len(new_decks[arch])} new")
+            if top_decks is not None:
+                scheduler.record(arch, len(new_decks[arch]))
+
+        # 2) Decklists of the new decks, merged into an archetype once all of its decks are in
+        async def fetch_deck(tab, job):
+            return await scrape_decklist(tab, job[1]["url"], limiter)
+
+        jobs = [(arch, deck) for arch in targets for deck in new_decks.get(arch, [])]
+        remaining = {arch: len(decks) for arch, decks in new_decks.items()}
+        added_total = failed = 0
+        async for (arch, deck), cards in run_on_tabs(tabs, jobs, fetch_deck):
+            remaining[arch] -= 1
+            if cards is None:
+                # The tab failed or timed out: leave the deck out, so the next run (which
+                # takes stored URLs as known) lists and fetches it again
+                new_decks[arch].remove(deck)
+                failed += 1
+            else:
+                main_count = sum(c["qty"] for c in cards if c["section"] != "Sideboard")
+                side_count = sum(c["qty"] for c in cards if c["section"] == "Sideboard")
+                print(f"    -> [{arch}] {main_count} main + {side_count} side")
+                deck["cards"] = cards
+                added_total += 1
+            if remaining[arch] == 0 and new_decks[arch]:
+                # Newest first (listing order), so the new decks survive the max_decks cut
+                data[arch] = (new_decks[arch] + data.get(arch, []))[:args.max_decks]
+                save(data)
+
+        await browser.close()
+    if failed:
+        print(f"\n{failed} decklist(s) could not be fetched; they are retried on the next run.")
+    return added_total
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--archetypes", help="Comma-separated archetypes (default: all)")
     parser.add_argument("--max-decks", type=int, default=20)
+    parser.add_argument("--full", action="store_true", help="Re-scan all listing pages instead of stopping at known decks")
+    parser.add_argument("--tabs", type=int, default=4, help="Browser tabs fetching in parallel (default: 4)")
+    parser.add_argument("--budget", type=int, default=DEFAULT_BUDGET,
+                        help=f"Estimated requests per run when scheduling (default: {DEFAULT_BUDGET}, 0: no limit)")
     args = parser.parse_args()
 
     data = load_existing()
+    scheduler = RefreshScheduler(data, max_decks=args.max_decks)
 
     if args.archetypes:
         targets = [a.strip() for a in args.archetypes.split(",")]
@@ -199,49 +254,16 @@ def main():
             if t not in data:
                 data[t] = []
     else:
-        targets = list(data.keys())
+        # Stalest, most-played archetypes first, as many as the request budget allows
+        plan = scheduler.plan(list(data.keys()), args.budget)
+        print_plan(plan, len(data) - len(plan))
+        targets = [s.archetype for s in plan]
 
-    print(f"Updating {len(targets)} archetype(s) via browser.")
+    print(f"Updating {len(targets)} archetype(s) via browser, {args.tabs} tab(s).")
     print("NOTE: If Cloudflare challenge appears, solve it in the browser window.")
     print("=" * 60)
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(headless=False, slow_mo=200)
-        context = browser.new_context(
-            user_agent="Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/133.0.0.0 Safari/537.36"
-        )
-        page = context.new_page()
-
-        # Warm up — visit homepage so user can solve any initial challenge
-        print("\nOpening mtgdecks.net — solve any Cloudflare challenge in the browser...")
-        wait_for_human(page, "https://mtgdecks.net/Premodern")
-        input("\nPress Enter when the page is loaded and challenge is solved...")
-
-        added_total = 0
-        for i, arch in enumerate(targets, 1):
-            print(f"\n[{i}/{len(targets)}] {arch}")
-            existing = data.get(arch, [])
-            existing_urls = {d["url"] for d in existing}
-
-            top_decks = scrape_top_decks(page, arch, args.max_decks)
-            new_decks = [d for d in top_decks if d["url"] not in existing_urls]
-            print(f"  Found {len(top_decks)} total, {len(new_decks)} new")
-
-            updated = list(existing)
-            for deck in new_decks:
-                cards = scrape_decklist(page, deck["url"])
-                main_count = sum(c["qty"] for c in cards if c["section"] != "Sideboard")
-                side_count = sum(c["qty"] for c in cards if c["section"] == "Sideboard")
-                print(f"    -> {main_count} main + {side_count} side")
-                deck["cards"] = cards
-                updated.append(deck)
-                added_total += 1
-                time.sleep(0.3)
-
-            data[arch] = updated[:args.max_decks]
-            save(data)
-
-        browser.close()
+    added_total = asyncio.run(update_all(data, targets, args, scheduler))
 
     print(f"\n{'='*60}")
     print(f"Done. Added {added_total} new deck(s).")